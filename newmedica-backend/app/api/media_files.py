@@ -0,0 +1,154 @@
+import mimetypes
+import os
+import re
+import stat
+from typing import Dict, Optional, Tuple
+
+from starlette.responses import FileResponse, JSONResponse, Response
+from starlette.types import Receive, Scope, Send
+
+from app.core.config import settings
+from app.services.media_storage import MediaStorage, media_storage
+from app.services.media_variants import MediaVariants, media_variants
+from app.utils.http_cache import etag_matches
+
+# Keys whose bytes are fixed by the hash in their name: originals and their variants
+_CONTENT_ADDRESSED = re.compile(
+    r"^(?:variants/)?[0-9a-f]{2}/[0-9a-f]{2}/(?P<tag>[0-9a-f]{64}(?:-\d+w)?)\.[a-z0-9]+$"
+)
+_SIDECARS = (("br", ".br"), ("gzip", ".gz"))
+
+
+class MediaFiles:
+    """
+    ASGI app serving MEDIA_ROOT, mounted at MEDIA_URL_PREFIX outside the API router.
+
+    A request costs a path check, one or two stats and the response headers: no
+    routing, dependencies or database. Content-addressed files are served with
+    their hash as a strong ETag (so If-None-Match is answered with 304) and an
+    immutable year-long Cache-Control. Range and If-Range are handled by
+    Starlette's FileResponse.
+
+    The bytes themselves are sent by whatever sits in front: nginx via
+    X-Accel-Redirect when MEDIA_ACCEL_REDIRECT_PREFIX is set, the ASGI server
+    via the pathsend extension (sendfile) when it offers it, else large chunks.
+    A variant missing on disk is rendered before it is sent.
+    """
+
+    def __init__(
+        self,
+        storage: MediaStorage,
+        variants: MediaVariants,
+        accel_redirect_prefix: Optional[str],
+        precompressed: bool,
+        chunk_bytes: int,
+    ):
+        self.storage = storage
+        self.variants = variants
+        self.accel_redirect_prefix = accel_redirect_prefix.rstrip("/") if accel_redirect_prefix else None
+        self.precompressed = precompressed
+        self.chunk_bytes = chunk_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        response = await self._respond(scope)
+        await response(scope, receive, send)
+
+    async def _respond(self, scope: Scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD"):
+            return _error(405, "METHOD_NOT_ALLOWED", "Method not allowed.", {"Allow": "GET, HEAD"})
+
+        path, root_path = scope["path"], scope.get("root_path", "")
+        storage_key = (path[len(root_path) :] if path.startswith(root_path) else path).lstrip("/")
+        segments = storage_key.split("/")
+        if any(segment in ("", ".", "..") or segment.startswith(".") for segment in segments):
+            return _not_found()
+
+        file_path, stat_result = await self._locate(storage_key)
+        if stat_result is None:
+            return _not_found()
+
+        content_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+        headers: Dict[str, str] = {}
+        match = _CONTENT_ADDRESSED.match(storage_key)
+        etag = f'"{match["tag"]}"' if match else None
+        headers["Cache-Control"] = settings.CACHE_CONTROL_POLICIES["media_immutable" if match else "media"]
+
+        if self.precompressed:
+            headers["Vary"] = "Accept-Encoding"
+            sidecar = self._sidecar(scope, file_path)
+            if sidecar is not None:
+                encoding, suffix, stat_result = sidecar
+                file_path += suffix
+                storage_key += suffix
+                headers["Content-Encoding"] = encoding
+                etag = f'"{match["tag"]}-{encoding}"' if match else None
+
+        if etag is not None:
+            headers["ETag"] = etag
+            if_none_match = _header(scope, b"if-none-match")
+            if if_none_match is not None and etag_matches(if_none_match, etag):
+                return Response(status_code=304, headers=headers)
+
+        if self.accel_redirect_prefix is not None:
+            headers["X-Accel-Redirect"] = f"{self.accel_redirect_prefix}/{storage_key}"
+            return Response(headers=headers, media_type=content_type)
+
+        response = FileResponse(file_path, headers=headers, media_type=content_type, stat_result=stat_result)
+        response.chunk_size = self.chunk_bytes
+        return response
+
+    async def _locate(self, storage_key: str) -> Tuple[str, Optional[os.stat_result]]:
+        # Local stats are page-cache hits; a thread hop would cost more than the call
+        file_path = self.storage.path_for(storage_key)
+        stat_result = _stat_file(file_path)
+        if stat_result is None:
+            variant = self.variants.parse_variant_key(storage_key)
+            source_key = self.storage.find_original(variant[0]) if variant else None
+            if source_key is not None and await self.variants.ensure(variant[0], variant[1], source_key):
+                stat_result = _stat_file(file_path)
+        return file_path, stat_result
+
+    def _sidecar(self, scope: Scope, file_path: str) -> Optional[Tuple[str, str, os.stat_result]]:
+        accepted = {
+            coding.split(";")[0].strip().lower()
+            for coding in (_header(scope, b"accept-encoding") or "").split(",")
+        }
+        for encoding, suffix in _SIDECARS:
+            if encoding in accepted:
+                stat_result = _stat_file(file_path + suffix)
+                if stat_result is not None:
+                    return encoding, suffix, stat_result
+        return None
+
+
+def _stat_file(path: str) -> Optional[os.stat_result]:
+    try:
+        stat_result = os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    return stat_result if stat.S_ISREG(stat_result.st_mode) else None
+
+
+def _header(scope: Scope, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _not_found() -> Response:
+    return _error(404, "NOT_FOUND", "Media file not found.")
+
+
+def _error(status_code: int, code: str, message: str, headers: Optional[Dict[str, str]] = None) -> Response:
+    # Same body as APIException responses from the API
+    return JSONResponse({"error": {"code": code, "message": message}}, status_code=status_code, headers=headers)
+
+
+media_files = MediaFiles(
+    storage=media_storage,
+    variants=media_variants,
+    accel_redirect_prefix=settings.MEDIA_ACCEL_REDIRECT_PREFIX,
+    precompressed=settings.MEDIA_PRECOMPRESSED_SIDECARS,
+    chunk_bytes=settings.MEDIA_SEND_CHUNK_BYTES,
+)
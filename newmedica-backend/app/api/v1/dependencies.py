@@ -1,20 +1,31 @@
+import uuid
+from typing import AsyncGenerator, Optional
+
 from fastapi import Depends, HTTPException, status
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.security import get_current_user
-from app.db.session import get_session
-from app.models.user import User
-from app.models.user_type import UserType
+from app.core.principal_cache import Principal
+from app.core.security import get_current_user, get_optional_token_subject
+from app.db.session import read_replica_router
 
 
 async def get_current_admin_user(
-    current_user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session),
-) -> User:
-    user_type = await session.get(UserType, current_user.user_type_id)
-    if not user_type or user_type.name != "Admin":
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
+    if current_user.user_type_name != "Admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="The user does not have enough privileges",
         )
     return current_user
+
+
+async def get_read_session(
+    user_id: Optional[uuid.UUID] = Depends(get_optional_token_subject),
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session for read-only endpoints; served by the read replica when it is
+    configured, healthy and the caller has not written recently.
+    """
+    async with await read_replica_router.session_for(user_id) as session:
+        yield session
@@ -1,31 +1,65 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from dataclasses import asdict
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 from uuid import UUID
 from typing import List
 
+from app.core.password_hashing import password_hasher
 from app.core.security import get_current_admin_user
+from app.core.principal_cache import Principal
+from app.db.query_stats import query_metrics
 from app.db.session import get_session
-from app.models import ShippingConfig, User, Voucher
+from app.models import ShippingConfig, Voucher
 from app.schemas.shipping_config import ShippingConfigRead, ShippingConfigUpdate
 from app.schemas.admin_voucher import VoucherCreate, VoucherUpdate
 from app.services.admin_service import AdminVoucherService
+from app.services.media_gc import media_collector
+from app.services.media_storage import media_storage
+from app.services.media_variants import media_variants
 
 router = APIRouter()
 
 
 @router.get("/test-security", response_model=dict)
-async def test_security(current_user: User = Depends(get_current_admin_user)):
+async def test_security(current_user: Principal = Depends(get_current_admin_user)):
     """
     A dummy endpoint to test admin security.
     """
     return {"message": "Admin access granted"}
 
 
+@router.get("/metrics", response_model=dict)
+async def get_metrics(current_user: Principal = Depends(get_current_admin_user)):
+    """
+    Process-local runtime metrics for this worker.
+    """
+    return {
+        "password_hashing": password_hasher.stats(),
+        "queries": query_metrics.stats(),
+        "media_storage": media_storage.stats(),
+        "media_variants": media_variants.stats(),
+        "media_gc": media_collector.stats(),
+    }
+
+
+@router.post("/media/gc", response_model=dict)
+async def collect_media_garbage(
+    dry_run: bool = Query(True), current_user: Principal = Depends(get_current_admin_user)
+):
+    """
+    Runs a media GC sweep now. Defaults to a dry run, which only reports what
+    would be purged and how many bytes it would reclaim.
+    """
+    report = await media_collector.sweep(dry_run=dry_run)
+    return asdict(report)
+
+
 @router.get("/shipping-config", response_model=ShippingConfigRead)
 async def get_shipping_config(
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
 ):
     result = await session.execute(select(ShippingConfig).where(ShippingConfig.is_active == True))
     cfg = result.scalar_one_or_none()
@@ -41,7 +75,7 @@ async def get_shipping_config(
 async def update_shipping_config(
     payload: ShippingConfigUpdate,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
 ):
     result = await session.execute(select(ShippingConfig).where(ShippingConfig.is_active == True))
     cfg = result.scalar_one_or_none()
@@ -63,7 +97,7 @@ async def update_shipping_config(
 async def create_voucher(
     voucher_data: VoucherCreate,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
 ):
     service = AdminVoucherService(session)
     return await service.create_voucher(voucher_data)
@@ -71,7 +105,7 @@ async def create_voucher(
 @router.get("/vouchers", response_model=List[Voucher])
 async def get_all_vouchers(
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
 ):
     service = AdminVoucherService(session)
     return await service.get_all_vouchers()
@@ -81,7 +115,7 @@ async def update_voucher(
     voucher_id: UUID,
     voucher_data: VoucherUpdate,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
 ):
     service = AdminVoucherService(session)
     updated_voucher = await service.update_voucher(voucher_id, voucher_data)
@@ -93,7 +127,7 @@ async def update_voucher(
 async def delete_voucher(
     voucher_id: UUID,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
 ):
     service = AdminVoucherService(session)
     success = await service.delete_voucher(voucher_id)
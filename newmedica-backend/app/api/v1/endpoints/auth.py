@@ -4,11 +4,11 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.exceptions import BadRequestException, ConflictException, UnauthorizedException
 from app.core.security import create_access_token, create_refresh_token, get_current_user
+from app.core.principal_cache import Principal
 from app.db.session import get_session
 from app.schemas.token import Token
 from app.schemas.user import UserCreate, UserRead
 from app.services.user_service import UserService
-from app.models.user import User
 
 router = APIRouter()
 
@@ -49,7 +49,7 @@ async def login_for_access_token(
 
 
 @router.post("/refresh", response_model=Token)
-async def refresh_token(current_user: User = Depends(get_current_user)):
+async def refresh_token(current_user: Principal = Depends(get_current_user)):
     access_token = create_access_token(subject=current_user.id)
     refresh_token = create_refresh_token(subject=current_user.id)
     return {
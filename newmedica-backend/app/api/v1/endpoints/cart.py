@@ -4,8 +4,8 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import get_current_user
+from app.core.principal_cache import Principal
 from app.db.session import get_session
-from app.models.user import User
 from app.controllers.cart_controller import CartController
 from app.schemas.cart import CartRead, CartItemCreate, CartItemUpdate
 
@@ -15,7 +15,7 @@ router = APIRouter()
 async def get_cart(
     *, 
     session: AsyncSession = Depends(get_session), 
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """    
     Get the current user's cart.
@@ -28,7 +28,7 @@ async def get_cart(
 async def add_item_to_cart(
     *, 
     session: AsyncSession = Depends(get_session), 
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     item: CartItemCreate
 ):
     """    
@@ -41,7 +41,7 @@ async def add_item_to_cart(
 async def update_cart_item_quantity(
     *,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     item_id: UUID,
     item: CartItemUpdate,
 ):
@@ -57,7 +57,7 @@ async def update_cart_item_quantity(
 async def delete_cart_item(
     *,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     item_id: UUID,
 ):
     """
@@ -1,13 +1,14 @@
 from typing import List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core.principal_cache import Principal
 from app.api.v1.dependencies import get_current_admin_user
 from app.db.session import get_session
-from app.models.user import User
 from app.schemas.category import CategoryCreate, CategoryRead
 from app.services.category_service import CategoryService
+from app.utils.http_cache import conditional_response, latest, make_etag
 
 router = APIRouter()
 
@@ -16,7 +17,7 @@ router = APIRouter()
 async def create_category(
     category_in: CategoryCreate,
     db: AsyncSession = Depends(get_session),
-    admin_user: User = Depends(get_current_admin_user),
+    admin_user: Principal = Depends(get_current_admin_user),
 ):
     service = CategoryService(db)
     category = await service.create_category(category_in)
@@ -25,9 +26,17 @@ async def create_category(
 
 @router.get("", response_model=List[CategoryRead])
 async def get_all_categories(
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_session),
-    admin_user: User = Depends(get_current_admin_user),
+    admin_user: Principal = Depends(get_current_admin_user),
 ):
     service = CategoryService(db)
     categories = await service.get_all_categories()
+    etag = make_etag("categories", *sorted((str(c.id), c.updated_at) for c in categories))
+    not_modified = conditional_response(
+        request, response, "categories", etag, latest(c.updated_at for c in categories)
+    )
+    if not_modified:
+        return not_modified
     return categories
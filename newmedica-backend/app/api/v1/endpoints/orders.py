@@ -1,87 +1,98 @@
+from typing import Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.v1.dependencies import get_read_session
 from app.core.security import get_current_user
+from app.core.principal_cache import Principal
 from app.db.session import get_session
-from app.models.user import User
 from app.controllers.order_controller import OrderController
-from app.schemas.order import OrderRead, OrderCreate
+from app.schemas.order import OrderCreate, OrderPage, OrderRead
 from app.schemas.payment import PaymentResponse
-from sqlalchemy.orm import selectinload
-from sqlmodel import select
-from app.models.order import Order
-from app.models.order import OrderItem
-from app.models.product import Product
+from app.services.idempotency import CompleteKey, idempotency_store, request_fingerprint
+from app.utils.http_cache import conditional_response, make_etag
 
 router = APIRouter()
 
 @router.post("", response_model=OrderRead, status_code=201)
 async def create_order_from_cart(
     *,
+    request: Request,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     payload: OrderCreate | None = None,
+    idempotency_key: str | None = Header(None),
 ):
     """
     Create an order from the current user's cart.
+    Repeating a request with the same Idempotency-Key replays the first order.
     """
     order_controller = OrderController(session)
-    order = await order_controller.create_order_from_cart(user_id=current_user.id, clear_cart=True)
-    # Persist optional fields if provided (best-effort)
-    if payload:
-        if payload.shipping_address is not None:
-            order.shipping_address = payload.shipping_address
-        if payload.billing_address is not None:
-            order.billing_address = payload.billing_address
-        # If billing address is not provided, use the shipping address
-        elif payload.shipping_address is not None:
-            order.billing_address = payload.shipping_address
-        if payload.remark is not None:
-            order.remark = payload.remark
-        if payload.payment_method is not None:
-            order.payment_method = payload.payment_method
-        await session.commit()
-    # Re-fetch with eager-loaded items for response serialization
-    result = await session.execute(
-        select(Order)
-        .where(Order.id == order.id)
-        .options(
-            selectinload(Order.items)
-            .selectinload(OrderItem.product)
-            .options(
-                selectinload(Product.category),
-                selectinload(Product.media),
-            )
+
+    async def _create(complete: CompleteKey) -> OrderRead:
+        async def _record(order) -> None:
+            await complete(OrderRead.model_validate(order))
+
+        order = await order_controller.create_order_from_cart(
+            user_id=current_user.id, clear_cart=True, details=payload, before_commit=_record
         )
+        return OrderRead.model_validate(order)
+
+    return await idempotency_store.execute(
+        session,
+        user_id=current_user.id,
+        key=idempotency_key,
+        fingerprint=await request_fingerprint(request),
+        status_code=status.HTTP_201_CREATED,
+        handler=_create,
     )
-    return result.scalar_one()
 
 
-@router.get("", response_model=list[OrderRead])
+@router.get("", response_model=OrderPage)
 async def get_orders(
     *,
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_read_session),
+    current_user: Principal = Depends(get_current_user),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
 ):
     """
-    Get a list of the current user's orders.
+    Get one page of the current user's order history, newest first.
+    Pass `next_cursor` back as `cursor` for the next page; GET /orders/{id} has the items.
     """
     order_controller = OrderController(session)
-    return await order_controller.get_orders(user_id=current_user.id)
+    count, last_updated = await order_controller.get_orders_version(user_id=current_user.id)
+    etag = make_etag("orders", current_user.id, count, last_updated, limit, cursor)
+    not_modified = conditional_response(request, response, "orders", etag, last_updated)
+    if not_modified:
+        return not_modified
+    return await order_controller.get_orders(user_id=current_user.id, limit=limit, cursor=cursor)
 
 
 @router.get("/{order_id}", response_model=OrderRead)
 async def get_order_by_id(
     *,
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_read_session),
+    current_user: Principal = Depends(get_current_user),
     order_id: UUID,
 ):
     """
     Get a single order by its ID.
     """
     order_controller = OrderController(session)
+    version = await order_controller.get_order_version(order_id=order_id)
+    if not version or version[0] != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
+    # Items are written once with the order, so its own updated_at covers the body
+    etag = make_etag("order", order_id, version[1])
+    not_modified = conditional_response(request, response, "orders", etag, version[1])
+    if not_modified:
+        return not_modified
     order = await order_controller.get_order_by_id(order_id=order_id)
     if not order or order.user_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
@@ -92,7 +103,7 @@ async def get_order_by_id(
 async def verify_payment_status(
     *,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     stripe_session_id: str,
 ):
     """
@@ -106,23 +117,42 @@ async def verify_payment_status(
 @router.post("/{order_id}/retry-payment", response_model=PaymentResponse)
 async def retry_payment_for_order(
     *,
+    request: Request,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     order_id: UUID,
+    idempotency_key: str | None = Header(None),
 ):
     """
     Creates a new Stripe Checkout session for an existing pending order.
+    Repeating a request with the same Idempotency-Key replays the first session URL.
     """
     order_controller = OrderController(session)
-    payment_info = await order_controller.retry_payment_for_order(order_id=order_id, user_id=current_user.id)
-    return PaymentResponse(payment_url=payment_info["url"])
+
+    async def _retry(complete: CompleteKey) -> PaymentResponse:
+        async def _record(checkout_session) -> None:
+            await complete(PaymentResponse(payment_url=checkout_session.url))
+
+        payment_info = await order_controller.retry_payment_for_order(
+            order_id=order_id, user_id=current_user.id, before_commit=_record
+        )
+        return PaymentResponse(payment_url=payment_info.url)
+
+    return await idempotency_store.execute(
+        session,
+        user_id=current_user.id,
+        key=idempotency_key,
+        fingerprint=await request_fingerprint(request),
+        status_code=status.HTTP_200_OK,
+        handler=_retry,
+    )
 
 
 @router.post("/{order_id}/mark-paid", response_model=OrderRead)
 async def mark_order_paid(
     *,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     order_id: UUID,
 ):
     """
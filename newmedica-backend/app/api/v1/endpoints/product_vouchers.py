@@ -6,19 +6,20 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel import select
 from sqlalchemy.orm import joinedload
 
-from app.db.session import get_session
-from app.models import User, Voucher, VoucherProductLink # Import Voucher
+from app.api.v1.dependencies import get_read_session
+from app.models import Voucher, VoucherProductLink # Import Voucher
 from app.schemas.voucher import VoucherResponse
 from app.services.pricing_service import PricingService # Keep if needed elsewhere, but not directly used in this function
 from app.core.security import get_current_user
+from app.core.principal_cache import Principal
 
 router = APIRouter()
 
 @router.get("/products/{product_id}/vouchers", response_model=List[VoucherResponse])
 async def get_product_vouchers(
     product_id: UUID,
-    current_user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_session),
 ):
     # Fetch all vouchers that are active and generally applicable to the user based on scope
     # Eagerly load product_links for efficient filtering
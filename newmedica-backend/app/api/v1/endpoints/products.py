@@ -9,17 +9,21 @@ from fastapi import (
     Form,
     HTTPException,
     Query,
+    Request,
+    Response,
     UploadFile,
 )
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.api.v1.dependencies import get_current_admin_user
+from app.core.principal_cache import Principal
+from app.api.v1.dependencies import get_current_admin_user, get_read_session
 from app.db.session import get_session
-from app.models.user import User
-from app.schemas.media import ProductMediaRead
-from app.schemas.product import ProductRead, ProductUpdate
+from app.schemas.media import ProductMediaBatch, ProductMediaRead
+from app.schemas.product import ProductPage, ProductRead, ProductUpdate
 from app.schemas.product_create import ProductCreate
+from app.services.media_service import MediaService
 from app.services.product_service import ProductService
+from app.utils.http_cache import conditional_response
 
 router = APIRouter()
 
@@ -28,38 +32,55 @@ router = APIRouter()
 async def create_product(
     product_in: ProductCreate,
     db: AsyncSession = Depends(get_session),
-    admin_user: User = Depends(get_current_admin_user),
+    admin_user: Principal = Depends(get_current_admin_user),
 ):
     service = ProductService(db)
     product = await service.create_product(product_in)
     return await service.get_product_by_id(product.id)
 
 
-@router.get("", response_model=List[ProductRead])
+@router.get("", response_model=ProductPage)
 async def get_all_products(
-    db: AsyncSession = Depends(get_session),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_session),
     category: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
     sort_by: Optional[str] = Query(None),
     sort_order: str = Query("asc"),
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
 ):
     service = ProductService(db)
-    products = await service.get_all_products(
+    entry = await service.get_catalog_page(
         category_name=category,
         search_term=search,
         sort_by=sort_by,
         sort_order=sort_order,
+        limit=limit,
+        cursor=cursor,
     )
-    return products
+    not_modified = conditional_response(request, response, "products", entry.etag, entry.last_modified)
+    if not_modified:
+        return not_modified
+    return entry.value
 
 
 @router.get("/{product_id}", response_model=ProductRead)
-async def get_product(product_id: UUID, db: AsyncSession = Depends(get_session)):
+async def get_product(
+    product_id: UUID,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_session),
+):
     service = ProductService(db)
-    product = await service.get_product_by_id(product_id)
-    if not product:
+    entry = await service.get_catalog_product(product_id)
+    if not entry:
         raise HTTPException(status_code=404, detail="Product not found")
-    return product
+    not_modified = conditional_response(request, response, "products", entry.etag, entry.last_modified)
+    if not_modified:
+        return not_modified
+    return entry.value
 
 
 @router.put("/{product_id}", response_model=ProductRead)
@@ -67,7 +88,7 @@ async def update_product(
     product_id: UUID,
     product_in: ProductUpdate,
     db: AsyncSession = Depends(get_session),
-    admin_user: User = Depends(get_current_admin_user),
+    admin_user: Principal = Depends(get_current_admin_user),
 ):
     service = ProductService(db)
     product = await service.update_product(product_id, product_in)
@@ -80,7 +101,7 @@ async def update_product(
 async def delete_product(
     product_id: UUID,
     db: AsyncSession = Depends(get_session),
-    admin_user: User = Depends(get_current_admin_user),
+    admin_user: Principal = Depends(get_current_admin_user),
 ):
     service = ProductService(db)
     success = await service.delete_product(product_id)
@@ -96,7 +117,7 @@ async def upload_product_media(
     display_order: int = Form(0),
     file: UploadFile = File(...),
     db: AsyncSession = Depends(get_session),
-    admin_user: User = Depends(get_current_admin_user),
+    admin_user: Principal = Depends(get_current_admin_user),
 ):
     service = ProductService(db)
     product = await service.get_product_by_id(product_id)
@@ -114,8 +135,23 @@ async def update_media_order(
     product_id: UUID,
     media_ids: List[UUID] = Body(..., embed=True),
     db: AsyncSession = Depends(get_session),
-    admin_user: User = Depends(get_current_admin_user),
+    admin_user: Principal = Depends(get_current_admin_user),
 ):
     service = ProductService(db)
     await service.update_media_order(product_id, media_ids)
     return {"message": "Media order updated successfully"}
+
+
+@router.post("/{product_id}/media/batch", response_model=List[ProductMediaRead])
+async def batch_update_media(
+    product_id: UUID,
+    batch: ProductMediaBatch,
+    db: AsyncSession = Depends(get_session),
+    admin_user: Principal = Depends(get_current_admin_user),
+):
+    """
+    Reorders, deletes, re-labels and attaches existing media in one all-or-nothing
+    transaction. Returns the product's media in display order.
+    """
+    service = MediaService(db)
+    return await service.apply_batch(product_id, batch)
@@ -1,37 +1,38 @@
 from typing import List
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import select
 
-from app.core.security import get_current_user
+from app.core.principal_cache import Principal, user_type_names
+from app.core.security import get_current_db_user, get_current_user
 from app.db.session import get_session
 from app.models.user import User
-from app.models.user_type import UserType
 from app.schemas.user import UserReadWithDetails, UserUpdate, PasswordChange, Msg
 from app.schemas.voucher_schema import UserVoucherRead
 from app.repositories.voucher_repository import VoucherRepository
 from app.controllers.user_controller import UserController
+from app.utils.http_cache import conditional_response, make_etag
 
 router = APIRouter()
 
 
 @router.get("/me", response_model=UserReadWithDetails)
 async def read_users_me(
-    current_user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session),
+    request: Request,
+    response: Response,
+    current_user: Principal = Depends(get_current_user),
 ):
     """
     Get current user.
     """
-    user_type_result = await session.execute(
-        select(UserType).where(UserType.id == current_user.user_type_id)
-    )
-    user_type = user_type_result.scalar_one_or_none()
+    etag = make_etag("me", current_user.id, current_user.version, current_user.user_type_name)
+    not_modified = conditional_response(request, response, "users_me", etag, current_user.version)
+    if not_modified:
+        return not_modified
 
     response_data = {
         "id": current_user.id,
         "email": current_user.email,
-        "user_type": user_type.name if user_type else "Unknown",
+        "user_type": current_user.user_type_name,
         **(current_user.extra_fields or {}),
     }
 
@@ -41,7 +42,7 @@ async def read_users_me(
 async def update_user_me(
     *, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_db_user),
     user_in: UserUpdate,
 ):
     """
@@ -49,15 +50,12 @@ async def update_user_me(
     """
     user_controller = UserController(session)
     user = await user_controller.update_user_profile(user=current_user, user_in=user_in)
-    user_type_result = await session.execute(
-        select(UserType).where(UserType.id == user.user_type_id)
-    )
-    user_type = user_type_result.scalar_one_or_none()
+    user_type_name = await user_type_names.name_for(session, user.user_type_id)
 
     response_data = {
         "id": user.id,
         "email": user.email,
-        "user_type": user_type.name if user_type else "Unknown",
+        "user_type": user_type_name or "Unknown",
         **(user.extra_fields or {}),
     }
     return UserReadWithDetails.model_validate(response_data)
@@ -66,7 +64,7 @@ async def update_user_me(
 async def change_password(
     *, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_db_user),
     password_in: PasswordChange,
 ):
     """
@@ -77,7 +75,7 @@ async def change_password(
 
 @router.get("/me/vouchers", response_model=List[UserVoucherRead])
 async def get_my_vouchers(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
 ):
     """
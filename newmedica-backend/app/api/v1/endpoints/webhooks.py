@@ -1,11 +1,11 @@
 import stripe
-import uuid
 from fastapi import APIRouter, Depends, Header, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.db.session import get_session
-from app.services.order_service import OrderService
+from app.repositories.webhook_event_repository import WebhookEventRepository
+from app.services.webhook_inbox import stripe_webhook_inbox
 
 router = APIRouter()
 
@@ -17,7 +17,8 @@ async def stripe_webhook(
     db: AsyncSession = Depends(get_session),
 ):
     """
-    Stripe webhook endpoint to handle events.
+    Stripe webhook endpoint. Verifies the signature and stores the event in the
+    inbox; the order work happens in the background workers (see WebhookInbox).
     """
     payload = await request.body()
 
@@ -28,7 +29,7 @@ async def stripe_webhook(
         event = stripe.Webhook.construct_event(
             payload=payload,
             sig_header=stripe_signature,
-            secret=settings.stripe_webhook_secret,
+            secret=settings.STRIPE_WEBHOOK_SECRET,
         )
     except ValueError as e:
         # Invalid payload
@@ -37,26 +38,13 @@ async def stripe_webhook(
         # Invalid signature
         raise HTTPException(status_code=400, detail=f"Invalid signature: {e}")
 
-    # Handle the event
-    if event["type"] == "checkout.session.completed":
-        session = event["data"]["object"]
-        client_reference_id = session.get("client_reference_id")
-
-        if client_reference_id:
-            try:
-                order_id = uuid.UUID(client_reference_id)
-                order_service = OrderService(db)
-                await order_service.mark_order_paid(order_id=order_id)
-                print(f"Order {order_id} payment succeeded and has been marked as paid.")
-            except (ValueError, TypeError):
-                print(f"Error: Invalid client_reference_id format: {client_reference_id}")
-
-        else:
-            # Log an error if the order_id is not found in the session
-            print(f"Error: client_reference_id not found in checkout session {session.get('id')}")
-
-
-    else:
-        print(f"Unhandled event type {event['type']}")
-
-    return {"status": "success"}
+    stored = await WebhookEventRepository(db).add_if_new(
+        provider="stripe",
+        event_id=event["id"],
+        event_type=event["type"],
+        payload=payload.decode("utf-8"),
+    )
+    if stored:
+        stripe_webhook_inbox.notify()
+        return {"status": "success"}
+    return {"status": "duplicate"}
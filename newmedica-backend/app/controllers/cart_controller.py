@@ -13,7 +13,7 @@ class CartController:
 
     async def get_cart(self, user_id: UUID) -> CartRead:
         cart = await self.service.get_or_create_cart_by_user_id(user_id)
-        totals = await self.pricing_service.compute_totals(user_id)
+        totals = await self.pricing_service.compute_totals(user_id, items=cart.items)
 
         # Manually populate CartRead from Cart object and computed totals
         cart_read = CartRead(
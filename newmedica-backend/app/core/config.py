@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Newmedica API"
@@ -12,6 +12,33 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     ASYNC_DATABASE_URL: str
 
+    # Per-request SQL instrumentation: X-DB-* response headers (for development) and a
+    # warning for requests that run more than QUERY_STATS_WARN_STATEMENTS statements
+    QUERY_STATS_HEADERS: bool = False
+    QUERY_STATS_WARN_STATEMENTS: int = 50
+
+    # Database engine profile (pool settings are ignored for SQLite)
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 10.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # asyncpg prepared statement caches; set to 0 behind pgbouncer in transaction mode
+    DB_STATEMENT_CACHE_SIZE: int = 256
+    # Server-side statement_timeout in milliseconds; 0 disables it
+    DB_STATEMENT_TIMEOUT_MS: int = 15000
+    # Connections opened and checked on startup so the first requests skip connect latency
+    DB_WARMUP_CONNECTIONS: int = 2
+
+    # Optional read replica for safe (GET) endpoints; reads fall back to the primary
+    # when the replica is unreachable or lags by more than READ_REPLICA_MAX_LAG_SECONDS
+    READ_REPLICA_URL: Optional[str] = None
+    READ_REPLICA_MAX_LAG_SECONDS: float = 5.0
+    READ_REPLICA_CHECK_INTERVAL_SECONDS: float = 5.0
+    # After a user writes, their reads stay on the primary for this long (per worker)
+    READ_YOUR_WRITES_SECONDS: float = 10.0
+
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = ["http://localhost:3000"]
 
@@ -24,6 +51,98 @@ class Settings(BaseSettings):
     STRIPE_SECRET_KEY: str
     STRIPE_WEBHOOK_SECRET: str
     server_host: str = "http://localhost:3000" # Added for Stripe redirect URLs
+    # Point at the fake server (`python -m tests.fake_stripe`) to run checkout offline
+    STRIPE_API_BASE: str = "https://api.stripe.com"
+    STRIPE_HTTP_TIMEOUT_SECONDS: float = 10.0
+    STRIPE_HTTP_MAX_CONCURRENCY: int = 20
+    # Payment retries hand out the order's open checkout session unless it expires within this
+    CHECKOUT_SESSION_REUSE_MARGIN_SECONDS: int = 300
+
+    # Pricing: max age of the in-memory voucher index before it is reloaded
+    VOUCHER_INDEX_TTL_SECONDS: int = 300
+
+    # Catalog search backend ("auto" picks by database dialect)
+    PRODUCT_SEARCH_BACKEND: Literal["auto", "postgres", "sqlite_fts5", "like"] = "auto"
+
+    # Catalog: max age of cached product reads; admin writes in this worker invalidate immediately
+    CATALOG_CACHE_TTL_SECONDS: int = 30
+    CATALOG_CACHE_MAX_ENTRIES: int = 2048
+
+    # Cache-Control for conditional GET endpoints, by policy name
+    CACHE_CONTROL_POLICIES: Dict[str, str] = {
+        "products": "public, max-age=30, stale-while-revalidate=300",
+        "categories": "private, no-cache",
+        "orders": "private, no-cache",
+        "users_me": "private, no-cache",
+        # Content-addressed media URLs never change meaning
+        "media_immutable": "public, max-age=31536000, immutable",
+        "media": "public, max-age=3600",
+    }
+
+    # Product media: uploads are streamed to content-addressed files under MEDIA_ROOT
+    # (sha256 shards, one file per distinct image) on a dedicated thread pool
+    MEDIA_ROOT: str = "media_uploads"
+    MEDIA_URL_PREFIX: str = "/media_uploads"
+    MEDIA_MAX_UPLOAD_BYTES: int = 10 * 1024 * 1024
+    MEDIA_ALLOWED_TYPES: List[str] = ["image/jpeg", "image/png", "image/webp", "image/gif"]
+    MEDIA_UPLOAD_CHUNK_BYTES: int = 256 * 1024
+    MEDIA_UPLOAD_WORKERS: int = 4
+    # Resized WebP variants (by width) rendered on a process pool after each upload,
+    # or on first request when missing, and kept on disk next to the originals
+    MEDIA_VARIANT_WIDTHS: List[int] = [320, 640, 1280]
+    MEDIA_VARIANT_QUALITY: int = 80
+    MEDIA_VARIANT_WORKERS: int = 2
+    MEDIA_VARIANTS_ON_UPLOAD: bool = True
+    # Serving: behind nginx, set an internal location that aliases MEDIA_ROOT and the
+    # app only answers with X-Accel-Redirect; otherwise files are sent by the ASGI
+    # server (zero-copy where it supports the pathsend extension) in large chunks
+    MEDIA_ACCEL_REDIRECT_PREFIX: Optional[str] = None
+    MEDIA_SEND_CHUNK_BYTES: int = 1024 * 1024
+    # Serve `<file>.br` / `<file>.gz` when present and accepted
+    MEDIA_PRECOMPRESSED_SIDECARS: bool = False
+    # Media GC: deleting media only marks rows; the collector purges them in batches,
+    # then walks MEDIA_ROOT (which must hold nothing but media) removing files nothing
+    # references. Files and blobs younger than the grace period are never touched.
+    MEDIA_GC_ENABLED: bool = True
+    MEDIA_GC_INTERVAL_SECONDS: float = 3600.0
+    MEDIA_GC_BATCH_SIZE: int = 500
+    MEDIA_GC_GRACE_SECONDS: float = 3600.0
+    MEDIA_GC_CONCURRENCY: int = 8
+
+    # Checkout stock holds: how long a pending order keeps its stock, and the sweeper
+    # that cancels expired pending orders and returns their stock in batches
+    STOCK_RESERVATION_TTL_SECONDS: int = 1800
+    RESERVATION_SWEEPER_ENABLED: bool = True
+    RESERVATION_SWEEP_INTERVAL_SECONDS: float = 60.0
+    RESERVATION_SWEEP_BATCH_SIZE: int = 500
+
+    # Webhook inbox: background workers per process, claim batch size, how long a
+    # claim is held, and retry policy before an event is dead-lettered
+    WEBHOOK_WORKERS_ENABLED: bool = True
+    WEBHOOK_WORKERS: int = 4
+    WEBHOOK_CLAIM_BATCH_SIZE: int = 10
+    WEBHOOK_LEASE_SECONDS: float = 120.0
+    WEBHOOK_MAX_ATTEMPTS: int = 8
+    WEBHOOK_BACKOFF_BASE_SECONDS: float = 5.0
+    WEBHOOK_BACKOFF_MAX_SECONDS: float = 3600.0
+    WEBHOOK_POLL_INTERVAL_SECONDS: float = 5.0
+
+    # Idempotency-Key: how long responses are kept, how long an unfinished request
+    # holds its key, and how long a duplicate waits for the first one to finish
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_LOCK_SECONDS: float = 60.0
+    IDEMPOTENCY_WAIT_TIMEOUT_SECONDS: float = 15.0
+    IDEMPOTENCY_POLL_INTERVAL_SECONDS: float = 0.2
+    IDEMPOTENCY_PURGE_INTERVAL_SECONDS: float = 3600.0
+
+    # Password hashing: argon2 worker threads and the number of hash/verify calls
+    # allowed to queue or run before requests are rejected with 503
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+
+    # Auth: per-worker cache of authenticated principals keyed by JWT subject
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
 
     class Config:
         case_sensitive = True
@@ -1,12 +1,18 @@
 
+from typing import Any
+
 from fastapi import HTTPException, status
 
 
 class APIException(HTTPException):
-    def __init__(self, status_code: int, code: str, message: str):
-        super().__init__(status_code=status_code, detail={"code": code, "message": message})
+    def __init__(self, status_code: int, code: str, message: str, details: Any = None):
+        detail = {"code": code, "message": message}
+        if details is not None:
+            detail["details"] = details
+        super().__init__(status_code=status_code, detail=detail)
         self.code = code
         self.message = message
+        self.details = details
 
 
 class UnauthorizedException(APIException):
@@ -34,6 +40,20 @@ class ConflictException(APIException):
         super().__init__(status_code=status.HTTP_409_CONFLICT, code="CONFLICT", message=message)
 
 
+class PayloadTooLargeException(APIException):
+    def __init__(self, message: str = "Payload too large."):
+        super().__init__(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE, code="PAYLOAD_TOO_LARGE", message=message
+        )
+
+
+class UnsupportedMediaTypeException(APIException):
+    def __init__(self, message: str = "Unsupported media type."):
+        super().__init__(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, code="UNSUPPORTED_MEDIA_TYPE", message=message
+        )
+
+
 class UnprocessableEntityException(APIException):
     def __init__(self, message: str = "Unprocessable entity."):
         super().__init__(
@@ -46,3 +66,23 @@ class InternalServerErrorException(APIException):
         super().__init__(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, code="INTERNAL_SERVER_ERROR", message=message
         )
+
+
+class ServiceUnavailableException(APIException):
+    def __init__(self, message: str = "Service temporarily unavailable."):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, code="SERVICE_UNAVAILABLE", message=message
+        )
+
+
+class OutOfStockException(APIException):
+    """One entry per order line that cannot be covered: product_id, name, requested, available."""
+
+    def __init__(self, lines: list[dict]):
+        names = ", ".join(line["name"] for line in lines)
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            code="OUT_OF_STOCK",
+            message=f"Insufficient stock for: {names}.",
+            details=lines,
+        )
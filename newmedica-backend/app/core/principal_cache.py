@@ -0,0 +1,114 @@
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.models.user import User
+from app.models.user_type import UserType
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    Slim, session-free view of the authenticated user.
+
+    It exposes the same read-only attributes endpoints use on `User` (id, email,
+    user_type_id, extra_fields). Handlers that write to the user row should use
+    `get_current_db_user` instead.
+    """
+
+    id: uuid.UUID
+    email: str
+    user_type_id: uuid.UUID
+    user_type_name: str
+    version: Optional[datetime]
+    extra_fields: Dict[str, Any] = field(default_factory=dict)
+
+
+class UserTypeNames:
+    """Process-wide UserType id -> name map; reloaded whenever an unknown id shows up."""
+
+    def __init__(self):
+        self._names: Dict[uuid.UUID, str] = {}
+
+    def invalidate(self) -> None:
+        self._names = {}
+
+    async def name_for(self, session: AsyncSession, user_type_id: uuid.UUID) -> Optional[str]:
+        if user_type_id not in self._names:
+            result = await session.execute(select(UserType.id, UserType.name))
+            self._names = dict(result.all())
+        return self._names.get(user_type_id)
+
+
+class PrincipalCache:
+    """
+    TTL + LRU cache of principals keyed by the JWT `sub`.
+
+    Writes through UserRepository.update evict the entry in this worker; the TTL
+    bounds how long changes made by other workers can go unseen.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[uuid.UUID, Tuple[float, Principal]]" = OrderedDict()
+
+    def get(self, user_id: uuid.UUID) -> Optional[Principal]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        cached_at, principal = entry
+        if time.monotonic() - cached_at >= self.ttl_seconds:
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return principal
+
+    def put(self, principal: Principal) -> None:
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+        self._entries[principal.id] = (time.monotonic(), principal)
+        self._entries.move_to_end(principal.id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: uuid.UUID) -> None:
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def load(self, session: AsyncSession, user_id: uuid.UUID) -> Optional[Principal]:
+        principal = self.get(user_id)
+        if principal is not None:
+            return principal
+
+        result = await session.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
+        if user is None:
+            return None
+        user_type_name = await user_type_names.name_for(session, user.user_type_id)
+        principal = Principal(
+            id=user.id,
+            email=user.email,
+            user_type_id=user.user_type_id,
+            user_type_name=user_type_name or "Unknown",
+            version=user.updated_at,
+            extra_fields=dict(user.extra_fields or {}),
+        )
+        self.put(principal)
+        return principal
+
+
+user_type_names = UserTypeNames()
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+)
@@ -0,0 +1,60 @@
+import logging
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.db.query_stats import QueryStats, query_metrics, track_queries
+
+logger = logging.getLogger(__name__)
+
+
+def _route_name(scope: Scope) -> str:
+    """`METHOD /path/{param}`: the matched route template, so metrics stay bounded per route."""
+    if scope.get("route") is None:
+        return f"{scope['method']} <unmatched>"
+    params = {str(value): f"{{{name}}}" for name, value in scope.get("path_params", {}).items()}
+    path = "/".join(params.get(segment, segment) for segment in scope["path"].split("/"))
+    return f"{scope['method']} {path}"
+
+
+class QueryStatsMiddleware:
+    """
+    Tracks the SQL each HTTP request runs and records it in `query_metrics`.
+    With QUERY_STATS_HEADERS on, the counts so far are also sent as
+    X-DB-Queries / X-DB-Rows / X-DB-Time-Ms and a Server-Timing `db` entry.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+
+            async def send_with_stats(message: Message) -> None:
+                if message["type"] == "http.response.start" and settings.QUERY_STATS_HEADERS:
+                    _add_headers(MutableHeaders(scope=message), stats)
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_stats)
+            finally:
+                route = _route_name(scope)
+                query_metrics.record(route, stats)
+                if stats.statements > settings.QUERY_STATS_WARN_STATEMENTS:
+                    logger.warning(
+                        "%s ran %d SQL statements (%d rows, %.1f ms)",
+                        route, stats.statements, stats.rows, stats.db_seconds * 1000,
+                    )
+
+
+def _add_headers(headers: MutableHeaders, stats: QueryStats) -> None:
+    db_ms = stats.db_seconds * 1000
+    headers["X-DB-Queries"] = str(stats.statements)
+    headers["X-DB-Rows"] = str(stats.rows)
+    headers["X-DB-Time-Ms"] = f"{db_ms:.1f}"
+    headers.append("Server-Timing", f"db;dur={db_ms:.1f}")
@@ -1,22 +1,24 @@
 from datetime import datetime, timedelta, timezone
-from typing import Any, Union
+import uuid
+from typing import Any, Optional, Union
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.config import settings
-from app.db.session import get_session
+from app.core.password_hashing import pwd_context
+from app.core.principal_cache import Principal, principal_cache
+from app.db.session import get_session, read_replica_router
 from app.models.user import User
-from app.models.user_type import UserType
 from app.schemas.token import TokenData
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
-
 reusable_oauth2 = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/login")
+optional_oauth2 = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/login", auto_error=False)
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
 
 
 def create_access_token(
@@ -60,8 +62,10 @@ def get_password_hash(password: str) -> str:
 
 
 async def get_current_user(
-    db: AsyncSession = Depends(get_session), token: str = Depends(reusable_oauth2)
-) -> User:
+    request: Request,
+    db: AsyncSession = Depends(get_session),
+    token: str = Depends(reusable_oauth2),
+) -> Principal:
     try:
         payload = jwt.decode(
             token, settings.JWT_SECRET_KEY, algorithms=[settings.ALGORITHM]
@@ -72,26 +76,51 @@ async def get_current_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    result = await db.execute(select(User).where(User.id == token_data.sub))
+    principal = await principal_cache.load(db, token_data.sub)
+    if not principal:
+        raise HTTPException(status_code=404, detail="User not found")
+    if request.method not in SAFE_METHODS:
+        # Keep this user's reads on the primary while replicas catch up
+        read_replica_router.pin(principal.id)
+    return principal
+
+
+async def get_optional_token_subject(
+    token: Optional[str] = Depends(optional_oauth2),
+) -> Optional[uuid.UUID]:
+    """
+    The user id from a valid bearer token, or None. Does not hit the database.
+    """
+    if not token:
+        return None
+    try:
+        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.ALGORITHM])
+        return TokenData(**payload).sub
+    except (JWTError, ValueError):
+        return None
+
+
+async def get_current_db_user(
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_session),
+) -> User:
+    """
+    Load the full, session-attached user row for handlers that modify it.
+    """
+    result = await db.execute(select(User).where(User.id == current_user.id))
     user = result.scalar_one_or_none()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return user  # type: ignore
+    return user
 
 
 async def get_current_admin_user(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_session),
-) -> User:
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     """
     Get current user and check if they are an admin.
     """
-    user_type_result = await db.execute(
-        select(UserType).where(UserType.id == current_user.user_type_id)
-    )
-    user_type = user_type_result.scalar_one_or_none()
-
-    if not user_type or user_type.name != "Admin":
+    if current_user.user_type_name != "Admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User does not have admin privileges",
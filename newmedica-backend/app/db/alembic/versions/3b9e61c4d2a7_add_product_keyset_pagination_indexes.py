@@ -0,0 +1,31 @@
+"""add product keyset pagination indexes
+
+Revision ID: 3b9e61c4d2a7
+Revises: 7d0b087b8ba8
+Create Date: 2026-10-18 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9e61c4d2a7'
+down_revision: Union[str, Sequence[str], None] = '7d0b087b8ba8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_product_name_id', 'product', ['name', 'id'], unique=False)
+    op.create_index('ix_product_price_id', 'product', ['price', 'id'], unique=False)
+    op.create_index('ix_product_updated_at_id', 'product', ['updated_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_product_updated_at_id', table_name='product')
+    op.drop_index('ix_product_price_id', table_name='product')
+    op.drop_index('ix_product_name_id', table_name='product')
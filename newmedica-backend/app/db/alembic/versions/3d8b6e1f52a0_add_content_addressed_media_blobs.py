@@ -0,0 +1,45 @@
+"""add content addressed media blobs
+
+Revision ID: 3d8b6e1f52a0
+Revises: f2a9c6e48b17
+Create Date: 2026-10-18 20:12:05.418220
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d8b6e1f52a0'
+down_revision: Union[str, Sequence[str], None] = 'f2a9c6e48b17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'mediablob',
+        sa.Column('sha256', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+        sa.Column('content_type', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('size_bytes', sa.Integer(), nullable=False),
+        sa.Column('storage_key', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('sha256'),
+    )
+    op.add_column('productmedia', sa.Column('blob_sha256', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.create_foreign_key(
+        'fk_productmedia_blob_sha256_mediablob', 'productmedia', 'mediablob', ['blob_sha256'], ['sha256']
+    )
+    op.create_index('ix_productmedia_blob_sha256', 'productmedia', ['blob_sha256'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_productmedia_blob_sha256', table_name='productmedia')
+    op.drop_constraint('fk_productmedia_blob_sha256_mediablob', 'productmedia', type_='foreignkey')
+    op.drop_column('productmedia', 'blob_sha256')
+    op.drop_table('mediablob')
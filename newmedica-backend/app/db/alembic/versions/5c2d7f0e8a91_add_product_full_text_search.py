@@ -0,0 +1,47 @@
+"""add product full-text search
+
+Revision ID: 5c2d7f0e8a91
+Revises: 3b9e61c4d2a7
+Create Date: 2026-10-18 11:03:27.552130
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.repositories.product_search import POSTGRES_SEARCH_DDL, SQLITE_FTS_DDL
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2d7f0e8a91'
+down_revision: Union[str, Sequence[str], None] = '3b9e61c4d2a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        for statement in POSTGRES_SEARCH_DDL:
+            op.execute(statement)
+    elif dialect == 'sqlite':
+        for statement in SQLITE_FTS_DDL:
+            op.execute(statement)
+        op.execute(
+            "INSERT INTO product_fts(product_id, name, description) "
+            "SELECT id, name, description FROM product"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_product_name_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_product_search_vector")
+        op.drop_column('product', 'search_vector')
+    elif dialect == 'sqlite':
+        for trigger in ('product_fts_au', 'product_fts_ad', 'product_fts_ai'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS product_fts")
@@ -0,0 +1,42 @@
+"""media soft delete and gc
+
+Revision ID: 9b4c2d7e6a15
+Revises: 3d8b6e1f52a0
+Create Date: 2026-10-18 22:41:36.907354
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b4c2d7e6a15'
+down_revision: Union[str, Sequence[str], None] = '3d8b6e1f52a0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('productmedia', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        'ix_productmedia_deleted_at',
+        'productmedia',
+        ['deleted_at'],
+        unique=False,
+        postgresql_where=sa.text('deleted_at IS NOT NULL'),
+    )
+    op.add_column(
+        'mediablob',
+        sa.Column('last_uploaded_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.alter_column('mediablob', 'last_uploaded_at', server_default=None)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('mediablob', 'last_uploaded_at')
+    op.drop_index('ix_productmedia_deleted_at', table_name='productmedia')
+    op.drop_column('productmedia', 'deleted_at')
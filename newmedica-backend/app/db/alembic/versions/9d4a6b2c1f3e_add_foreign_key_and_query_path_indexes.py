@@ -0,0 +1,74 @@
+"""add foreign key and query path indexes
+
+Revision ID: 9d4a6b2c1f3e
+Revises: 5c2d7f0e8a91
+Create Date: 2026-10-18 14:26:08.904417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4a6b2c1f3e'
+down_revision: Union[str, Sequence[str], None] = '5c2d7f0e8a91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Non-unique indexes on primary keys (already indexed by the PK constraint), plus
+# ix_product_name which is a prefix of ix_product_name_id.
+REDUNDANT_INDEXES = [
+    ('ix_category_id', 'category', ['id']),
+    ('ix_usertype_id', 'usertype', ['id']),
+    ('ix_product_id', 'product', ['id']),
+    ('ix_product_name', 'product', ['name']),
+    ('ix_user_id', 'user', ['id']),
+    ('ix_address_id', 'address', ['id']),
+    ('ix_cart_id', 'cart', ['id']),
+    ('ix_order_id', 'order', ['id']),
+    ('ix_productmedia_id', 'productmedia', ['id']),
+    ('ix_cartitem_id', 'cartitem', ['id']),
+    ('ix_orderitem_id', 'orderitem', ['id']),
+    ('ix_voucher_id', 'voucher', ['id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_cartitem_cart_id_product_id', 'cartitem', ['cart_id', 'product_id'], unique=False)
+    op.create_index('ix_orderitem_order_id', 'orderitem', ['order_id'], unique=False)
+    op.create_index('ix_order_user_id_created_at_id', 'order', ['user_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_address_user_id', 'address', ['user_id'], unique=False)
+    op.create_index(
+        'ix_productmedia_product_id_display_order', 'productmedia', ['product_id', 'display_order'], unique=False
+    )
+    op.create_index('ix_product_category_id', 'product', ['category_id'], unique=False)
+    op.create_index('ix_voucherproductlink_product_id', 'voucherproductlink', ['product_id'], unique=False)
+    op.create_index(
+        'ix_voucher_active_scope_target_user_type',
+        'voucher',
+        ['scope', 'target_user_type_id'],
+        unique=False,
+        postgresql_where=sa.text('is_active'),
+        sqlite_where=sa.text('is_active = 1'),
+    )
+
+    for name, table, _ in REDUNDANT_INDEXES:
+        op.drop_index(name, table_name=table)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, columns in reversed(REDUNDANT_INDEXES):
+        op.create_index(name, table, columns, unique=False)
+
+    op.drop_index('ix_voucher_active_scope_target_user_type', table_name='voucher')
+    op.drop_index('ix_voucherproductlink_product_id', table_name='voucherproductlink')
+    op.drop_index('ix_product_category_id', table_name='product')
+    op.drop_index('ix_productmedia_product_id_display_order', table_name='productmedia')
+    op.drop_index('ix_address_user_id', table_name='address')
+    op.drop_index('ix_order_user_id_created_at_id', table_name='order')
+    op.drop_index('ix_orderitem_order_id', table_name='orderitem')
+    op.drop_index('ix_cartitem_cart_id_product_id', table_name='cartitem')
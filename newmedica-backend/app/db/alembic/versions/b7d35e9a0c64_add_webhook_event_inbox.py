@@ -0,0 +1,49 @@
+"""add webhook event inbox
+
+Revision ID: b7d35e9a0c64
+Revises: e4f1a7c3b852
+Create Date: 2026-10-18 17:20:13.084561
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d35e9a0c64'
+down_revision: Union[str, Sequence[str], None] = 'e4f1a7c3b852'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'webhookevent',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('provider', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('event_id', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('event_type', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('payload', sa.Text(), nullable=False),
+        sa.Column('status', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('provider', 'event_id', name='uq_webhookevent_provider_event_id'),
+    )
+    op.create_index(
+        'ix_webhookevent_status_next_attempt_at', 'webhookevent', ['status', 'next_attempt_at'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_webhookevent_status_next_attempt_at', table_name='webhookevent')
+    op.drop_table('webhookevent')
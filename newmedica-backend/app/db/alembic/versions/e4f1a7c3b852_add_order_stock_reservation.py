@@ -0,0 +1,34 @@
+"""add order stock reservation
+
+Revision ID: e4f1a7c3b852
+Revises: 9d4a6b2c1f3e
+Create Date: 2026-10-18 16:02:41.517203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4f1a7c3b852'
+down_revision: Union[str, Sequence[str], None] = '9d4a6b2c1f3e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing pending orders never took stock, so they get no hold (NULL) and
+    # are left alone by the reservation sweeper.
+    op.add_column('order', sa.Column('reserved_until', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        'ix_order_payment_status_reserved_until', 'order', ['payment_status', 'reserved_until'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_order_payment_status_reserved_until', table_name='order')
+    op.drop_column('order', 'reserved_until')
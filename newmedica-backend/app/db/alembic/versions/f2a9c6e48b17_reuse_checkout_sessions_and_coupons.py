@@ -0,0 +1,46 @@
+"""reuse checkout sessions and coupons
+
+Revision ID: f2a9c6e48b17
+Revises: c58e2f19d7a3
+Create Date: 2026-10-18 18:47:30.662104
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a9c6e48b17'
+down_revision: Union[str, Sequence[str], None] = 'c58e2f19d7a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('order', sa.Column('checkout_session_id', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.add_column('order', sa.Column('checkout_session_url', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.add_column('order', sa.Column('checkout_session_expires_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('order', sa.Column('checkout_coupon_id', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.create_table(
+        'paymentcoupon',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('amount_off', sa.Integer(), nullable=False),
+        sa.Column('currency', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('coupon_id', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('amount_off', 'currency', name='uq_paymentcoupon_amount_off_currency'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('paymentcoupon')
+    op.drop_column('order', 'checkout_coupon_id')
+    op.drop_column('order', 'checkout_session_expires_at')
+    op.drop_column('order', 'checkout_session_url')
+    op.drop_column('order', 'checkout_session_id')
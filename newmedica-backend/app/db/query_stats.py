@@ -0,0 +1,110 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+@dataclass
+class QueryStats:
+    """Statements, rows and database time within one tracking scope (usually a request)."""
+
+    statements: int = 0
+    rows: int = 0
+    db_seconds: float = 0.0
+
+    def add(self, other: "QueryStats") -> None:
+        self.statements += other.statements
+        self.rows += other.rows
+        self.db_seconds += other.db_seconds
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """
+    Counts the statements executed in this context (and tasks it spawns) on
+    instrumented engines. Scopes nest: an inner scope's totals are added to the
+    enclosing one when it exits.
+    """
+    stats = QueryStats()
+    parent = _current.get()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+        if parent is not None:
+            parent.add(stats)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current.get() is not None:
+        conn.info["query_started"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current.get()
+    if stats is None:
+        return
+    started = conn.info.pop("query_started", None)
+    if started is not None:
+        stats.db_seconds += time.perf_counter() - started
+    stats.statements += 1
+    # The async driver adapters buffer a result's rows before returning; DML reports rowcount
+    buffered = getattr(cursor, "_rows", None) if cursor.description else None
+    stats.rows += len(buffered) if buffered is not None else max(cursor.rowcount, 0)
+
+
+def instrument_engine(engine: AsyncEngine | Engine) -> None:
+    sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryMetrics:
+    """
+    Per-route query totals for this worker, fed by the request middleware and
+    reported by GET /admin/metrics. Listeners see every request as it is recorded.
+    """
+
+    def __init__(self) -> None:
+        self._routes: Dict[str, Dict[str, float]] = {}
+        self.listeners: List[Callable[[str, QueryStats], Any]] = []
+
+    def record(self, route: str, stats: QueryStats) -> None:
+        totals = self._routes.setdefault(
+            route, {"requests": 0, "statements": 0, "rows": 0, "db_seconds": 0.0, "max_statements": 0}
+        )
+        totals["requests"] += 1
+        totals["statements"] += stats.statements
+        totals["rows"] += stats.rows
+        totals["db_seconds"] += stats.db_seconds
+        totals["max_statements"] = max(totals["max_statements"], stats.statements)
+        for listener in self.listeners:
+            listener(route, stats)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            route: {
+                "requests": totals["requests"],
+                "avg_statements": totals["statements"] / totals["requests"],
+                "max_statements": totals["max_statements"],
+                "avg_rows": totals["rows"] / totals["requests"],
+                "avg_db_ms": totals["db_seconds"] / totals["requests"] * 1000,
+            }
+            for route, totals in sorted(self._routes.items())
+        }
+
+    def reset(self) -> None:
+        self._routes.clear()
+
+
+query_metrics = QueryMetrics()
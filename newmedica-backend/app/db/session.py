@@ -1,9 +1,50 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import asyncio
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
-from app.core.config import settings
+from app.core.config import Settings, settings
+from app.db.query_stats import instrument_engine
+
+
+def engine_options(database_url: str, config: Settings = settings) -> Dict[str, Any]:
+    """
+    Translate the DB_* settings into `create_async_engine` keyword arguments for
+    the given URL's backend and driver.
+    """
+    options: Dict[str, Any] = {"echo": config.DB_ECHO, "future": True}
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        return options
 
-engine = create_async_engine(settings.DATABASE_URL, echo=True, future=True)
+    options.update(
+        pool_size=config.DB_POOL_SIZE,
+        max_overflow=config.DB_MAX_OVERFLOW,
+        pool_timeout=config.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=config.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=config.DB_POOL_PRE_PING,
+    )
+    if url.get_driver_name() == "asyncpg":
+        connect_args: Dict[str, Any] = {
+            "statement_cache_size": config.DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": config.DB_STATEMENT_CACHE_SIZE,
+        }
+        if config.DB_STATEMENT_TIMEOUT_MS > 0:
+            connect_args["server_settings"] = {
+                "statement_timeout": str(config.DB_STATEMENT_TIMEOUT_MS)
+            }
+        options["connect_args"] = connect_args
+    return options
+
+
+engine = create_async_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
+instrument_engine(engine)
 
 AsyncSessionLocal = sessionmaker(
     engine,
@@ -12,6 +53,125 @@ AsyncSessionLocal = sessionmaker(
 )  # type: ignore
 
 
+# Replication lag in seconds; 0 when the server is not a standby or has replayed
+# everything it received (an idle primary would otherwise look like lag).
+POSTGRES_REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() "
+    "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class ReadReplicaRouter:
+    """
+    Picks the engine for read-only sessions.
+
+    Reads go to the replica unless none is configured, its last health check
+    failed or showed too much lag, or the user wrote recently (read-your-writes
+    pin). Health is re-checked at most every `check_interval_seconds`; requests
+    arriving while a check is running use the previous result.
+    """
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replica: Optional[AsyncEngine],
+        max_lag_seconds: float,
+        check_interval_seconds: float,
+        pin_seconds: float,
+    ):
+        self.primary = primary
+        self.replica = replica
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self.pin_seconds = pin_seconds
+        self._replica_ok = False
+        self._checked_at: Optional[float] = None
+        self._checking = False
+        self._pins: Dict[uuid.UUID, float] = {}
+        self._sessionmakers = {
+            db_engine: sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+            for db_engine in (primary, replica)
+            if db_engine is not None
+        }
+
+    def pin(self, user_id: uuid.UUID) -> None:
+        now = time.monotonic()
+        self._pins[user_id] = now + self.pin_seconds
+        if len(self._pins) > 10000:
+            self._pins = {uid: until for uid, until in self._pins.items() if until > now}
+
+    def is_pinned(self, user_id: Optional[uuid.UUID]) -> bool:
+        if user_id is None:
+            return False
+        until = self._pins.get(user_id)
+        if until is None:
+            return False
+        if until <= time.monotonic():
+            self._pins.pop(user_id, None)
+            return False
+        return True
+
+    async def _measure_lag(self) -> float:
+        async with self.replica.connect() as conn:  # type: ignore[union-attr]
+            if conn.dialect.name == "postgresql":
+                return float((await conn.execute(POSTGRES_REPLICA_LAG_SQL)).scalar() or 0)
+            await conn.execute(text("SELECT 1"))
+            return 0.0
+
+    async def _replica_usable(self) -> bool:
+        now = time.monotonic()
+        stale = self._checked_at is None or now - self._checked_at >= self.check_interval_seconds
+        if stale and not self._checking:
+            self._checking = True
+            try:
+                lag = await asyncio.wait_for(self._measure_lag(), timeout=self.check_interval_seconds)
+                self._replica_ok = lag <= self.max_lag_seconds
+            except (OperationalError, DBAPIError, OSError, asyncio.TimeoutError):
+                self._replica_ok = False
+            finally:
+                self._checked_at = time.monotonic()
+                self._checking = False
+        return self._replica_ok
+
+    async def engine_for(self, user_id: Optional[uuid.UUID] = None) -> AsyncEngine:
+        if self.replica is None or self.is_pinned(user_id):
+            return self.primary
+        return self.replica if await self._replica_usable() else self.primary
+
+    async def session_for(self, user_id: Optional[uuid.UUID] = None) -> AsyncSession:
+        return self._sessionmakers[await self.engine_for(user_id)]()
+
+
+replica_engine = (
+    create_async_engine(settings.READ_REPLICA_URL, **engine_options(settings.READ_REPLICA_URL))
+    if settings.READ_REPLICA_URL
+    else None
+)
+if replica_engine is not None:
+    instrument_engine(replica_engine)
+
+read_replica_router = ReadReplicaRouter(
+    primary=engine,
+    replica=replica_engine,
+    max_lag_seconds=settings.READ_REPLICA_MAX_LAG_SECONDS,
+    check_interval_seconds=settings.READ_REPLICA_CHECK_INTERVAL_SECONDS,
+    pin_seconds=settings.READ_YOUR_WRITES_SECONDS,
+)
+
+
+async def warm_up_engine(
+    db_engine: AsyncEngine = engine, connections: int = settings.DB_WARMUP_CONNECTIONS
+) -> None:
+    """Open `connections` pooled connections concurrently and return them to the pool."""
+
+    async def _ping() -> None:
+        async with db_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(_ping() for _ in range(max(connections, 1))))
+
+
 async def get_session() -> AsyncSession:  # type: ignore
     async with AsyncSessionLocal() as session:
         yield session
@@ -1,22 +1,65 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request, status
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1.api import api_router
+from app.api.media_files import media_files
 from app.api.v1.endpoints import webhooks
 from app.core.config import settings
 from app.core.exceptions import APIException
+from app.core.password_hashing import password_hasher
+from app.core.request_metrics import QueryStatsMiddleware
+from app.db.session import engine, replica_engine, warm_up_engine
+from app.repositories.product_search import verify_product_search
+from app.services.idempotency import idempotency_store
+from app.services.media_gc import media_collector
+from app.services.media_storage import media_storage
+from app.services.media_variants import media_variants
+from app.services.payment_gateway import close_payment_gateway
+from app.services.reservation_sweeper import reservation_sweeper
+from app.services.webhook_inbox import stripe_webhook_inbox
+
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await warm_up_engine()
+    await verify_product_search(engine)
+    if settings.RESERVATION_SWEEPER_ENABLED:
+        reservation_sweeper.start()
+    if settings.WEBHOOK_WORKERS_ENABLED:
+        stripe_webhook_inbox.start()
+    if settings.MEDIA_GC_ENABLED:
+        media_collector.start()
+    idempotency_store.start()
+    yield
+    await media_collector.stop()
+    await idempotency_store.stop()
+    await stripe_webhook_inbox.stop()
+    await reservation_sweeper.stop()
+    await close_payment_gateway()
+    password_hasher.shutdown()
+    media_variants.shutdown()
+    media_storage.shutdown()
+    await engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
 
-app = FastAPI(title=settings.PROJECT_NAME, openapi_url=f"{settings.API_V1_STR}/openapi.json")
+
+app = FastAPI(
+    title=settings.PROJECT_NAME,
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
+)
 
 
 @app.exception_handler(APIException)
 async def api_exception_handler(request: Request, exc: APIException):
-    return JSONResponse(
-        status_code=exc.status_code,
-        content={"error": {"code": exc.code, "message": exc.message}},
-    )
+    error = {"code": exc.code, "message": exc.message}
+    if exc.details is not None:
+        error["details"] = exc.details
+    return JSONResponse(status_code=exc.status_code, content={"error": error})
 
 
 app.add_middleware(
@@ -27,8 +70,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(QueryStatsMiddleware)
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
 app.include_router(webhooks.router, prefix=f"{settings.API_V1_STR}/webhooks", tags=["webhooks"])
+app.mount(settings.MEDIA_URL_PREFIX, media_files)
 
 
 @app.get("/")
@@ -2,18 +2,23 @@ from .user_type import UserType
 from .user import User
 from .category import Category
 from .product import Product
+from .media_blob import MediaBlob
 from .product_media import ProductMedia
 from .voucher import Voucher, UserVoucher, VoucherProductLink, VoucherScope, DiscountType
 from .address import Address
 from .cart import Cart, CartItem
 from .order import Order, OrderItem
 from .shipping_config import ShippingConfig
+from .webhook_event import WebhookEvent
+from .idempotency_key import IdempotencyKey
+from .payment_coupon import PaymentCoupon
 
 __all__ = [
     "UserType",
     "User",
     "Category",
     "Product",
+    "MediaBlob",
     "ProductMedia",
     "Voucher",
     "UserVoucher",
@@ -26,4 +31,7 @@ __all__ = [
     "Order",
     "OrderItem",
     "ShippingConfig",
+    "WebhookEvent",
+    "IdempotencyKey",
+    "PaymentCoupon",
 ]
\ No newline at end of file
@@ -3,13 +3,15 @@ from datetime import datetime, timezone
 from typing import TYPE_CHECKING, List, Optional
 
 from sqlmodel import Field, Relationship, SQLModel
-from sqlalchemy import Column, DateTime
+from sqlalchemy import Column, DateTime, Index
 
 if TYPE_CHECKING:
     from .user import User
 
 class Address(SQLModel, table=True):
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True, index=True)
+    __table_args__ = (Index("ix_address_user_id", "user_id"),)
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     user_id: uuid.UUID = Field(foreign_key="user.id")
     
     first_name: str
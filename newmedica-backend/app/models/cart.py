@@ -3,14 +3,14 @@ from datetime import datetime, timezone
 from typing import TYPE_CHECKING, List, Optional
 
 from sqlmodel import Field, Relationship, SQLModel
-from sqlalchemy import Column, DateTime
+from sqlalchemy import Column, DateTime, Index
 
 if TYPE_CHECKING:
     from .user import User
     from .product import Product
 
 class Cart(SQLModel, table=True):
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True, index=True)
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     user_id: uuid.UUID = Field(foreign_key="user.id", unique=True, index=True)
     created_at: datetime = Field(sa_column=Column(DateTime(timezone=True), nullable=False), default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(
@@ -19,10 +19,12 @@ class Cart(SQLModel, table=True):
     )
 
     user: "User" = Relationship()
-    items: List["CartItem"] = Relationship(back_populates="cart", sa_relationship_kwargs={"lazy": "joined"})
+    items: List["CartItem"] = Relationship(back_populates="cart")
 
 class CartItem(SQLModel, table=True):
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True, index=True)
+    __table_args__ = (Index("ix_cartitem_cart_id_product_id", "cart_id", "product_id"),)
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     cart_id: uuid.UUID = Field(foreign_key="cart.id")
     product_id: uuid.UUID = Field(foreign_key="product.id")
     quantity: int
@@ -33,7 +35,7 @@ class CartItem(SQLModel, table=True):
     )
 
     cart: "Cart" = Relationship(back_populates="items")
-    product: "Product" = Relationship(sa_relationship_kwargs={"lazy": "joined"})
+    product: "Product" = Relationship()
 
     @property
     def price(self) -> float:
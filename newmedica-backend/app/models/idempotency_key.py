@@ -0,0 +1,31 @@
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Index, Text, UniqueConstraint
+from sqlmodel import Field, SQLModel
+
+
+class IdempotencyKey(SQLModel, table=True):
+    """
+    A client's Idempotency-Key for one user, with the stored response once the
+    request completed. While in_progress, locked_until bounds how long other
+    requests wait before assuming the owner died and taking the key over.
+    """
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "key", name="uq_idempotencykey_user_id_key"),
+        Index("ix_idempotencykey_expires_at", "expires_at"),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    user_id: uuid.UUID = Field(foreign_key="user.id")
+    key: str = Field(max_length=255)
+    request_hash: str
+    status: str = Field(default="in_progress")
+    response_status: int | None = None
+    response_body: str | None = Field(default=None, sa_column=Column(Text, nullable=True))
+    locked_until: datetime = Field(sa_column=Column(DateTime(timezone=True), nullable=False))
+    expires_at: datetime = Field(sa_column=Column(DateTime(timezone=True), nullable=False))
+    created_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False), default_factory=lambda: datetime.now(timezone.utc)
+    )
@@ -0,0 +1,24 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime
+from sqlmodel import Field, SQLModel
+
+
+class MediaBlob(SQLModel, table=True):
+    """One stored media file, addressed by the sha256 of its content and shared by every ProductMedia using it."""
+
+    __tablename__ = "mediablob"
+
+    sha256: str = Field(primary_key=True, max_length=64)
+    content_type: str
+    size_bytes: int
+    # Path relative to MEDIA_ROOT
+    storage_key: str
+    created_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False), default_factory=lambda: datetime.now(timezone.utc)
+    )
+    # Bumped whenever the same content is uploaded again; the media GC leaves recently
+    # uploaded blobs alone so an upload in flight never loses its file
+    last_uploaded_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False), default_factory=lambda: datetime.now(timezone.utc)
+    )
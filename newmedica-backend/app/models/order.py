@@ -3,11 +3,19 @@ from datetime import datetime, timezone
 from typing import TYPE_CHECKING, List
 
 from sqlmodel import Field, Relationship, SQLModel, Column, JSON
-from sqlalchemy import Column as SAColumn, DateTime
+from sqlalchemy import Column as SAColumn, DateTime, Index
 
 
 class Order(SQLModel, table=True):
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True, index=True)
+    __table_args__ = (
+        # Order history: a user's orders, newest first
+        Index("ix_order_user_id_created_at_id", "user_id", "created_at", "id"),
+        # Reservation sweeper: pending orders by hold expiry. Not a partial index,
+        # since the status is a bound parameter and would not match its predicate.
+        Index("ix_order_payment_status_reserved_until", "payment_status", "reserved_until"),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     user_id: uuid.UUID = Field(foreign_key="user.id")
     # Amounts
     subtotal_amount: float = Field(default=0.0)
@@ -19,11 +27,20 @@ class Order(SQLModel, table=True):
     payment_status: str = Field(default="pending")
     payment_method: str | None = None
     payment_intent_id: str | None = None
+    # Current hosted checkout session, reused by payment retries while it is open
+    checkout_session_id: str | None = None
+    checkout_session_url: str | None = None
+    checkout_session_expires_at: datetime | None = Field(
+        default=None, sa_column=SAColumn(DateTime(timezone=True), nullable=True)
+    )
+    checkout_coupon_id: str | None = None
     # Addresses & remark
     shipping_address: dict | None = Field(default=None, sa_column=Column(JSON))
     billing_address: dict | None = Field(default=None, sa_column=Column(JSON))
     remark: str | None = None
     applied_voucher_code: str | None = Field(default=None)
+    # Stock held for this order is released once this passes while still pending
+    reserved_until: datetime | None = Field(default=None, sa_column=SAColumn(DateTime(timezone=True), nullable=True))
     created_at: datetime = Field(sa_column=SAColumn(DateTime(timezone=True), nullable=False), default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc),
@@ -34,7 +51,9 @@ class Order(SQLModel, table=True):
 
 
 class OrderItem(SQLModel, table=True):
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True, index=True)
+    __table_args__ = (Index("ix_orderitem_order_id", "order_id"),)
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     order_id: uuid.UUID = Field(foreign_key="order.id")
     product_id: uuid.UUID = Field(foreign_key="product.id")
     quantity: int
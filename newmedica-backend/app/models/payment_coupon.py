@@ -0,0 +1,20 @@
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, UniqueConstraint
+from sqlmodel import Field, SQLModel
+
+
+class PaymentCoupon(SQLModel, table=True):
+    """A provider coupon for a fixed amount off, shared by every order with that discount."""
+
+    __table_args__ = (UniqueConstraint("amount_off", "currency", name="uq_paymentcoupon_amount_off_currency"),)
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    # Minor units (cents/sen), as sent to the provider
+    amount_off: int
+    currency: str
+    coupon_id: str
+    created_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False), default_factory=lambda: datetime.now(timezone.utc)
+    )
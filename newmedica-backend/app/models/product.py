@@ -4,7 +4,7 @@ from typing import TYPE_CHECKING, List
 
 from sqlmodel import Field, Relationship, SQLModel
 from .voucher import VoucherProductLink
-from sqlalchemy import Column, DateTime
+from sqlalchemy import Column, DateTime, Index
 
 if TYPE_CHECKING:
     from .category import Category
@@ -13,8 +13,17 @@ if TYPE_CHECKING:
 
 
 class Product(SQLModel, table=True):
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True, index=True)
-    name: str = Field(index=True)
+    # Composite (sort column, id) indexes back keyset pagination of the catalog;
+    # ix_product_name_id also serves lookups by name
+    __table_args__ = (
+        Index("ix_product_name_id", "name", "id"),
+        Index("ix_product_price_id", "price", "id"),
+        Index("ix_product_updated_at_id", "updated_at", "id"),
+        Index("ix_product_category_id", "category_id"),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    name: str
     description: str
     price: float
     stock: int
@@ -29,6 +38,10 @@ class Product(SQLModel, table=True):
 
     media: List["ProductMedia"] = Relationship(
         back_populates="product",
-        sa_relationship_kwargs={"order_by": "ProductMedia.display_order"},
+        sa_relationship_kwargs={
+            "order_by": "ProductMedia.display_order",
+            # Applied by loader plans: deleted media stay in the table until the media GC purges them
+            "info": {"loader_criteria": lambda media: media.deleted_at.is_(None)},
+        },
     )
     vouchers: List["Voucher"] = Relationship(link_model=VoucherProductLink)
\ No newline at end of file
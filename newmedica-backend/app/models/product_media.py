@@ -3,7 +3,7 @@ from datetime import datetime, timezone
 from typing import TYPE_CHECKING
 
 from sqlmodel import Field, SQLModel, Relationship
-from sqlalchemy import Column, DateTime
+from sqlalchemy import Column, DateTime, Index, text
 
 if TYPE_CHECKING:
     from .product import Product
@@ -11,13 +11,24 @@ if TYPE_CHECKING:
 
 class ProductMedia(SQLModel, table=True):
     __tablename__ = "productmedia"
+    # Matches Product.media, which loads a product's media ordered by display_order
+    __table_args__ = (
+        Index("ix_productmedia_product_id_display_order", "product_id", "display_order"),
+        Index("ix_productmedia_blob_sha256", "blob_sha256"),
+        # Only marked rows are indexed: the media GC's purge scans them
+        Index("ix_productmedia_deleted_at", "deleted_at", postgresql_where=text("deleted_at IS NOT NULL")),
+    )
 
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True, index=True)
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     product_id: uuid.UUID = Field(foreign_key="product.id")
 
     url: str
+    # Stored file behind `url`; None for media recorded before content-addressed storage
+    blob_sha256: str | None = Field(default=None, foreign_key="mediablob.sha256")
     alt_text: str
     display_order: int = Field(default=0)
+    # Set when the media is deleted; the row (and any file only it used) is removed by the media GC
+    deleted_at: datetime | None = Field(default=None, sa_column=Column(DateTime(timezone=True), nullable=True))
     created_at: datetime = Field(sa_column=Column(DateTime(timezone=True), nullable=False), default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc),
@@ -12,7 +12,7 @@ if TYPE_CHECKING:
 from .voucher import UserVoucher
 
 class User(SQLModel, table=True):
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True, index=True)
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     email: str = Field(unique=True, index=True)
     password_hash: str
     user_type_id: uuid.UUID = Field(foreign_key="usertype.id")
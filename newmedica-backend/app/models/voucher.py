@@ -3,7 +3,7 @@ import enum
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING, List, Optional
 
-from sqlalchemy import Column, DateTime, String
+from sqlalchemy import Column, DateTime, Index, String, text
 from sqlmodel import Field, Relationship, SQLModel
 
 if TYPE_CHECKING:
@@ -30,6 +30,9 @@ class UserVoucher(SQLModel, table=True):
     )
 
 class VoucherProductLink(SQLModel, table=True):
+    # The primary key covers voucher -> products; this covers product -> vouchers
+    __table_args__ = (Index("ix_voucherproductlink_product_id", "product_id"),)
+
     voucher_id: uuid.UUID = Field(foreign_key="voucher.id", primary_key=True)
     product_id: uuid.UUID = Field(foreign_key="product.id", primary_key=True)
 
@@ -44,7 +47,19 @@ class DiscountType(str, enum.Enum):
     PERCENT = "percent"
 
 class Voucher(SQLModel, table=True):
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True, index=True)
+    # Active vouchers by scope/target. The predicate is spelled the way each
+    # dialect renders `Voucher.is_active == True` so the planners can match it.
+    __table_args__ = (
+        Index(
+            "ix_voucher_active_scope_target_user_type",
+            "scope",
+            "target_user_type_id",
+            postgresql_where=text("is_active"),
+            sqlite_where=text("is_active = 1"),
+        ),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     code: str = Field(
         sa_column=Column(String, unique=True, index=True, nullable=False)
     )
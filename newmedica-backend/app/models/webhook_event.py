@@ -0,0 +1,41 @@
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Index, Text, UniqueConstraint
+from sqlmodel import Field, SQLModel
+
+
+class WebhookEvent(SQLModel, table=True):
+    """
+    Inbox row for a received webhook event, stored once per (provider, event_id).
+
+    status: pending -> processing -> processed, or dead once max attempts are
+    used up. next_attempt_at is when a pending row is due; while processing it
+    is the claim's lease, after which another worker may take the row again.
+    """
+
+    __table_args__ = (
+        UniqueConstraint("provider", "event_id", name="uq_webhookevent_provider_event_id"),
+        # Workers: claimable events by due time
+        Index("ix_webhookevent_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    provider: str
+    event_id: str
+    event_type: str
+    payload: str = Field(sa_column=Column(Text, nullable=False))
+    status: str = Field(default="pending")
+    attempts: int = Field(default=0)
+    last_error: str | None = Field(default=None, sa_column=Column(Text, nullable=True))
+    next_attempt_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False), default_factory=lambda: datetime.now(timezone.utc)
+    )
+    processed_at: datetime | None = Field(default=None, sa_column=Column(DateTime(timezone=True), nullable=True))
+    created_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False), default_factory=lambda: datetime.now(timezone.utc)
+    )
+    updated_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column=Column(DateTime(timezone=True), nullable=False, onupdate=lambda: datetime.now(timezone.utc)),
+    )
@@ -1,30 +1,32 @@
 from uuid import UUID
-from sqlalchemy.orm import selectinload
+from sqlalchemy import delete
 from sqlmodel import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.schemas.cart import CartItemCreate
+from app.repositories.loader_plan import loader_options
+from app.schemas.cart import CartItemCreate, CartRead
 from app.models.cart import Cart, CartItem
-from app.models.product import Product
-from app.models.category import Category
 
 class CartRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def get_cart_by_user_id(self, user_id: UUID) -> Cart | None:
+    async def get_cart_by_user_id(self, user_id: UUID, reload: bool = False) -> Cart | None:
+        """
+        Loads the cart with everything CartRead serializes. `reload` overwrites a
+        cart already in the session, e.g. after its items changed.
+        """
         result = await self.session.execute(
-            select(Cart).where(Cart.user_id == user_id).options(
-                selectinload(Cart.items).selectinload(CartItem.product).selectinload(Product.category),
-                selectinload(Cart.items).selectinload(CartItem.product).selectinload(Product.media)
-            )
+            select(Cart)
+            .where(Cart.user_id == user_id)
+            .options(*loader_options(Cart, CartRead))
+            .execution_options(populate_existing=reload)
         )
         return result.scalar_one_or_none()
 
     async def create_cart_for_user(self, user_id: UUID) -> Cart:
-        cart = Cart(user_id=user_id)
+        cart = Cart(user_id=user_id, items=[])
         self.session.add(cart)
         await self.session.commit()
-        await self.session.refresh(cart)
         return cart
 
     async def get_or_create_cart_by_user_id(self, user_id: UUID) -> Cart:
@@ -65,7 +67,7 @@ class CartRepository:
             item_to_update.quantity = quantity
             self.session.add(item_to_update)
             await self.session.commit()
-            await self.session.refresh(cart)
+            cart = await self.get_cart_by_user_id(user_id, reload=True)
             
         return cart
 
@@ -77,6 +79,10 @@ class CartRepository:
         if item_to_remove:
             await self.session.delete(item_to_remove)
             await self.session.commit()
-            await self.session.refresh(cart)
+            cart = await self.get_cart_by_user_id(user_id, reload=True)
             
-        return cart
\ No newline at end of file
+        return cart
+
+    async def clear_cart_items(self, cart_id: UUID) -> None:
+        """Deletes every item in the cart with one statement, without committing."""
+        await self.session.execute(delete(CartItem).where(CartItem.cart_id == cart_id))
@@ -0,0 +1,114 @@
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.idempotency_key import IdempotencyKey
+from app.utils.upsert import dialect_insert
+
+
+class IdempotencyRepository:
+    """
+    Every method but `complete` commits: key state must be visible to concurrent
+    requests immediately. `complete` joins the caller's transaction instead, so
+    the response is stored atomically with the work that produced it.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def claim(
+        self, user_id: uuid.UUID, key: str, request_hash: str, now: datetime, lock_seconds: float, ttl_seconds: float
+    ) -> bool:
+        """Inserts an in_progress key; False if (user_id, key) already exists."""
+        values = {
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "key": key,
+            "request_hash": request_hash,
+            "status": "in_progress",
+            "locked_until": now + timedelta(seconds=lock_seconds),
+            "expires_at": now + timedelta(seconds=ttl_seconds),
+            "created_at": now,
+        }
+        insert = dialect_insert(self.session)
+        if insert is not None:
+            result = await self.session.execute(
+                insert(IdempotencyKey).values(**values).on_conflict_do_nothing(index_elements=["user_id", "key"])
+            )
+            await self.session.commit()
+            return result.rowcount == 1
+
+        self.session.add(IdempotencyKey(**values))
+        try:
+            await self.session.commit()
+        except IntegrityError:
+            await self.session.rollback()
+            return False
+        return True
+
+    async def get(self, user_id: uuid.UUID, key: str) -> IdempotencyKey | None:
+        result = await self.session.execute(
+            select(IdempotencyKey)
+            .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+            .execution_options(populate_existing=True)
+        )
+        record = result.scalar_one_or_none()
+        # End the read transaction so the next poll sees other requests' commits
+        await self.session.commit()
+        return record
+
+    async def take_over(
+        self, record_id: uuid.UUID, request_hash: str, now: datetime, lock_seconds: float, ttl_seconds: float
+    ) -> bool:
+        """
+        Restarts an expired key, or an in_progress one for the same request whose
+        owner's lock lapsed.
+        """
+        result = await self.session.execute(
+            update(IdempotencyKey)
+            .where(
+                IdempotencyKey.id == record_id,
+                or_(
+                    IdempotencyKey.expires_at < now,
+                    (IdempotencyKey.status == "in_progress")
+                    & (IdempotencyKey.locked_until < now)
+                    & (IdempotencyKey.request_hash == request_hash),
+                ),
+            )
+            .values(
+                request_hash=request_hash,
+                status="in_progress",
+                response_status=None,
+                response_body=None,
+                locked_until=now + timedelta(seconds=lock_seconds),
+                expires_at=now + timedelta(seconds=ttl_seconds),
+                created_at=now,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+        return result.rowcount == 1
+
+    async def complete(self, user_id: uuid.UUID, key: str, response_status: int, response_body: str) -> None:
+        await self.session.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+            .values(status="completed", response_status=response_status, response_body=response_body)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def release(self, user_id: uuid.UUID, key: str) -> None:
+        await self.session.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+        )
+        await self.session.commit()
+
+    async def delete_expired(self, now: datetime, limit: int) -> int:
+        expired = select(IdempotencyKey.id).where(IdempotencyKey.expires_at < now).limit(limit)
+        result = await self.session.execute(delete(IdempotencyKey).where(IdempotencyKey.id.in_(expired)))
+        await self.session.commit()
+        return result.rowcount
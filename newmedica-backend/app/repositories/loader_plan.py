@@ -0,0 +1,74 @@
+import typing
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple, Type
+
+from pydantic import BaseModel
+from pydantic.fields import FieldInfo
+from sqlalchemy import inspect
+from sqlalchemy.orm import Mapper, selectinload
+from sqlalchemy.orm.strategy_options import _AbstractLoad
+
+# Loader plans: the eager-load options a query needs so that a response schema can
+# be validated from its ORM rows without lazy loads (which fail under asyncio).
+#
+# A plan walks the schema's fields, keeps those backed by a relationship on the
+# mapped class and recurses into nested schemas, so it loads exactly the
+# relationships the schema serializes. Every hop is a selectinload: one extra
+# query per relationship regardless of row count, and no joins that would
+# duplicate a filter join or multiply rows under LIMIT.
+#
+# A relationship can narrow what it loads with a `loader_criteria` entry in its
+# `info`: a callable taking the target class and returning a filter (e.g. hiding
+# soft-deleted rows). It is applied with `.and_()`, which keeps the selectin load
+# a plain IN query on the foreign key.
+#
+# Properties computed from relationships (e.g. CartItem.price reads
+# CartItem.product) are invisible to the planner; they only work when the schema
+# also serializes that relationship.
+
+
+@lru_cache(maxsize=None)
+def loader_options(model: type, schema: Type[BaseModel]) -> Tuple[_AbstractLoad, ...]:
+    """Loader options for selecting `model` rows to validate as `schema`; cached per pair."""
+    return tuple(_plan(inspect(model), schema, parent=None, seen=frozenset({schema})))
+
+
+def _plan(
+    mapper: Mapper, schema: Type[BaseModel], parent: Optional[_AbstractLoad], seen: frozenset
+) -> List[_AbstractLoad]:
+    options: List[_AbstractLoad] = []
+    for name, field in schema.model_fields.items():
+        key = _relationship_key(mapper, name, field)
+        if key is None:
+            continue
+        relationship = mapper.relationships[key]
+        attribute = getattr(mapper.class_, key)
+        criteria = relationship.info.get("loader_criteria")
+        if criteria is not None:
+            attribute = attribute.and_(criteria(relationship.mapper.class_))
+        loader = selectinload(attribute) if parent is None else parent.selectinload(attribute)
+        nested = _nested_schema(field.annotation)
+        children = []
+        if nested is not None and nested not in seen:
+            children = _plan(relationship.mapper, nested, loader, seen | {nested})
+        # A chain ending deeper already loads this hop
+        options.extend(children or [loader])
+    return options
+
+
+def _relationship_key(mapper: Mapper, name: str, field: FieldInfo) -> Optional[str]:
+    for candidate in (name, field.validation_alias, field.alias):
+        if isinstance(candidate, str) and candidate in mapper.relationships:
+            return candidate
+    return None
+
+
+def _nested_schema(annotation: Any) -> Optional[Type[BaseModel]]:
+    """The schema inside `X`, `Optional[X]`, `List[X]`, `X | None`, `Annotated[X, ...]`."""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in typing.get_args(annotation):
+        nested = _nested_schema(arg)
+        if nested is not None:
+            return nested
+    return None
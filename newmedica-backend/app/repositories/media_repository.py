@@ -1,17 +1,184 @@
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Set
 from uuid import UUID
 
+from sqlalchemy import case, delete, func, update
+from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.models.media_blob import MediaBlob
+from app.models.product import Product
 from app.models.product_media import ProductMedia
+from app.utils.upsert import dialect_insert
+
+# Bulk statements below skip the identity map; callers re-read media afterwards
+_BULK = {"synchronize_session": False}
+
+# Deleted media keep their row (deleted_at set) until the media GC purges it
+_LIVE = ProductMedia.deleted_at.is_(None)
 
 
 class MediaRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def get_media_by_id(self, media_id: UUID) -> ProductMedia | None:
-        return await self.session.get(ProductMedia, media_id)
+    async def get_media_by_ids(self, media_ids: Iterable[UUID]) -> List[ProductMedia]:
+        result = await self.session.execute(
+            select(ProductMedia).where(ProductMedia.id.in_(list(media_ids)), _LIVE)
+        )
+        return list(result.scalars().all())
+
+    async def get_product_media(self, product_id: UUID) -> List[ProductMedia]:
+        result = await self.session.execute(
+            select(ProductMedia)
+            .where(ProductMedia.product_id == product_id, _LIVE)
+            .order_by(ProductMedia.display_order, ProductMedia.created_at)
+            .execution_options(populate_existing=True)
+        )
+        return list(result.scalars().all())
+
+    async def product_exists(self, product_id: UUID) -> bool:
+        result = await self.session.execute(select(Product.id).where(Product.id == product_id))
+        return result.first() is not None
+
+    async def next_display_order(self, product_id: UUID) -> int:
+        result = await self.session.execute(
+            select(func.max(ProductMedia.display_order)).where(ProductMedia.product_id == product_id, _LIVE)
+        )
+        highest = result.scalar_one()
+        return 0 if highest is None else highest + 1
+
+    async def reorder(self, product_id: UUID, media_ids: Sequence[UUID]) -> int:
+        """Sets display_order to each id's index in one UPDATE; returns how many of the product's rows matched."""
+        if not media_ids:
+            return 0
+        positions = {media_id: index for index, media_id in enumerate(media_ids)}
+        result = await self.session.execute(
+            update(ProductMedia)
+            .where(ProductMedia.product_id == product_id, ProductMedia.id.in_(list(positions)), _LIVE)
+            .values(display_order=case(positions, value=ProductMedia.id))
+            .execution_options(**_BULK)
+        )
+        return result.rowcount
+
+    async def update_alt_texts(self, product_id: UUID, alt_texts: Dict[UUID, str]) -> int:
+        if not alt_texts:
+            return 0
+        result = await self.session.execute(
+            update(ProductMedia)
+            .where(ProductMedia.product_id == product_id, ProductMedia.id.in_(list(alt_texts)), _LIVE)
+            .values(alt_text=case(alt_texts, value=ProductMedia.id))
+            .execution_options(**_BULK)
+        )
+        return result.rowcount
+
+    def add_media(self, media: Iterable[ProductMedia]) -> None:
+        """Queued in the session; flushed as one multi-row INSERT."""
+        self.session.add_all(list(media))
+
+    async def mark_deleted(self, media_ids: Sequence[UUID], product_id: Optional[UUID] = None) -> int:
+        """
+        Marks media rows (only the product's, when given) deleted in one statement;
+        returns how many were marked. Files are left to the media GC.
+        """
+        if not media_ids:
+            return 0
+        statement = update(ProductMedia).where(ProductMedia.id.in_(list(media_ids)), _LIVE)
+        if product_id is not None:
+            statement = statement.where(ProductMedia.product_id == product_id)
+        result = await self.session.execute(
+            statement.values(deleted_at=datetime.now(timezone.utc)).execution_options(**_BULK)
+        )
+        return result.rowcount
+
+    async def delete_product_media(self, product_id: UUID) -> None:
+        """Removes a product's media rows so the product can go; their files are left to the media GC."""
+        await self.session.execute(
+            delete(ProductMedia).where(ProductMedia.product_id == product_id).execution_options(**_BULK)
+        )
+
+    async def add_blob(self, sha256: str, content_type: str, size_bytes: int, storage_key: str) -> None:
+        """
+        Records a stored file in the caller's transaction. Re-uploads of known
+        content only bump its last_uploaded_at.
+        """
+        now = datetime.now(timezone.utc)
+        values = {
+            "sha256": sha256,
+            "content_type": content_type,
+            "size_bytes": size_bytes,
+            "storage_key": storage_key,
+            "created_at": now,
+            "last_uploaded_at": now,
+        }
+        insert = dialect_insert(self.session)
+        if insert is not None:
+            await self.session.execute(
+                insert(MediaBlob)
+                .values(**values)
+                .on_conflict_do_update(index_elements=["sha256"], set_={"last_uploaded_at": now})
+            )
+            return
+        blob = await self.session.get(MediaBlob, sha256)
+        if blob is None:
+            self.session.add(MediaBlob(**values))
+        else:
+            blob.last_uploaded_at = now
+
+    # Media GC. Each call is one statement over at most `limit` rows; the caller commits.
+
+    async def count_marked(self) -> int:
+        result = await self.session.execute(
+            select(func.count(ProductMedia.id)).where(ProductMedia.deleted_at.is_not(None))
+        )
+        return result.scalar_one()
+
+    async def purge_marked(self, limit: int) -> int:
+        batch = select(ProductMedia.id).where(ProductMedia.deleted_at.is_not(None)).limit(limit)
+        result = await self.session.execute(
+            delete(ProductMedia).where(ProductMedia.id.in_(batch)).execution_options(**_BULK)
+        )
+        return result.rowcount
+
+    def _unused_blobs(self, uploaded_before: datetime, count_marked_rows: bool):
+        # A marked row still holds its foreign key until it is purged
+        references = select(ProductMedia.id).where(ProductMedia.blob_sha256 == MediaBlob.sha256)
+        if not count_marked_rows:
+            references = references.where(_LIVE)
+        return MediaBlob.last_uploaded_at < uploaded_before, ~references.exists()
+
+    async def count_unused_blobs(self, uploaded_before: datetime) -> int:
+        """Blobs the GC would delete once marked rows are purged."""
+        result = await self.session.execute(
+            select(func.count(MediaBlob.sha256)).where(*self._unused_blobs(uploaded_before, count_marked_rows=False))
+        )
+        return result.scalar_one()
+
+    async def delete_unused_blobs(self, uploaded_before: datetime, limit: int) -> int:
+        batch = (
+            select(MediaBlob.sha256)
+            .where(*self._unused_blobs(uploaded_before, count_marked_rows=True))
+            .limit(limit)
+        )
+        result = await self.session.execute(
+            delete(MediaBlob).where(MediaBlob.sha256.in_(batch)).execution_options(**_BULK)
+        )
+        return result.rowcount
+
+    async def kept_blob_hashes(self, sha256s: Iterable[str], uploaded_before: datetime, dry_run: bool) -> Set[str]:
+        """
+        Which of these hashes still have a blob row. A dry run has deleted nothing,
+        so it also drops the blobs a real run would have deleted.
+        """
+        statement = select(MediaBlob.sha256).where(MediaBlob.sha256.in_(list(set(sha256s))))
+        if dry_run:
+            stale, unreferenced = self._unused_blobs(uploaded_before, count_marked_rows=False)
+            statement = statement.where(~(stale & unreferenced))
+        result = await self.session.execute(statement)
+        return set(result.scalars().all())
 
-    async def delete_media(self, media: ProductMedia):
-        await self.session.delete(media)
-        await self.session.commit()
+    async def live_urls(self, urls: Iterable[str]) -> Set[str]:
+        result = await self.session.execute(
+            select(ProductMedia.url).where(ProductMedia.url.in_(list(set(urls))), _LIVE).distinct()
+        )
+        return set(result.scalars().all())
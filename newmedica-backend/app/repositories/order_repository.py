@@ -1,63 +1,106 @@
 import uuid
-from sqlalchemy.orm import selectinload
+from datetime import datetime
+from sqlalchemy import func, tuple_, update
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 from app.models.order import Order, OrderItem
-from app.models.cart import Cart
-from app.models.product import Product
+from app.core.exceptions import BadRequestException
+from app.repositories.loader_plan import loader_options
+from app.schemas.order import OrderRead, OrderSummary
+from app.utils.pagination import decode_cursor, encode_cursor
 
 class OrderRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def create_order_from_cart(self, user_id: uuid.UUID, cart: Cart) -> Order:
-        total_amount = sum(item.product.price * item.quantity for item in cart.items)
-        order = Order(user_id=user_id, total_amount=total_amount)
+    def add_order_with_items(self, order: Order, items: list[OrderItem]) -> None:
+        """
+        Stages an order and its items in the caller's transaction. The items carry
+        client-side primary keys, so the flush writes them as one batched INSERT.
+        """
+        order.items = items
         self.session.add(order)
-        await self.session.commit()
-        await self.session.refresh(order)
 
-        for item in cart.items:
-            order_item = OrderItem(
-                order_id=order.id,
-                product_id=item.product_id,
-                quantity=item.quantity,
-                unit_price=item.product.price,
-            )
-            self.session.add(order_item)
+    async def get_order_summaries(
+        self, user_id: uuid.UUID, limit: int = 20, cursor: str | None = None
+    ) -> tuple[list[OrderSummary], str | None]:
+        """
+        Returns one page of a user's order history, newest first, and the cursor
+        for the next page.
+
+        Pages are keyset-paginated on (created_at, id) along
+        ix_order_user_id_created_at_id. Item counts and the first snapshot image
+        come from correlated subqueries on ix_orderitem_order_id, so a page is a
+        single statement and never loads items, products or media.
+        """
+        item_count = (
+            select(func.coalesce(func.sum(OrderItem.quantity), 0))
+            .where(OrderItem.order_id == Order.id)
+            .correlate(Order)
+            .scalar_subquery()
+        )
+        first_image = (
+            select(OrderItem.snapshot_media_url)
+            .where(OrderItem.order_id == Order.id, OrderItem.snapshot_media_url.is_not(None))
+            .order_by(OrderItem.created_at, OrderItem.id)
+            .limit(1)
+            .correlate(Order)
+            .scalar_subquery()
+        )
+        query = select(
+            Order.id,
+            Order.payment_status,
+            Order.created_at,
+            Order.subtotal_amount,
+            Order.discount_amount,
+            Order.shipping_amount,
+            Order.total_amount,
+            Order.currency,
+            Order.applied_voucher_code,
+            item_count.label("item_count"),
+            first_image.label("first_image_url"),
+        ).where(Order.user_id == user_id)
+
+        if cursor:
+            position = decode_cursor(cursor)
+            try:
+                last_created_at = datetime.fromisoformat(position["created_at"])
+                last_id = uuid.UUID(position["id"])
+            except (KeyError, TypeError, ValueError):
+                raise BadRequestException(message="Invalid pagination cursor.")
+            query = query.where(tuple_(Order.created_at, Order.id) < tuple_(last_created_at, last_id))
 
-        await self.session.commit()
-        
-        # Eagerly load items and nested product relationships for response schemas
         result = await self.session.execute(
-            select(Order)
-            .where(Order.id == order.id)
-            .options(
-                selectinload(Order.items)
-                .selectinload(OrderItem.product)
-                .selectinload(Product.category),
-                selectinload(Order.items)
-                .selectinload(OrderItem.product)
-                .selectinload(Product.media),
-            )
+            query.order_by(Order.created_at.desc(), Order.id.desc()).limit(limit + 1)
+        )
+        summaries = [OrderSummary.model_validate(row._mapping) for row in result.all()]
+
+        next_cursor = None
+        if len(summaries) > limit:
+            summaries = summaries[:limit]
+            last = summaries[-1]
+            next_cursor = encode_cursor({"created_at": last.created_at.isoformat(), "id": last.id})
+        return summaries, next_cursor
+
+    async def get_orders_version(self, user_id: uuid.UUID) -> tuple[int, datetime | None]:
+        """(count, latest updated_at) of a user's orders; the validator for the order list."""
+        result = await self.session.execute(
+            select(func.count(Order.id), func.max(Order.updated_at)).where(Order.user_id == user_id)
         )
-        return result.scalar_one()
+        count, last_updated = result.one()
+        return count, last_updated
 
-    async def get_orders_by_user_id(self, user_id: uuid.UUID) -> list[Order]:
+    async def get_order_version(self, order_id: uuid.UUID) -> tuple[uuid.UUID, datetime] | None:
+        """(user_id, updated_at) of one order, without loading its items."""
         result = await self.session.execute(
-            select(Order).where(Order.user_id == user_id).options(
-                selectinload(Order.items).selectinload(OrderItem.product).selectinload(Product.category),
-                selectinload(Order.items).selectinload(OrderItem.product).selectinload(Product.media)
-            ).order_by(Order.created_at.desc())
+            select(Order.user_id, Order.updated_at).where(Order.id == order_id)
         )
-        return result.scalars().all()
+        row = result.one_or_none()
+        return tuple(row) if row else None
 
     async def get_order_by_id(self, order_id: uuid.UUID) -> Order | None:
         result = await self.session.execute(
-            select(Order).where(Order.id == order_id).options(
-                selectinload(Order.items).selectinload(OrderItem.product).selectinload(Product.category),
-                selectinload(Order.items).selectinload(OrderItem.product).selectinload(Product.media)
-            )
+            select(Order).where(Order.id == order_id).options(*loader_options(Order, OrderRead))
         )
         return result.scalar_one_or_none()
 
@@ -75,4 +118,58 @@ class OrderRepository:
         self.session.add(order)
         await self.session.commit()
         await self.session.refresh(order)
-        return order
\ No newline at end of file
+        return order
+    async def transition_payment_status(self, order_id: uuid.UUID, from_status: str, to_status: str) -> bool:
+        """
+        Conditional status change in the caller's transaction; clears the stock hold.
+        Returns False when the order was not in `from_status` (e.g. a concurrent
+        payment or sweeper got there first).
+        """
+        result = await self.session.execute(
+            update(Order)
+            .where(Order.id == order_id, Order.payment_status == from_status)
+            .values(payment_status=to_status, reserved_until=None)
+        )
+        return result.rowcount == 1
+
+    async def extend_reservation(self, order_id: uuid.UUID, now: datetime, until: datetime) -> bool:
+        """Pushes a still-valid hold out to `until`; False if it already expired."""
+        result = await self.session.execute(
+            update(Order)
+            .where(
+                Order.id == order_id,
+                Order.payment_status == "pending",
+                Order.reserved_until >= now,
+            )
+            .values(reserved_until=until)
+            .execution_options(synchronize_session="fetch")
+        )
+        return result.rowcount == 1
+
+    async def cancel_expired_reservations(self, now: datetime, limit: int) -> list[uuid.UUID]:
+        """
+        Cancels up to `limit` pending orders whose hold expired before `now` and
+        returns their ids. Rows are claimed with FOR UPDATE SKIP LOCKED, so
+        concurrent sweepers take disjoint batches and never wait on an order that
+        is being paid.
+        """
+        result = await self.session.execute(
+            select(Order.id)
+            .where(
+                Order.payment_status == "pending",
+                Order.reserved_until.is_not(None),
+                Order.reserved_until < now,
+            )
+            .order_by(Order.reserved_until)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        order_ids = list(result.scalars().all())
+        if order_ids:
+            await self.session.execute(
+                update(Order)
+                .where(Order.id.in_(order_ids))
+                .values(payment_status="cancelled", reserved_until=None)
+                .execution_options(synchronize_session=False)
+            )
+        return order_ids
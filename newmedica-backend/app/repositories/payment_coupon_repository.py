@@ -0,0 +1,50 @@
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.payment_coupon import PaymentCoupon
+from app.utils.upsert import dialect_insert
+
+
+class PaymentCouponRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_coupon_id(self, amount_off: int, currency: str) -> str | None:
+        result = await self.session.execute(
+            select(PaymentCoupon.coupon_id).where(
+                PaymentCoupon.amount_off == amount_off, PaymentCoupon.currency == currency
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def add(self, amount_off: int, currency: str, coupon_id: str) -> str:
+        """
+        Records a coupon created with the provider and commits. If another request
+        recorded one for the same (amount_off, currency) first, returns that one.
+        """
+        values = {
+            "id": uuid.uuid4(),
+            "amount_off": amount_off,
+            "currency": currency,
+            "coupon_id": coupon_id,
+            "created_at": datetime.now(timezone.utc),
+        }
+        insert = dialect_insert(self.session)
+        if insert is not None:
+            await self.session.execute(
+                insert(PaymentCoupon).values(**values).on_conflict_do_nothing(
+                    index_elements=["amount_off", "currency"]
+                )
+            )
+            await self.session.commit()
+        else:
+            self.session.add(PaymentCoupon(**values))
+            try:
+                await self.session.commit()
+            except IntegrityError:
+                await self.session.rollback()
+        return await self.get_coupon_id(amount_off, currency) or coupon_id
@@ -1,16 +1,23 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Dict, List, Mapping, Optional, Tuple
 from uuid import UUID
 
-from sqlalchemy.orm import selectinload
+from sqlalchemy import func, tuple_, update
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core.exceptions import BadRequestException
 from app.models.category import Category
+from app.models.order import OrderItem
 from app.models.product import Product
 from app.models.product_media import ProductMedia
+from app.repositories.loader_plan import loader_options
+from app.repositories.media_repository import MediaRepository
+from app.repositories.product_search import get_product_search_backend
 from app.schemas.media import ProductMediaCreate
-from app.schemas.product import ProductUpdate
+from app.schemas.product import ProductRead, ProductUpdate
 from app.schemas.product_create import ProductCreate
+from app.utils.pagination import decode_cursor, encode_cursor
 
 
 class ProductRepository:
@@ -30,10 +37,16 @@ class ProductRepository:
         search_term: Optional[str] = None,
         sort_by: Optional[str] = None,
         sort_order: str = "asc",
-    ) -> List[Product]:
-        query = select(Product).options(
-            selectinload(Product.category), selectinload(Product.media)  # type: ignore
-        )
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Product], Optional[str]]:
+        """
+        Returns one page of products and the cursor for the next page.
+
+        Pages are keyset-paginated on (sort column, id) so every page is an index
+        range scan, no matter how deep the client has paged.
+        """
+        query = select(Product).options(*loader_options(Product, ProductRead))
 
         if category_name:
             search_name = category_name.replace("-", " ")
@@ -41,42 +54,153 @@ class ProductRepository:
                 Category.name.ilike(f"%{search_name}%")  # type: ignore
             )
 
+        rank = None
         if search_term:
-            query = query.where(Product.name.ilike(f"%{search_term}%"))  # type: ignore
-
-        if sort_by:
-            sort_map = {"alphabetical": "name", "price": "price", "date": "updated_at"}
-
-            sort_field_key, *sort_direction_parts = sort_by.split("-")
-            sort_field = sort_map.get(sort_field_key)
-
-            if sort_field:
-                column = getattr(Product, sort_field, None)
-                if column:
-                    direction = "desc" if "desc" in sort_direction_parts else "asc"
-
-                    # Special handling for date sorting direction from frontend
-                    if sort_field_key == "date":
-                        direction = "desc" if "new-to-old" in sort_by else "asc"
-
-                    if direction == "desc":
-                        query = query.order_by(column.desc())
-                    else:
-                        query = query.order_by(column.asc())
-
-        result = await self.session.execute(query)
-        return result.scalars().unique().all()  # type: ignore
+            backend = get_product_search_backend(self.session.bind.dialect.name)
+            query, rank = backend.apply(query, search_term)
+
+        sort_field, direction = self._resolve_sort(sort_by)
+        if sort_field == "relevance":
+            # Without a ranked search there is nothing to order by relevance
+            column = rank
+            if rank is None:
+                sort_field = None
+        else:
+            column = getattr(Product, sort_field) if sort_field else None
+        sort_key = f"{sort_field or 'id'}:{direction}"
+
+        if cursor:
+            position = decode_cursor(cursor)
+            if position.get("s") != sort_key:
+                raise BadRequestException(message="Cursor does not match the requested sort.")
+            try:
+                last_id = UUID(position["id"])
+                last_value = (
+                    self._parse_sort_value(sort_field, position["v"]) if column is not None else None
+                )
+            except (KeyError, TypeError, ValueError):
+                raise BadRequestException(message="Invalid pagination cursor.")
+
+            if column is not None:
+                key, boundary = tuple_(column, Product.id), tuple_(last_value, last_id)
+            else:
+                key, boundary = Product.id, last_id
+            query = query.where(key < boundary if direction == "desc" else key > boundary)
+
+        order_columns = [Product.id] if column is None else [column, Product.id]
+        if direction == "desc":
+            query = query.order_by(*(c.desc() for c in order_columns))
+        else:
+            query = query.order_by(*(c.asc() for c in order_columns))
+
+        if sort_field == "relevance":
+            query = query.add_columns(column)
+        result = await self.session.execute(query.limit(limit + 1))
+        if sort_field == "relevance":
+            rows = result.unique().all()
+            products = [row[0] for row in rows]
+            values = [row[1] for row in rows]
+        else:
+            products = list(result.scalars().unique().all())
+            values = [getattr(p, sort_field) if sort_field else None for p in products]
+
+        next_cursor = None
+        if len(products) > limit:
+            products = products[:limit]
+            next_cursor = encode_cursor(
+                {"s": sort_key, "v": values[limit - 1], "id": products[-1].id}
+            )
+        return products, next_cursor
+
+    @staticmethod
+    def _resolve_sort(sort_by: Optional[str]) -> Tuple[Optional[str], str]:
+        if not sort_by:
+            return None, "asc"
+        if sort_by == "relevance":
+            return "relevance", "asc"
+
+        sort_map = {"alphabetical": "name", "price": "price", "date": "updated_at"}
+        sort_field_key, *sort_direction_parts = sort_by.split("-")
+        sort_field = sort_map.get(sort_field_key)
+        if not sort_field:
+            return None, "asc"
+
+        direction = "desc" if "desc" in sort_direction_parts else "asc"
+        # Special handling for date sorting direction from frontend
+        if sort_field_key == "date":
+            direction = "desc" if "new-to-old" in sort_by else "asc"
+        return sort_field, direction
+
+    @staticmethod
+    def _parse_sort_value(sort_field: str, value):
+        if sort_field == "updated_at":
+            return datetime.fromisoformat(value)
+        if sort_field in ("price", "relevance"):
+            return float(value)
+        return str(value)
 
     async def get_product_by_id(self, product_id: UUID) -> Product | None:
         result = await self.session.execute(
             select(Product)
             .where(Product.id == product_id)
-            .options(
-                selectinload(Product.category), selectinload(Product.media)  # type: ignore
-            )
+            .options(*loader_options(Product, ProductRead))
         )
         return result.scalar_one_or_none()
 
+    async def decrement_stock(self, quantities: Mapping[UUID, int]) -> Dict[UUID, int]:
+        """
+        Takes stock off each product with a conditional UPDATE
+        (`stock = stock - :q WHERE stock >= :q`) inside the caller's transaction.
+
+        Rows are updated in product id order so concurrent checkouts acquire row
+        locks in the same order and cannot deadlock. Returns {product_id: available}
+        for every line the stock could not cover; when it is non-empty the caller
+        must roll back to undo the lines that did succeed.
+        """
+        short = []
+        for product_id in sorted(quantities):
+            quantity = quantities[product_id]
+            result = await self.session.execute(
+                update(Product)
+                .where(Product.id == product_id, Product.stock >= quantity)
+                .values(stock=Product.stock - quantity)
+            )
+            if result.rowcount != 1:
+                short.append(product_id)
+        if not short:
+            return {}
+
+        result = await self.session.execute(
+            select(Product.id, Product.stock).where(Product.id.in_(short))
+        )
+        available = dict(result.all())
+        return {product_id: available.get(product_id, 0) for product_id in short}
+
+    async def restock_from_orders(self, order_ids: List[UUID]) -> None:
+        """
+        Returns the quantities of the given orders' items to stock with one
+        set-based UPDATE. The product rows are locked in id order first, matching
+        `decrement_stock`, so a sweep cannot deadlock against checkouts.
+        """
+        returned = (
+            select(OrderItem.product_id, func.sum(OrderItem.quantity).label("quantity"))
+            .where(OrderItem.order_id.in_(order_ids))
+            .group_by(OrderItem.product_id)
+            .subquery()
+        )
+        await self.session.execute(
+            select(Product.id)
+            .where(Product.id.in_(select(returned.c.product_id)))
+            .order_by(Product.id)
+            .with_for_update()
+        )
+        await self.session.execute(
+            update(Product)
+            .where(Product.id == returned.c.product_id)
+            .values(stock=Product.stock + returned.c.quantity)
+            .execution_options(synchronize_session=False)
+        )
+
     async def update_product(
         self, product_id: UUID, product_update: ProductUpdate
     ) -> Product | None:
@@ -94,18 +218,22 @@ class ProductRepository:
         return db_product
 
     async def delete_product(self, product_id: UUID) -> bool:
-        db_product = await self.get_product_by_id(product_id)
+        db_product = await self.session.get(Product, product_id)
         if not db_product:
             return False
 
+        # Its media rows (marked ones included) go first; their files are left to the media GC
+        await MediaRepository(self.session).delete_product_media(product_id)
         await self.session.delete(db_product)
         await self.session.commit()
         return True
 
     async def add_media_to_product(
-        self, product_id: UUID, media: ProductMediaCreate
+        self, product_id: UUID, media: ProductMediaCreate, blob_sha256: Optional[str] = None
     ) -> ProductMedia:
-        db_media = ProductMedia.model_validate(media, update={"product_id": product_id})
+        db_media = ProductMedia.model_validate(
+            media, update={"product_id": product_id, "blob_sha256": blob_sha256}
+        )
         self.session.add(db_media)
         await self.session.commit()
         await self.session.refresh(db_media)
@@ -114,9 +242,6 @@ class ProductRepository:
     async def update_media_order_for_product(
         self, product_id: UUID, media_ids: List[UUID]
     ):
-        for index, media_id in enumerate(media_ids):
-            media_item = await self.session.get(ProductMedia, media_id)
-            if media_item and media_item.product_id == product_id:
-                media_item.display_order = index
-                self.session.add(media_item)
+        # Ids of other products are skipped, as before
+        await MediaRepository(self.session).reorder(product_id, media_ids)
         await self.session.commit()
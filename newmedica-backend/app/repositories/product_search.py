@@ -0,0 +1,156 @@
+import re
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+
+from sqlalchemy import DDL, column, event, false, func, inspect, literal_column, select, table
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.sql import ColumnElement, Select
+
+from app.core.config import settings
+from app.models.product import Product
+
+# Search backends filter a product query by a free-text term and expose a rank
+# expression where lower values are better matches, so `sort_by=relevance` is a
+# plain ascending keyset sort whichever backend produced it.
+
+MAX_SEARCH_TOKENS = 8
+
+
+def tokenize(term: str) -> List[str]:
+    return re.findall(r"\w+", term.lower())[:MAX_SEARCH_TOKENS]
+
+
+class ProductSearchBackend(ABC):
+    name = "base"
+
+    @abstractmethod
+    def apply(self, query: Select, term: str) -> Tuple[Select, Optional[ColumnElement]]:
+        """Return `query` narrowed to products matching `term`, and the rank expression."""
+
+
+class LikeProductSearch(ProductSearchBackend):
+    """Substring match on the name; used when no indexed backend is available."""
+
+    name = "like"
+
+    def apply(self, query: Select, term: str) -> Tuple[Select, Optional[ColumnElement]]:
+        return query.where(Product.name.ilike(f"%{term}%")), None  # type: ignore
+
+
+class PostgresProductSearch(ProductSearchBackend):
+    """
+    Full-text search over the generated `product.search_vector` column (GIN) with
+    a pg_trgm similarity fallback on the name for typos and partial words.
+    """
+
+    name = "postgres"
+    config = "english"
+
+    def apply(self, query: Select, term: str) -> Tuple[Select, Optional[ColumnElement]]:
+        tokens = tokenize(term)
+        if not tokens:
+            return query.where(false()), None
+
+        search_vector = literal_column("product.search_vector", type_=TSVECTOR)
+        ts_query = func.to_tsquery(self.config, " & ".join(f"{t}:*" for t in tokens))
+        matches = search_vector.op("@@")(ts_query) | Product.name.op("%")(term)  # type: ignore
+        rank = -(func.ts_rank_cd(search_vector, ts_query) + func.similarity(Product.name, term))
+        return query.where(matches), rank
+
+
+class SqliteFtsProductSearch(ProductSearchBackend):
+    """FTS5 search over the `product_fts` table, ranked by bm25."""
+
+    name = "sqlite_fts5"
+
+    def apply(self, query: Select, term: str) -> Tuple[Select, Optional[ColumnElement]]:
+        tokens = tokenize(term)
+        if not tokens:
+            return query.where(false()), None
+
+        match = " ".join(f'"{t}"*' for t in tokens)
+        fts = table("product_fts", column("product_id"))
+        ranked = (
+            select(
+                fts.c.product_id,
+                func.bm25(literal_column("product_fts"), 10.0, 1.0).label("rank"),
+            )
+            .where(literal_column("product_fts").op("MATCH")(match))
+            .subquery("product_match")
+        )
+        query = query.join(ranked, ranked.c.product_id == Product.id)
+        return query, ranked.c.rank
+
+
+_BACKENDS = {
+    LikeProductSearch.name: LikeProductSearch,
+    PostgresProductSearch.name: PostgresProductSearch,
+    SqliteFtsProductSearch.name: SqliteFtsProductSearch,
+}
+
+
+def get_product_search_backend(dialect_name: str) -> ProductSearchBackend:
+    backend = settings.PRODUCT_SEARCH_BACKEND
+    if backend == "auto":
+        backend = {"postgresql": "postgres", "sqlite": "sqlite_fts5"}.get(dialect_name, "like")
+    return _BACKENDS[backend]()
+
+
+async def verify_product_search(db_engine: AsyncEngine) -> None:
+    """
+    Fail at startup when the configured backend's search structures are missing,
+    rather than on the first search request.
+    """
+    backend = get_product_search_backend(db_engine.dialect.name)
+    async with db_engine.connect() as conn:
+        if backend.name == "postgres":
+            columns = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_columns("product"))
+            if not any(c["name"] == "search_vector" for c in columns):
+                raise RuntimeError(
+                    "Product search backend 'postgres' needs product.search_vector; run the migrations"
+                )
+        elif backend.name == "sqlite_fts5":
+            if not await conn.run_sync(lambda sync_conn: inspect(sync_conn).has_table("product_fts")):
+                raise RuntimeError("Product search backend 'sqlite_fts5' needs product_fts; run the migrations")
+
+
+# The generated tsvector column and its indexes on Postgres. The migration runs
+# these, and `create_all` schemas get them from the listener below.
+POSTGRES_SEARCH_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "ALTER TABLE product ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+    ") STORED",
+    "CREATE INDEX IF NOT EXISTS ix_product_search_vector ON product USING gin (search_vector)",
+    "CREATE INDEX IF NOT EXISTS ix_product_name_trgm ON product USING gin (name gin_trgm_ops)",
+]
+
+# Keep the FTS5 index in step with the product table on SQLite, including the
+# `create_all` schemas used by the test-suite. The index keys on product.id:
+# product has a UUID primary key, so its implicit rowid is not stable across
+# VACUUM and cannot back an external-content table.
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS product_fts USING fts5("
+    "product_id UNINDEXED, name, description, tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS product_fts_ai AFTER INSERT ON product BEGIN "
+    "INSERT INTO product_fts(product_id, name, description) "
+    "VALUES (new.id, new.name, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS product_fts_ad AFTER DELETE ON product BEGIN "
+    "DELETE FROM product_fts WHERE product_id = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS product_fts_au AFTER UPDATE OF name, description ON product BEGIN "
+    "UPDATE product_fts SET name = new.name, description = new.description "
+    "WHERE product_id = new.id; END",
+]
+
+for _statement in POSTGRES_SEARCH_DDL:
+    event.listen(Product.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+for _statement in SQLITE_FTS_DDL:
+    event.listen(Product.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(
+    Product.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS product_fts").execute_if(dialect="sqlite"),
+)
@@ -5,6 +5,7 @@ from sqlalchemy.orm.attributes import flag_modified
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core.principal_cache import principal_cache
 from app.models.user import User
 from app.models.user_type import UserType
 
@@ -40,5 +41,6 @@ class UserRepository:
             flag_modified(user, "extra_fields")
         self.session.add(user)
         await self.session.commit()
+        principal_cache.invalidate(user.id)
         await self.session.refresh(user)
         return user
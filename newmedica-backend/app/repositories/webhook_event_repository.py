@@ -0,0 +1,161 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.webhook_event import WebhookEvent
+from app.utils.upsert import dialect_insert
+
+
+class WebhookEventRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def add_if_new(self, provider: str, event_id: str, event_type: str, payload: str) -> bool:
+        """
+        Stores an event unless (provider, event_id) is already in the inbox and
+        commits. Returns False for a duplicate delivery.
+        """
+        values = {
+            "id": uuid.uuid4(),
+            "provider": provider,
+            "event_id": event_id,
+            "event_type": event_type,
+            "payload": payload,
+            "status": "pending",
+            "attempts": 0,
+            "next_attempt_at": datetime.now(timezone.utc),
+            "created_at": datetime.now(timezone.utc),
+            "updated_at": datetime.now(timezone.utc),
+        }
+        insert = dialect_insert(self.session)
+        if insert is not None:
+            result = await self.session.execute(
+                insert(WebhookEvent).values(**values).on_conflict_do_nothing(
+                    index_elements=["provider", "event_id"]
+                )
+            )
+            await self.session.commit()
+            return result.rowcount == 1
+
+        self.session.add(WebhookEvent(**values))
+        try:
+            await self.session.commit()
+        except IntegrityError:
+            await self.session.rollback()
+            return False
+        return True
+
+    async def claim_due(self, now: datetime, limit: int, lease_seconds: float) -> list[WebhookEvent]:
+        """
+        Claims up to `limit` due events (pending, or processing with a lapsed lease)
+        and commits. SKIP LOCKED keeps concurrent workers on disjoint batches.
+        """
+        result = await self.session.execute(
+            select(WebhookEvent)
+            .where(
+                WebhookEvent.status.in_(("pending", "processing")),
+                WebhookEvent.next_attempt_at <= now,
+            )
+            .order_by(WebhookEvent.next_attempt_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        events = list(result.scalars().all())
+        if events:
+            await self.session.execute(
+                update(WebhookEvent)
+                .where(WebhookEvent.id.in_([e.id for e in events]))
+                .values(
+                    status="processing",
+                    attempts=WebhookEvent.attempts + 1,
+                    next_attempt_at=now + timedelta(seconds=lease_seconds),
+                )
+                .execution_options(synchronize_session="fetch")
+            )
+        await self.session.commit()
+        return events
+
+    async def renew_lease(self, event_id: uuid.UUID, attempts: int, lease_seconds: float) -> bool:
+        """
+        Restarts the lease of an event this worker claimed as attempt `attempts`.
+        Returns False when the lease already lapsed and another worker re-claimed it.
+        """
+        result = await self.session.execute(
+            update(WebhookEvent)
+            .where(*self._leased(event_id, attempts))
+            .values(next_attempt_at=datetime.now(timezone.utc) + timedelta(seconds=lease_seconds))
+        )
+        await self.session.commit()
+        return result.rowcount == 1
+
+    async def mark_processed(self, event_id: uuid.UUID, attempts: int) -> bool:
+        """Returns False, leaving the event alone, when attempt `attempts` no longer holds the lease."""
+        result = await self.session.execute(
+            update(WebhookEvent)
+            .where(*self._leased(event_id, attempts))
+            .values(status="processed", processed_at=datetime.now(timezone.utc), last_error=None)
+        )
+        await self.session.commit()
+        return result.rowcount == 1
+
+    async def mark_failed(
+        self, event_id: uuid.UUID, attempts: int, error: str, retry_at: Optional[datetime]
+    ) -> bool:
+        """
+        Schedules a retry at `retry_at`, or dead-letters the event when it is None.
+        Returns False, leaving the event alone, when attempt `attempts` no longer holds the lease.
+        """
+        values = {"last_error": error}
+        if retry_at is None:
+            values["status"] = "dead"
+        else:
+            values.update(status="pending", next_attempt_at=retry_at)
+        result = await self.session.execute(
+            update(WebhookEvent).where(*self._leased(event_id, attempts)).values(**values)
+        )
+        await self.session.commit()
+        return result.rowcount == 1
+
+    @staticmethod
+    def _leased(event_id: uuid.UUID, attempts: int) -> tuple:
+        # `attempts` is the lease token: a re-claim bumps it, fencing off the previous worker
+        return (
+            WebhookEvent.id == event_id,
+            WebhookEvent.status == "processing",
+            WebhookEvent.attempts == attempts,
+        )
+
+    async def requeue(
+        self,
+        event_ids: Optional[Iterable[str]] = None,
+        statuses: Iterable[str] = ("dead",),
+        since: Optional[datetime] = None,
+    ) -> int:
+        """
+        Puts matching events back in the queue with a fresh attempt budget.
+        `event_ids` are provider event ids (e.g. evt_...) and override `statuses`.
+        """
+        query = update(WebhookEvent)
+        if event_ids is not None:
+            query = query.where(WebhookEvent.event_id.in_(list(event_ids)))
+        else:
+            query = query.where(WebhookEvent.status.in_(list(statuses)))
+        if since is not None:
+            query = query.where(WebhookEvent.created_at >= since)
+        result = await self.session.execute(
+            query.values(status="pending", attempts=0, last_error=None, next_attempt_at=datetime.now(timezone.utc))
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+        return result.rowcount
+
+    async def count_by_status(self) -> dict[str, int]:
+        result = await self.session.execute(
+            select(WebhookEvent.status, func.count(WebhookEvent.id)).group_by(WebhookEvent.status)
+        )
+        return dict(result.all())
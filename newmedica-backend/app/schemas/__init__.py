@@ -1,19 +1,19 @@
 from .user import UserCreate, UserRead, UserReadWithDetails
 from .token import Token, TokenData
-from .product import ProductCreate, ProductRead, ProductUpdate
+from .product import ProductCreate, ProductPage, ProductRead, ProductUpdate
 from .category import CategoryCreate, CategoryRead, CategoryUpdate
-from .media import ProductMediaCreate, ProductMediaRead, ProductMediaUpdate
+from .media import ProductMediaAttach, ProductMediaBatch, ProductMediaCreate, ProductMediaRead, ProductMediaUpdate
 from .cart import CartItemCreate, CartItemRead, CartItemUpdate, CartRead
-from .order import OrderCreate, OrderRead, OrderItemRead
+from .order import OrderCreate, OrderItemRead, OrderPage, OrderRead, OrderSummary
 from .address import AddressCreate, AddressRead, AddressUpdate
 
 __all__ = [
     "UserCreate", "UserRead", "UserReadWithDetails",
     "Token", "TokenData",
-    "ProductCreate", "ProductRead", "ProductUpdate",
+    "ProductCreate", "ProductPage", "ProductRead", "ProductUpdate",
     "CategoryCreate", "CategoryRead", "CategoryUpdate",
-    "ProductMediaCreate", "ProductMediaRead", "ProductMediaUpdate",
+    "ProductMediaAttach", "ProductMediaBatch", "ProductMediaCreate", "ProductMediaRead", "ProductMediaUpdate",
     "CartItemCreate", "CartItemRead", "CartItemUpdate", "CartRead",
-    "OrderCreate", "OrderRead", "OrderItemRead",
+    "OrderCreate", "OrderItemRead", "OrderPage", "OrderRead", "OrderSummary",
     "AddressCreate", "AddressRead", "AddressUpdate"
 ]
\ No newline at end of file
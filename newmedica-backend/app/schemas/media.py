@@ -1,8 +1,12 @@
 import uuid
+from typing import Dict, List, Optional
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, computed_field, model_validator
 from pydantic.alias_generators import to_camel
 
+from app.core.config import settings
+from app.utils.media_urls import variant_srcset
+
 
 # Base Media Schema
 class ProductMediaBase(BaseModel):
@@ -21,8 +25,51 @@ class ProductMediaCreate(BaseModel):
 
 class ProductMediaRead(ProductMediaBase):
     id: uuid.UUID
+    blob_sha256: Optional[str] = Field(default=None, alias="blob_sha256", exclude=True)
+
+    @computed_field
+    @property
+    def srcset(self) -> Dict[str, str]:
+        """Resized WebP URLs keyed by width descriptor, e.g. `{"320w": url}`."""
+        return variant_srcset(settings.MEDIA_URL_PREFIX, self.blob_sha256, settings.MEDIA_VARIANT_WIDTHS)
 
     model_config = ConfigDict(from_attributes=True, alias_generator=to_camel)
 
 class ProductMediaUpdate(ProductMediaBase):
-    pass
\ No newline at end of file
+    pass
+
+
+class ProductMediaAttach(BaseModel):
+    """Adds an existing media file (of any product) to this product without re-uploading it."""
+
+    source_media_id: uuid.UUID
+    # Default to the source's alt text / the end of this product's gallery
+    alt_text: Optional[str] = None
+    display_order: Optional[int] = None
+
+    model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True)
+
+
+class ProductMediaBatch(BaseModel):
+    """
+    Media edits for one product, applied together in a single transaction: either
+    every referenced media row belongs to the product and all edits apply, or none do.
+    """
+
+    # New gallery order: display_order becomes each id's index
+    order: Optional[List[uuid.UUID]] = None
+    delete: List[uuid.UUID] = []
+    alt_text: Dict[uuid.UUID, str] = {}
+    attach: List[ProductMediaAttach] = []
+
+    model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True)
+
+    @model_validator(mode="after")
+    def check_consistent(self) -> "ProductMediaBatch":
+        if self.order is not None and len(set(self.order)) != len(self.order):
+            raise ValueError("order lists a media id more than once")
+        if len(set(self.delete)) != len(self.delete):
+            raise ValueError("delete lists a media id more than once")
+        if set(self.delete) & (set(self.order or ()) | set(self.alt_text)):
+            raise ValueError("a deleted media id cannot also be reordered or edited")
+        return self
@@ -36,6 +36,27 @@ class OrderRead(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+class OrderSummary(BaseModel):
+    """One row of the order history; the full order is at GET /orders/{id}."""
+    id: uuid.UUID
+    payment_status: str
+    created_at: datetime
+    subtotal_amount: float
+    discount_amount: float
+    shipping_amount: float
+    total_amount: float
+    currency: str
+    applied_voucher_code: str | None
+    # Units across all lines
+    item_count: int
+    first_image_url: str | None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class OrderPage(BaseModel):
+    items: List[OrderSummary]
+    next_cursor: str | None = None
+
 class OrderCreate(BaseModel):
     contact_email: str | None = None
     payment_method: str | None = None
@@ -38,3 +38,10 @@ class ProductRead(ProductBase):
     model_config = ConfigDict(from_attributes=True, alias_generator=to_camel)
     category: CategoryRead = Field(..., alias="category")
     media: List[ProductMediaRead] = Field(default_factory=list, alias="media")
+
+
+class ProductPage(BaseModel):
+    items: List[ProductRead]
+    next_cursor: Optional[str] = None
+
+    model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True)
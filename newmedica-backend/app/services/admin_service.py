@@ -6,6 +6,7 @@ from typing import List, Optional
 from app.models.voucher import Voucher
 from app.repositories.base_repository import BaseRepository
 from app.schemas.admin_voucher import VoucherCreate, VoucherUpdate
+from app.services.voucher_index import voucher_rule_index
 
 class AdminVoucherService:
     def __init__(self, session: AsyncSession):
@@ -14,7 +15,9 @@ class AdminVoucherService:
 
     async def create_voucher(self, voucher_data: VoucherCreate) -> Voucher:
         new_voucher = Voucher.model_validate(voucher_data)
-        return await self.voucher_repo.create(new_voucher)
+        voucher = await self.voucher_repo.create(new_voucher)
+        await voucher_rule_index.refresh_voucher(self.session, voucher.id)
+        return voucher
 
     async def get_all_vouchers(self) -> List[Voucher]:
         return await self.voucher_repo.get_all()
@@ -23,7 +26,13 @@ class AdminVoucherService:
         return await self.voucher_repo.get_by_id(voucher_id)
 
     async def update_voucher(self, voucher_id: UUID, voucher_data: VoucherUpdate) -> Optional[Voucher]:
-        return await self.voucher_repo.update(voucher_id, voucher_data.model_dump(exclude_unset=True))
+        voucher = await self.voucher_repo.update(voucher_id, voucher_data.model_dump(exclude_unset=True))
+        if voucher:
+            await voucher_rule_index.refresh_voucher(self.session, voucher.id)
+        return voucher
 
     async def delete_voucher(self, voucher_id: UUID) -> bool:
-        return await self.voucher_repo.delete(voucher_id)
+        deleted = await self.voucher_repo.delete(voucher_id)
+        if deleted:
+            voucher_rule_index.remove_voucher(voucher_id)
+        return deleted
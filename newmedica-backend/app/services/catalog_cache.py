@@ -0,0 +1,113 @@
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+
+class _LoadAbandoned(Exception):
+    """Set on a shared load whose leading request was cancelled; waiters retry."""
+
+
+@dataclass(frozen=True)
+class CatalogEntry(Generic[T]):
+    """A cached read together with its HTTP validators."""
+
+    value: T
+    etag: str
+    last_modified: Optional[datetime]
+
+
+class CatalogCache:
+    """
+    In-memory cache of serialized catalog reads (ProductRead / ProductPage),
+    stored as CatalogEntry so conditional GETs can be answered from the cache.
+
+    Keys combine a catalog version with the query parameters. Catalog mutations
+    made through ProductService/MediaService/CategoryService call `bump()`,
+    which makes every older entry unreachable; the TTL bounds how long mutations
+    made by other workers can go unseen. Concurrent misses for the same key share one load.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.version = 0
+        self._entries: "OrderedDict[Tuple[Hashable, ...], Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Tuple[Hashable, ...], asyncio.Future] = {}
+
+    def bump(self) -> None:
+        self.version += 1
+        self._entries.clear()
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _get(self, key: Tuple[Hashable, ...]) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        cached_at, value = entry
+        if time.monotonic() - cached_at >= self.ttl_seconds:
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def _put(self, key: Tuple[Hashable, ...], value: Any) -> None:
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_or_load(self, params: Tuple[Hashable, ...], loader: Callable[[], Awaitable[T]]) -> T:
+        while True:
+            key = (self.version, *params)
+            hit, value = self._get(key)
+            if hit:
+                return value
+
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                return await self._load(key, loader)
+            try:
+                return await asyncio.shield(inflight)
+            except _LoadAbandoned:
+                # The leading request went away; the next waiter to get here takes over the load
+                continue
+
+    async def _load(self, key: Tuple[Hashable, ...], loader: Callable[[], Awaitable[T]]) -> T:
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            # Cancelling the shared future would cancel every waiter along with this request
+            future.set_exception(_LoadAbandoned())
+            future.exception()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark the exception as retrieved in case nobody else was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            # A bump during the load means the value may predate the mutation
+            if key[0] == self.version:
+                self._put(key, value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+catalog_cache = CatalogCache(
+    ttl_seconds=settings.CATALOG_CACHE_TTL_SECONDS,
+    max_entries=settings.CATALOG_CACHE_MAX_ENTRIES,
+)
@@ -5,6 +5,7 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 from app.models.category import Category
 from app.repositories.category_repository import CategoryRepository
 from app.schemas.category import CategoryCreate
+from app.services.catalog_cache import catalog_cache
 
 
 class CategoryService:
@@ -12,7 +13,9 @@ class CategoryService:
         self.repo = CategoryRepository(db_session)
 
     async def create_category(self, category: CategoryCreate) -> Category:
-        return await self.repo.create_category(category)
+        created = await self.repo.create_category(category)
+        catalog_cache.bump()
+        return created
 
     async def get_all_categories(self) -> List[Category]:
         return await self.repo.get_all_categories()
@@ -0,0 +1,204 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, Optional, Tuple, Union
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy.orm import sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.exceptions import BadRequestException, ConflictException, UnprocessableEntityException
+from app.db.session import AsyncSessionLocal
+from app.repositories.idempotency_repository import IdempotencyRepository
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 255
+
+# Records a handler's response under its key, in the handler's own transaction
+CompleteKey = Callable[[BaseModel], Awaitable[None]]
+
+
+async def request_fingerprint(request: Request) -> str:
+    """Identifies the request a key was first used with: method, path and body."""
+    digest = hashlib.sha256()
+    digest.update(f"{request.method} {request.url.path}\n".encode())
+    digest.update(await request.body())
+    return digest.hexdigest()
+
+
+class IdempotencyStore:
+    """
+    Honours `Idempotency-Key` on non-idempotent endpoints.
+
+    The first request for a (user, key) pair runs the handler and stores its
+    successful response for `ttl_seconds`; later requests with the same key
+    replay it. A duplicate that arrives while the first one is still running
+    waits for it (woken in-process, polling across workers) rather than running
+    the handler again. Failed requests release the key so the client can retry.
+
+    Handlers receive a `CompleteKey` callback and call it just before they
+    commit, so the stored response and the work it describes land in one
+    transaction: a crash can never leave committed work behind an in_progress
+    key that a retry would take over and run again. Handlers that return
+    without committing anything have their response recorded afterwards.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        ttl_seconds: float,
+        lock_seconds: float,
+        wait_timeout_seconds: float,
+        poll_interval_seconds: float,
+        purge_interval_seconds: float,
+        purge_batch_size: int = 1000,
+    ):
+        self.session_factory = session_factory
+        self.ttl_seconds = ttl_seconds
+        self.lock_seconds = lock_seconds
+        self.wait_timeout_seconds = wait_timeout_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self.purge_interval_seconds = purge_interval_seconds
+        self.purge_batch_size = purge_batch_size
+        self._running: Dict[Tuple[uuid.UUID, str], asyncio.Event] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def execute(
+        self,
+        session: AsyncSession,
+        user_id: uuid.UUID,
+        key: Optional[str],
+        fingerprint: str,
+        status_code: int,
+        handler: Callable[[CompleteKey], Awaitable[BaseModel]],
+    ) -> Union[BaseModel, JSONResponse]:
+        if key is None:
+            return await handler(_no_key)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise BadRequestException(f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters.")
+
+        repo = IdempotencyRepository(session)
+        deadline = time.monotonic() + self.wait_timeout_seconds
+        while True:
+            now = datetime.now(timezone.utc)
+            if await repo.claim(user_id, key, fingerprint, now, self.lock_seconds, self.ttl_seconds):
+                break
+            record = await repo.get(user_id, key)
+            if record is None:
+                continue
+            if record.request_hash != fingerprint and not _expired(record.expires_at, now):
+                raise UnprocessableEntityException("Idempotency-Key was already used with a different request.")
+            if await repo.take_over(record.id, fingerprint, now, self.lock_seconds, self.ttl_seconds):
+                break
+            if record.status == "completed":
+                return JSONResponse(
+                    content=json.loads(record.response_body),
+                    status_code=record.response_status,
+                    headers={"Idempotent-Replayed": "true"},
+                )
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise ConflictException("A request with this Idempotency-Key is still in progress.")
+            await self._wait_for(user_id, key, min(remaining, self.poll_interval_seconds))
+
+        return await self._run_owner(repo, session, user_id, key, status_code, handler)
+
+    async def _wait_for(self, user_id: uuid.UUID, key: str, timeout: float) -> None:
+        running = self._running.get((user_id, key))
+        if running is None:
+            # Owned by another worker: poll
+            await asyncio.sleep(timeout)
+            return
+        try:
+            await asyncio.wait_for(running.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run_owner(self, repo, session, user_id, key, status_code, handler) -> JSONResponse:
+        done = self._running[(user_id, key)] = asyncio.Event()
+        recorded: Dict[str, object] = {}
+
+        async def complete(result: BaseModel) -> None:
+            body = result.model_dump(mode="json", by_alias=True)
+            await repo.complete(user_id, key, status_code, json.dumps(body))
+            recorded["body"] = body
+
+        try:
+            try:
+                result = await handler(complete)
+                if "body" not in recorded:
+                    await complete(result)
+                    await session.commit()
+            except BaseException:
+                await session.rollback()
+                await repo.release(user_id, key)
+                raise
+            return JSONResponse(content=recorded["body"], status_code=status_code)
+        finally:
+            self._running.pop((user_id, key), None)
+            done.set()
+
+    async def purge_expired(self) -> int:
+        total = 0
+        while True:
+            async with self.session_factory() as session:
+                deleted = await IdempotencyRepository(session).delete_expired(
+                    datetime.now(timezone.utc), self.purge_batch_size
+                )
+            total += deleted
+            if deleted < self.purge_batch_size:
+                return total
+
+    async def run_forever(self) -> None:
+        while True:
+            try:
+                await self.purge_expired()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Idempotency key purge failed")
+            await asyncio.sleep(self.purge_interval_seconds)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+async def _no_key(result: BaseModel) -> None:
+    pass
+
+
+def _expired(expires_at: datetime, now: datetime) -> bool:
+    # SQLite hands back naive datetimes
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return expires_at < now
+
+
+idempotency_store = IdempotencyStore(
+    AsyncSessionLocal,
+    ttl_seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS,
+    lock_seconds=settings.IDEMPOTENCY_LOCK_SECONDS,
+    wait_timeout_seconds=settings.IDEMPOTENCY_WAIT_TIMEOUT_SECONDS,
+    poll_interval_seconds=settings.IDEMPOTENCY_POLL_INTERVAL_SECONDS,
+    purge_interval_seconds=settings.IDEMPOTENCY_PURGE_INTERVAL_SECONDS,
+)
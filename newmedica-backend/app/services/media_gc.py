@@ -0,0 +1,197 @@
+import asyncio
+import logging
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.repositories.media_repository import MediaRepository
+from app.services.media_storage import MediaStorage, StoredFile, media_storage
+from app.services.media_variants import MediaVariants, media_variants
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MediaSweepReport:
+    """What one sweep removed, or in a dry run would have removed."""
+
+    dry_run: bool
+    rows_purged: int = 0
+    blobs_deleted: int = 0
+    files_scanned: int = 0
+    files_deleted: int = 0
+    bytes_reclaimed: int = 0
+
+
+class MediaCollector:
+    """
+    Media garbage collector. Deleting media (or a product) only marks or drops
+    rows; the collector removes what they leave behind, in three passes:
+
+    1. purge media rows marked deleted, `batch_size` per transaction;
+    2. delete MediaBlob rows no media row references any more;
+    3. walk the store in `batch_size` batches and delete every file nothing
+       keeps: originals and variants whose blob is gone, upload temp files, and
+       pre-content-addressing files no live media URL points at. File deletes
+       run with at most `concurrency` in flight.
+
+    Blobs uploaded and files written within `grace_seconds` are left alone, so
+    an upload that has stored its file but not yet committed its rows never
+    loses it. A dry run changes nothing and reports what a real run would remove.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        storage: MediaStorage,
+        variants: MediaVariants,
+        batch_size: int,
+        grace_seconds: float,
+        concurrency: int,
+        interval_seconds: float,
+    ):
+        self.session_factory = session_factory
+        self.storage = storage
+        self.variants = variants
+        self.batch_size = batch_size
+        self.grace_seconds = grace_seconds
+        self.concurrency = concurrency
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self._last_report: Optional[MediaSweepReport] = None
+        self._last_swept_at: Optional[datetime] = None
+
+    async def sweep(self, dry_run: bool = False, now: Optional[datetime] = None) -> MediaSweepReport:
+        now = now or datetime.now(timezone.utc)
+        cutoff = now - timedelta(seconds=self.grace_seconds)
+        report = MediaSweepReport(dry_run=dry_run)
+        # One sweep at a time per process; sweeps in other workers only race to delete the same files
+        async with self._lock:
+            if dry_run:
+                await self._count_rows(report, cutoff)
+            else:
+                await self._collect_rows(report, cutoff)
+            await self._collect_files(report, cutoff)
+        if not dry_run:
+            self._last_report, self._last_swept_at = report, now
+        return report
+
+    async def _count_rows(self, report: MediaSweepReport, cutoff: datetime) -> None:
+        async with self.session_factory() as session:
+            repo = MediaRepository(session)
+            report.rows_purged = await repo.count_marked()
+            report.blobs_deleted = await repo.count_unused_blobs(cutoff)
+
+    async def _collect_rows(self, report: MediaSweepReport, cutoff: datetime) -> None:
+        while True:
+            async with self.session_factory() as session:
+                purged = await MediaRepository(session).purge_marked(self.batch_size)
+                await session.commit()
+            report.rows_purged += purged
+            if purged < self.batch_size:
+                break
+        while True:
+            async with self.session_factory() as session:
+                deleted = await MediaRepository(session).delete_unused_blobs(cutoff, self.batch_size)
+                await session.commit()
+            report.blobs_deleted += deleted
+            if deleted < self.batch_size:
+                break
+
+    async def _collect_files(self, report: MediaSweepReport, cutoff: datetime) -> None:
+        slots = asyncio.Semaphore(self.concurrency)
+
+        async def delete(stored: StoredFile) -> None:
+            async with slots:
+                await self.storage.delete(stored.storage_key)
+
+        async for batch in self.storage.scan(self.batch_size):
+            report.files_scanned += len(batch)
+            garbage = await self._garbage(batch, cutoff, report.dry_run)
+            report.files_deleted += len(garbage)
+            report.bytes_reclaimed += sum(stored.size_bytes for stored in garbage)
+            if not report.dry_run:
+                await asyncio.gather(*(delete(stored) for stored in garbage))
+
+    async def _garbage(self, batch: List[StoredFile], cutoff: datetime, dry_run: bool) -> List[StoredFile]:
+        garbage: List[StoredFile] = []
+        by_hash: Dict[str, List[StoredFile]] = {}
+        by_url: Dict[str, StoredFile] = {}
+        for stored in batch:
+            if stored.modified_at >= cutoff.timestamp():
+                continue
+            key = stored.storage_key
+            variant = self.variants.parse_variant_key(key)
+            sha256 = variant[0] if variant else self.storage.original_hash(key)
+            if sha256 is not None:
+                by_hash.setdefault(sha256, []).append(stored)
+            elif key.startswith(".tmp/") or key.startswith("variants/"):
+                # Abandoned upload, or a variant of a width no longer configured
+                garbage.append(stored)
+            elif "/" not in key:
+                # Stored before content addressing, under the upload's own name
+                by_url[self.storage.url_for(key)] = stored
+
+        if by_hash or by_url:
+            async with self.session_factory() as session:
+                repo = MediaRepository(session)
+                kept = await repo.kept_blob_hashes(by_hash, cutoff, dry_run) if by_hash else set()
+                live_urls = await repo.live_urls(by_url) if by_url else set()
+            garbage.extend(stored for sha256, files in by_hash.items() if sha256 not in kept for stored in files)
+            garbage.extend(stored for url, stored in by_url.items() if url not in live_urls)
+        return garbage
+
+    async def run_forever(self) -> None:
+        while True:
+            try:
+                report = await self.sweep()
+                if report.files_deleted or report.rows_purged:
+                    logger.info(
+                        "Media GC purged %d rows and %d blobs, deleted %d files (%d bytes)",
+                        report.rows_purged,
+                        report.blobs_deleted,
+                        report.files_deleted,
+                        report.bytes_reclaimed,
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Media GC sweep failed")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None,
+            "last_swept_at": self._last_swept_at.isoformat() if self._last_swept_at else None,
+            "last_sweep": asdict(self._last_report) if self._last_report else None,
+        }
+
+
+media_collector = MediaCollector(
+    AsyncSessionLocal,
+    storage=media_storage,
+    variants=media_variants,
+    batch_size=settings.MEDIA_GC_BATCH_SIZE,
+    grace_seconds=settings.MEDIA_GC_GRACE_SECONDS,
+    concurrency=settings.MEDIA_GC_CONCURRENCY,
+    interval_seconds=settings.MEDIA_GC_INTERVAL_SECONDS,
+)
@@ -1,9 +1,13 @@
-import os
+from typing import List, Optional
 from uuid import UUID
 
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core.exceptions import APIException, NotFoundException
+from app.models.product_media import ProductMedia
 from app.repositories.media_repository import MediaRepository
+from app.schemas.media import ProductMediaBatch
+from app.services.catalog_cache import catalog_cache
 
 
 class MediaService:
@@ -11,16 +15,67 @@ class MediaService:
         self.repo = MediaRepository(db_session)
 
     async def delete_media(self, media_id: UUID):
-        media = await self.repo.get_media_by_id(media_id)
-        if media:
-            # Attempt to delete the file from storage
-            try:
-                # The URL starts with a /, so we strip it
-                file_path = media.url.lstrip("/")
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-            except Exception as e:
-                # Log this error, but don't block the DB operation
-                print(f"Error deleting file {media.url}: {e}")
-
-            await self.repo.delete_media(media)
+        """
+        Marks a media row deleted. It disappears from the product at once; the row
+        and any file no other media uses are removed later by the media GC.
+        """
+        if await self.repo.mark_deleted([media_id]):
+            await self.repo.session.commit()
+            catalog_cache.bump()
+
+    async def apply_batch(self, product_id: UUID, batch: ProductMediaBatch) -> List[ProductMedia]:
+        """
+        Applies a batch of media edits to a product in one transaction, one
+        set-based statement per kind of edit. Every statement is scoped to the
+        product, so a media id of another product (or an unknown one) shows up as
+        a short row count and rolls the whole batch back. Returns the product's
+        media in display order.
+        """
+        if not await self.repo.product_exists(product_id):
+            raise NotFoundException("Product not found.")
+
+        try:
+            _require_all(await self.repo.mark_deleted(batch.delete, product_id=product_id), batch.delete)
+            if batch.order is not None:
+                _require_all(await self.repo.reorder(product_id, batch.order), batch.order)
+            _require_all(await self.repo.update_alt_texts(product_id, batch.alt_text), batch.alt_text)
+            if batch.attach:
+                await self._attach(product_id, batch)
+            await self.repo.session.commit()
+        except APIException:
+            await self.repo.session.rollback()
+            raise
+
+        catalog_cache.bump()
+        return await self.repo.get_product_media(product_id)
+
+    async def _attach(self, product_id: UUID, batch: ProductMediaBatch) -> None:
+        source_ids = {attach.source_media_id for attach in batch.attach}
+        sources = {media.id: media for media in await self.repo.get_media_by_ids(source_ids)}
+        if len(sources) != len(source_ids):
+            raise NotFoundException("Media to attach not found.")
+
+        next_order: Optional[int] = None
+        if any(a.display_order is None for a in batch.attach):
+            next_order = await self.repo.next_display_order(product_id)
+        attached = []
+        for attach in batch.attach:
+            source = sources[attach.source_media_id]
+            display_order = attach.display_order
+            if display_order is None:
+                display_order, next_order = next_order, next_order + 1
+            attached.append(
+                ProductMedia(
+                    product_id=product_id,
+                    url=source.url,
+                    blob_sha256=source.blob_sha256,
+                    alt_text=source.alt_text if attach.alt_text is None else attach.alt_text,
+                    display_order=display_order,
+                )
+            )
+        self.repo.add_media(attached)
+
+
+def _require_all(matched: int, media_ids) -> None:
+    if matched != len(media_ids):
+        raise NotFoundException("Media not found for this product.")
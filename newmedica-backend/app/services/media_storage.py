@@ -0,0 +1,229 @@
+import asyncio
+import hashlib
+import itertools
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, BinaryIO, Dict, Iterable, Iterator, List, Optional
+
+from fastapi import UploadFile
+
+from app.core.config import settings
+from app.core.exceptions import (
+    APIException,
+    BadRequestException,
+    PayloadTooLargeException,
+    UnsupportedMediaTypeException,
+)
+
+# Leading bytes of each image format we accept, with the extension its files get.
+# The client's filename and Content-Type are not trusted.
+_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png", ".png"),
+    (b"GIF87a", "image/gif", ".gif"),
+    (b"GIF89a", "image/gif", ".gif"),
+)
+_EXTENSIONS = {content_type: extension for _, content_type, extension in _SIGNATURES}
+_EXTENSIONS["image/webp"] = ".webp"
+_ORIGINAL_KEY = re.compile(r"^[0-9a-f]{2}/[0-9a-f]{2}/(?P<sha256>[0-9a-f]{64})\.[a-z]+$")
+
+
+def sniff_content_type(head: bytes) -> Optional[str]:
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    for signature, content_type, _ in _SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    return None
+
+
+@dataclass(frozen=True)
+class StoredMedia:
+    sha256: str
+    content_type: str
+    size_bytes: int
+    # Path relative to the storage root; also the tail of the public URL
+    storage_key: str
+    # False when an identical file was already stored
+    created: bool
+
+
+@dataclass(frozen=True)
+class StoredFile:
+    storage_key: str
+    size_bytes: int
+    modified_at: float
+
+
+class MediaStorage:
+    """
+    Content-addressed media files: each distinct upload is stored once at
+    `<root>/<aa>/<bb>/<sha256><ext>` and shared by every media row that uses it.
+
+    Uploads are copied from Starlette's spooled upload file in `chunk_bytes`
+    chunks on a dedicated thread pool, hashed while they stream into a temp
+    file, then renamed into place (or dropped if the content is already
+    stored). The event loop never touches the file, and a batch of large
+    uploads queues on `max_workers` threads instead of the shared threadpool.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        url_prefix: str,
+        max_bytes: int,
+        allowed_types: Iterable[str],
+        chunk_bytes: int,
+        max_workers: int,
+    ):
+        self.root = root
+        self.url_prefix = url_prefix.rstrip("/")
+        self.max_bytes = max_bytes
+        self.allowed_types = frozenset(allowed_types)
+        self.chunk_bytes = chunk_bytes
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._stored = 0
+        self._deduplicated = 0
+        self._rejected = 0
+        self._bytes_written = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="media-io")
+        return self._executor
+
+    async def _run(self, fn, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+
+    def url_for(self, storage_key: str) -> str:
+        return f"{self.url_prefix}/{storage_key}"
+
+    def path_for(self, storage_key: str) -> str:
+        return os.path.join(self.root, *storage_key.split("/"))
+
+    def original_hash(self, storage_key: str) -> Optional[str]:
+        """The content hash of a content-addressed original's key, else None."""
+        match = _ORIGINAL_KEY.match(storage_key)
+        return match["sha256"] if match else None
+
+    def find_original(self, sha256: str) -> Optional[str]:
+        """Storage key of the stored file with this content hash, if any."""
+        for extension in set(_EXTENSIONS.values()):
+            storage_key = f"{sha256[:2]}/{sha256[2:4]}/{sha256}{extension}"
+            if os.path.isfile(self.path_for(storage_key)):
+                return storage_key
+        return None
+
+    async def save(self, upload: UploadFile) -> StoredMedia:
+        """Stores an upload, raising 413/415 (nothing is kept) if it breaks the limits."""
+        try:
+            stored = await self._run(self._save_sync, upload.file)
+        except APIException:
+            self._rejected += 1
+            raise
+        if stored.created:
+            self._stored += 1
+            self._bytes_written += stored.size_bytes
+        else:
+            self._deduplicated += 1
+        return stored
+
+    def _save_sync(self, source: BinaryIO) -> StoredMedia:
+        source.seek(0)
+        digest = hashlib.sha256()
+        size = 0
+        content_type = None
+        tmp_dir = os.path.join(self.root, ".tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as target:
+                while chunk := source.read(self.chunk_bytes):
+                    if content_type is None:
+                        content_type = sniff_content_type(chunk)
+                        if content_type is None or content_type not in self.allowed_types:
+                            raise UnsupportedMediaTypeException(
+                                f"Uploads must be one of: {', '.join(sorted(self.allowed_types))}."
+                            )
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise PayloadTooLargeException(f"Uploads are limited to {self.max_bytes} bytes.")
+                    digest.update(chunk)
+                    target.write(chunk)
+            if content_type is None:
+                raise BadRequestException("The uploaded file is empty.")
+
+            sha256 = digest.hexdigest()
+            storage_key = f"{sha256[:2]}/{sha256[2:4]}/{sha256}{_EXTENSIONS[content_type]}"
+            final_path = self.path_for(storage_key)
+            created = not os.path.exists(final_path)
+            if created:
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                # Atomic: concurrent uploads of the same content both rename identical bytes
+                os.replace(tmp_path, final_path)
+            else:
+                # Fresh again for the media GC's grace period while this upload commits
+                os.utime(final_path)
+            return StoredMedia(sha256, content_type, size, storage_key, created)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    async def delete(self, storage_key: str) -> None:
+        await self._run(self._delete_sync, storage_key)
+
+    def _delete_sync(self, storage_key: str) -> None:
+        try:
+            os.remove(self.path_for(storage_key))
+        except FileNotFoundError:
+            pass
+
+    async def scan(self, batch_size: int) -> AsyncIterator[List[StoredFile]]:
+        """
+        Every file under the root, in batches, from a lazy directory walk on the
+        I/O pool: memory stays bounded by `batch_size` however large the store.
+        """
+        files = self._walk(self.root, "")
+        while batch := await self._run(lambda: list(itertools.islice(files, batch_size))):
+            yield batch
+
+    def _walk(self, directory: str, prefix: str) -> Iterator[StoredFile]:
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    storage_key = prefix + entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        yield from self._walk(entry.path, storage_key + "/")
+                    elif entry.is_file(follow_symlinks=False):
+                        stat_result = entry.stat(follow_symlinks=False)
+                        yield StoredFile(storage_key, stat_result.st_size, stat_result.st_mtime)
+        except FileNotFoundError:
+            return
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.max_workers,
+            "stored": self._stored,
+            "deduplicated": self._deduplicated,
+            "rejected": self._rejected,
+            "bytes_written": self._bytes_written,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+media_storage = MediaStorage(
+    root=settings.MEDIA_ROOT,
+    url_prefix=settings.MEDIA_URL_PREFIX,
+    max_bytes=settings.MEDIA_MAX_UPLOAD_BYTES,
+    allowed_types=settings.MEDIA_ALLOWED_TYPES,
+    chunk_bytes=settings.MEDIA_UPLOAD_CHUNK_BYTES,
+    max_workers=settings.MEDIA_UPLOAD_WORKERS,
+)
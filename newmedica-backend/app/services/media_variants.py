@@ -0,0 +1,171 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.services.media_storage import MediaStorage, media_storage
+from app.utils.images import render_webp_variants
+from app.utils.media_urls import variant_key, variant_srcset
+
+logger = logging.getLogger(__name__)
+
+_VARIANT_KEY = re.compile(r"^variants/[0-9a-f]{2}/[0-9a-f]{2}/(?P<sha256>[0-9a-f]{64})-(?P<width>\d+)w\.webp$")
+
+
+class MediaVariants:
+    """
+    Resized WebP renditions of stored media, one per configured width.
+
+    Variants belong to the stored file rather than a media row, so their keys
+    (`variants/<aa>/<bb>/<sha256>-<width>w.webp`) are derived from the content
+    hash alone: every row sharing a file shares its variants, and the srcset for a
+    row needs no lookup. After an upload all widths are rendered in the
+    background; a variant that is still missing (older uploads, a new width, a
+    cleared disk) is rendered on its first request.
+
+    Decoding and resizing are CPU-bound and hold the GIL, so they run on a
+    process pool. One job decodes the original once for all the widths it
+    renders, and concurrent requests for a variant share the job rendering it.
+    """
+
+    def __init__(
+        self, storage: MediaStorage, widths: Iterable[int], quality: int, max_workers: int, on_upload: bool
+    ):
+        self.storage = storage
+        self.widths = tuple(sorted(set(widths)))
+        self.quality = quality
+        self.max_workers = max_workers
+        self.on_upload = on_upload
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._background: Set[asyncio.Task] = set()
+        self._rendered = 0
+        self._rendered_on_request = 0
+        self._failures = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Not fork: the API process runs threads (DB driver, media I/O) that a forked child would inherit mid-state
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def variant_key(self, sha256: str, width: int) -> str:
+        return variant_key(sha256, width)
+
+    def parse_variant_key(self, storage_key: str) -> Optional[Tuple[str, int]]:
+        """`(sha256, width)` for the key of a configured variant, else None."""
+        match = _VARIANT_KEY.match(storage_key)
+        if match is None or int(match["width"]) not in self.widths:
+            return None
+        return match["sha256"], int(match["width"])
+
+    def srcset(self, sha256: Optional[str]) -> Dict[str, str]:
+        """Variant URLs by width descriptor (`{"320w": url, ...}`); empty for media without a stored file."""
+        return variant_srcset(self.storage.url_prefix, sha256, self.widths)
+
+    def thumbnail_url(self, url: str, sha256: Optional[str]) -> str:
+        """The smallest variant of a media file, or its original URL when it has none."""
+        if sha256 is None or not self.widths:
+            return url
+        return self.storage.url_for(self.variant_key(sha256, self.widths[0]))
+
+    def schedule(self, sha256: str, source_key: str) -> None:
+        """Renders every width of a new upload in the background, if enabled."""
+        if not self.on_upload:
+            return
+        task = asyncio.create_task(self._render_in_background(sha256, source_key))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _render_in_background(self, sha256: str, source_key: str) -> None:
+        try:
+            await self._render(sha256, source_key, self.widths)
+        except Exception:
+            self._failures += 1
+            logger.exception("Rendering variants of %s failed", source_key)
+
+    async def ensure(self, sha256: str, width: int, source_key: str) -> Optional[str]:
+        """
+        Path of a variant on disk, rendering it first if it is missing. None if the
+        original cannot be decoded.
+        """
+        path = self.storage.path_for(self.variant_key(sha256, width))
+        if os.path.exists(path):
+            return path
+        try:
+            await self._render(sha256, source_key, (width,))
+        except Exception:
+            self._failures += 1
+            logger.exception("Rendering %dw variant of %s failed", width, source_key)
+            return None
+        self._rendered_on_request += 1
+        return path
+
+    async def _render(self, sha256: str, source_key: str, widths: Iterable[int]) -> None:
+        keys = [self.variant_key(sha256, width) for width in widths]
+        targets: List[Tuple[int, str]] = []
+        for width, key in zip(widths, keys):
+            if key not in self._in_flight and not os.path.exists(self.storage.path_for(key)):
+                targets.append((width, self.storage.path_for(key)))
+
+        if targets:
+            job = asyncio.get_running_loop().run_in_executor(
+                self._get_executor(),
+                render_webp_variants,
+                self.storage.path_for(source_key),
+                targets,
+                self.quality,
+            )
+            started = [self.variant_key(sha256, width) for width, _ in targets]
+            for key in started:
+                self._in_flight[key] = job
+
+            def _finished(done: asyncio.Future) -> None:
+                for key in started:
+                    self._in_flight.pop(key, None)
+                if not done.cancelled() and done.exception() is None:
+                    self._rendered += len(started)
+
+            job.add_done_callback(_finished)
+
+        # Shielded: one waiter giving up must not cancel a job others are waiting on
+        jobs = {id(job): job for key in keys if (job := self._in_flight.get(key)) is not None}
+        for job in jobs.values():
+            await asyncio.shield(job)
+
+    async def drain(self) -> None:
+        """Waits for background renders started so far."""
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "widths": list(self.widths),
+            "workers": self.max_workers,
+            "in_flight": len(set(map(id, self._in_flight.values()))),
+            "rendered": self._rendered,
+            "rendered_on_request": self._rendered_on_request,
+            "failures": self._failures,
+        }
+
+    def shutdown(self) -> None:
+        for task in self._background:
+            task.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+media_variants = MediaVariants(
+    storage=media_storage,
+    widths=settings.MEDIA_VARIANT_WIDTHS,
+    quality=settings.MEDIA_VARIANT_QUALITY,
+    max_workers=settings.MEDIA_VARIANT_WORKERS,
+    on_upload=settings.MEDIA_VARIANTS_ON_UPLOAD,
+)
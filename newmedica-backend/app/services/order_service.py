@@ -1,107 +1,210 @@
+import logging
 import uuid
-import stripe
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
 from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.exceptions import OutOfStockException
 from app.repositories.order_repository import OrderRepository
+from app.repositories.payment_coupon_repository import PaymentCouponRepository
+from app.repositories.product_repository import ProductRepository
 from app.repositories.cart_repository import CartRepository
 from app.models.order import Order, OrderItem
-from app.models.product import Product
-from sqlmodel import select
-from sqlalchemy.orm import selectinload
+from app.models.user import User
+from app.schemas.order import OrderCreate, OrderPage
+from app.services.catalog_cache import catalog_cache
+from app.services.media_variants import media_variants
+from app.services.payment_gateway import (
+    CheckoutSession,
+    PaymentGateway,
+    PaymentGatewayError,
+    get_payment_gateway,
+)
 from app.services.pricing_service import PricingService
 from app.core.config import settings
 from fastapi import HTTPException, status
 
+logger = logging.getLogger(__name__)
+
 class OrderService:
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, payment_gateway: PaymentGateway | None = None):
         self.session = session
         self.order_repository = OrderRepository(session)
         self.cart_repository = CartRepository(session)
-        stripe.api_key = settings.STRIPE_SECRET_KEY
+        self.product_repository = ProductRepository(session)
+        self.payment_gateway = payment_gateway or get_payment_gateway()
+
+    async def create_order_from_cart(
+        self,
+        user_id: uuid.UUID,
+        clear_cart: bool = True,
+        details: OrderCreate | None = None,
+        before_commit: Optional[Callable[[Order], Awaitable[None]]] = None,
+    ) -> Order:
+        """
+        Places an order in a single transaction: one cart load, one pricing pass,
+        conditional stock decrements, one batched insert of fully populated order
+        items and one commit. Raises OutOfStockException (nothing is written) when
+        any line cannot be covered. `before_commit` runs in that transaction, e.g.
+        to record the response under an Idempotency-Key atomically with the order.
 
-    async def create_order_from_cart(self, user_id: uuid.UUID, clear_cart: bool = True) -> Order:
+        The stock taken here is a hold: if the order is still pending after
+        STOCK_RESERVATION_TTL_SECONDS, the reservation sweeper cancels it and
+        puts the stock back.
+        """
         cart = await self.cart_repository.get_cart_by_user_id(user_id)
-        
+
         # Always create a new order from the cart
         if not cart or not cart.items:
             raise ValueError("Cart is empty")
-        order = await self.order_repository.create_order_from_cart(user_id, cart)
 
-        # Compute totals using pricing service (includes vouchers + shipping)
-        pricing = PricingService(self.session)
-        totals = await pricing.compute_totals(user_id)
+        user = await self.session.get(User, user_id)
+        if not user:
+            raise ValueError("User not found")
 
-        # Overwrite total_amount with computed total (backward compatible)
-        order.total_amount = float(totals.get("total", order.total_amount))
-        order.applied_voucher_code = totals.get("applied_voucher_code") # Assign applied voucher code
-        self.session.add(order)
-        await self.session.commit()
-        await self.session.refresh(order)
+        # Compute totals using pricing service (includes vouchers + shipping)
+        totals = await PricingService(self.session).compute_totals_for_items(user, cart.items)
+        subtotal = float(totals.get("subtotal", 0.0))
+        total_discount = float(totals.get("discount", 0.0))
 
-        # Populate snapshot fields and amounts breakdown without triggering lazy loads on order.items
-        result_items = await self.session.execute(
-            select(OrderItem).where(OrderItem.order_id == order.id).options(selectinload(OrderItem.product).selectinload(Product.media))
+        order = Order(
+            user_id=user_id,
+            subtotal_amount=subtotal,
+            discount_amount=total_discount,
+            shipping_amount=float(totals.get("shipping", 0.0)),
+            total_amount=float(totals.get("total", 0.0)),
+            applied_voucher_code=totals.get("applied_voucher_code"),
+            reserved_until=datetime.now(timezone.utc) + timedelta(seconds=settings.STOCK_RESERVATION_TTL_SECONDS),
         )
-        order_items = list(result_items.scalars().all())
-        subtotal = 0.0
-        for item in order_items:
-            product = await self.session.get(Product, item.product_id)
-            if product:
-                item.snapshot_name = product.name
-                item.snapshot_price = product.price
-                # Pick first media url if available
-                if getattr(product, "media", None):
-                    try:
-                        first_media = sorted(product.media, key=lambda m: m.display_order)[0]
-                        item.snapshot_media_url = first_media.url
-                    except Exception:
-                        item.snapshot_media_url = None
-            line_subtotal = (item.unit_price or (product.price if product else 0.0)) * item.quantity
-            item.line_subtotal = line_subtotal
-            subtotal += line_subtotal
+        if details:
+            order.shipping_address = details.shipping_address
+            # If billing address is not provided, use the shipping address
+            order.billing_address = details.billing_address or details.shipping_address
+            order.remark = details.remark
+            order.payment_method = details.payment_method
 
-        total_discount = float(totals.get("discount", 0.0))
-        if subtotal > 0:
-            for item in order_items:
-                item_discount = (item.line_subtotal / subtotal) * total_discount
-                item.discount_amount = item_discount
-                item.line_total = item.line_subtotal - item_discount
-        else:
-            for item in order_items:
-                item.discount_amount = 0.0
-                item.line_total = item.line_subtotal
-
-        order.subtotal_amount = subtotal
-        order.shipping_amount = float(totals.get("shipping", 0.0))
-        order.discount_amount = total_discount
-        order.currency = order.currency or "MYR"
-        self.session.add(order)
-        for it in order_items:
-            self.session.add(it)
-        await self.session.commit()
+        order_items = []
+        for cart_item in cart.items:
+            product = cart_item.product
+            line_subtotal = product.price * cart_item.quantity
+            # Allocate the order-level discount proportionally across lines
+            item_discount = (line_subtotal / subtotal) * total_discount if subtotal > 0 else 0.0
+            order_items.append(
+                OrderItem(
+                    order_id=order.id,
+                    product_id=product.id,
+                    quantity=cart_item.quantity,
+                    unit_price=product.price,
+                    snapshot_name=product.name,
+                    snapshot_price=product.price,
+                    # Product.media is ordered by display_order
+                    snapshot_media_url=(
+                        media_variants.thumbnail_url(product.media[0].url, product.media[0].blob_sha256)
+                        if product.media
+                        else None
+                    ),
+                    line_subtotal=line_subtotal,
+                    discount_amount=item_discount,
+                    line_total=line_subtotal - item_discount,
+                )
+            )
 
+        await self._decrement_stock(cart.items)
+        self.order_repository.add_order_with_items(order, order_items)
         # Clear the cart only if requested (e.g., non-Stripe flows)
         if clear_cart:
-            for item in cart.items:
-                await self.session.delete(item)
-            await self.session.commit()
+            await self.cart_repository.clear_cart_items(cart.id)
+        if before_commit is not None:
+            await before_commit(order)
+        await self.session.commit()
+        # Cached product reads carry stock
+        catalog_cache.bump()
+        return order
 
-        # Re-fetch eagerly-loaded order for response serialization
-        result = await self.session.execute(
-            select(Order)
-            .where(Order.id == order.id)
-            .options(
-                selectinload(Order.items),
-            )
+    async def _decrement_stock(self, cart_items) -> None:
+        # The conditional UPDATE is what guards against overselling
+        quantities = Counter()
+        for cart_item in cart_items:
+            quantities[cart_item.product_id] += cart_item.quantity
+
+        shortfalls = await self.product_repository.decrement_stock(quantities)
+        if not shortfalls:
+            return
+
+        names = {cart_item.product_id: cart_item.product.name for cart_item in cart_items}
+        await self.session.rollback()
+        raise OutOfStockException(
+            [
+                {
+                    "product_id": str(product_id),
+                    "name": names[product_id],
+                    "requested": quantities[product_id],
+                    "available": available,
+                }
+                for product_id, available in shortfalls.items()
+            ]
         )
-        return result.scalar_one()
 
-    async def get_orders_by_user_id(self, user_id: uuid.UUID) -> list[Order]:
-        return await self.order_repository.get_orders_by_user_id(user_id)
+    async def _retake_released_stock(self, order: Order) -> None:
+        quantities = Counter()
+        for item in order.items:
+            quantities[item.product_id] += item.quantity
+        shortfalls = await self.product_repository.decrement_stock(quantities)
+        if shortfalls:
+            # The payment is captured either way; fulfilment has to restock or refund
+            logger.warning(
+                "Order %s was paid after its reservation expired; short on %s",
+                order.id,
+                {str(product_id): quantities[product_id] - available for product_id, available in shortfalls.items()},
+            )
+
+    async def get_order_summaries(
+        self, user_id: uuid.UUID, limit: int = 20, cursor: str | None = None
+    ) -> OrderPage:
+        summaries, next_cursor = await self.order_repository.get_order_summaries(user_id, limit=limit, cursor=cursor)
+        return OrderPage(items=summaries, next_cursor=next_cursor)
 
     async def get_order_by_id(self, order_id: uuid.UUID) -> Order | None:
         return await self.order_repository.get_order_by_id(order_id)
 
-    def _create_stripe_session_for_order(self, order: Order) -> dict:
+    async def get_orders_version(self, user_id: uuid.UUID):
+        return await self.order_repository.get_orders_version(user_id)
+
+    async def get_order_version(self, order_id: uuid.UUID):
+        return await self.order_repository.get_order_version(order_id)
+
+    async def _coupon_for(self, amount_off: int, currency: str) -> str:
+        coupons = PaymentCouponRepository(self.session)
+        coupon_id = await coupons.get_coupon_id(amount_off, currency)
+        if coupon_id is None:
+            coupon_id = await self.payment_gateway.create_coupon(
+                name=f"{amount_off / 100:.2f} {currency.upper()} off",
+                amount_off=amount_off,
+                currency=currency,
+            )
+            coupon_id = await coupons.add(amount_off, currency, coupon_id)
+        return coupon_id
+
+    @staticmethod
+    def _open_checkout_session(order: Order, now: datetime) -> CheckoutSession | None:
+        """The order's current checkout session, unless it is missing or about to expire."""
+        expires_at = order.checkout_session_expires_at
+        if not order.checkout_session_id or not order.checkout_session_url or expires_at is None:
+            return None
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        if expires_at - now < timedelta(seconds=settings.CHECKOUT_SESSION_REUSE_MARGIN_SECONDS):
+            return None
+        return CheckoutSession(
+            id=order.checkout_session_id,
+            url=order.checkout_session_url,
+            status="open",
+            payment_status="unpaid",
+            client_reference_id=str(order.id),
+            expires_at=int(expires_at.timestamp()),
+        )
+
+    async def _create_stripe_session_for_order(self, order: Order) -> CheckoutSession:
         line_items = []
         for item in order.items:
             line_items.append(
@@ -132,23 +235,18 @@ class OrderService:
                 }
             )
 
-        # Add discount as a coupon
+        # Add discount as a coupon, shared by every order with the same amount off
         if order.discount_amount > 0:
-            coupon = stripe.Coupon.create(
-                name=f"D-{order.id}",
-                amount_off=int(order.discount_amount * 100),
-                currency=order.currency or "myr",
-                duration="once",
-            )
-            discounts = [{"coupon": coupon.id}]
+            coupon_id = await self._coupon_for(int(order.discount_amount * 100), (order.currency or "myr").lower())
+            order.checkout_coupon_id = coupon_id
+            discounts = [{"coupon": coupon_id}]
         else:
             discounts = []
 
-        checkout_session = stripe.checkout.Session.create(
+        checkout_session = await self.payment_gateway.create_checkout_session(
             payment_method_types=["card", "fpx"],
             line_items=line_items,
             discounts=discounts,
-            mode="payment",
             success_url=f"{settings.server_host}/orders/success?session_id={{CHECKOUT_SESSION_ID}}",
             cancel_url=f"{settings.server_host}/orders/cancel",
             client_reference_id=str(order.id),
@@ -157,8 +255,8 @@ class OrderService:
 
     async def verify_payment_status(self, stripe_session_id: str, user_id: uuid.UUID) -> Order:
         try:
-            checkout_session = stripe.checkout.Session.retrieve(stripe_session_id)
-        except stripe.error.StripeError as e:
+            checkout_session = await self.payment_gateway.retrieve_checkout_session(stripe_session_id)
+        except PaymentGatewayError as e:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Stripe API Error: {e.user_message}")
 
         if not checkout_session:
@@ -185,26 +283,85 @@ class OrderService:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to update order status.")
         return updated_order
 
-    async def retry_payment_for_order(self, order_id: uuid.UUID, user_id: uuid.UUID) -> dict:
+    async def retry_payment_for_order(
+        self,
+        order_id: uuid.UUID,
+        user_id: uuid.UUID,
+        before_commit: Optional[Callable[[CheckoutSession], Awaitable[None]]] = None,
+    ) -> CheckoutSession:
+        """
+        Returns a checkout session for a pending order: the order's current one
+        while it is open, otherwise a new one (recorded on the order). A new
+        session is passed to `before_commit` in the transaction that records it.
+        """
         order = await self.get_order_by_id(order_id)
 
         if not order or order.user_id != user_id:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
 
+        if order.payment_status == "cancelled":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Order reservation has expired; please place a new order.",
+            )
         if order.payment_status != "pending":
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Order has already been paid.",
             )
 
-        session = self._create_stripe_session_for_order(order)
-        return session
+        # Give the new checkout session a full hold window
+        if order.reserved_until is not None:
+            now = datetime.now(timezone.utc)
+            until = now + timedelta(seconds=settings.STOCK_RESERVATION_TTL_SECONDS)
+            if not await self.order_repository.extend_reservation(order_id, now=now, until=until):
+                await self.session.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Order reservation has expired; please place a new order.",
+                )
+            await self.session.commit()
+
+        open_session = self._open_checkout_session(order, datetime.now(timezone.utc))
+        if open_session is not None:
+            return open_session
+
+        try:
+            checkout_session = await self._create_stripe_session_for_order(order)
+        except PaymentGatewayError as e:
+            raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=f"Stripe API Error: {e.user_message}")
+
+        order.checkout_session_id = checkout_session.id
+        order.checkout_session_url = checkout_session.url
+        order.checkout_session_expires_at = (
+            datetime.fromtimestamp(checkout_session.expires_at, tz=timezone.utc)
+            if checkout_session.expires_at
+            else None
+        )
+        self.session.add(order)
+        if before_commit is not None:
+            await before_commit(checkout_session)
+        await self.session.commit()
+        return checkout_session
 
     async def mark_order_paid(self, order_id: uuid.UUID) -> Order | None:
-        # Update status first
-        updated = await self.order_repository.update_payment_status(order_id, status="paid")
+        """
+        Pending -> paid. The stock held at checkout becomes a permanent decrement
+        by dropping the hold. If the sweeper already cancelled the order and
+        released its stock, the stock is taken again for the late payment.
+        """
+        updated = await self.order_repository.get_order_by_id(order_id)
         if not updated:
             return None
+        if updated.payment_status != "paid":
+            retook_stock = False
+            if not await self.order_repository.transition_payment_status(order_id, "pending", "paid"):
+                if await self.order_repository.transition_payment_status(order_id, "cancelled", "paid"):
+                    await self._retake_released_stock(updated)
+                    retook_stock = True
+            await self.session.commit()
+            if retook_stock:
+                catalog_cache.bump()
         # Best-effort clear of user's cart upon successful payment
         try:
             if getattr(updated, "user_id", None):
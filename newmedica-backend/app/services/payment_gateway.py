@@ -0,0 +1,209 @@
+import asyncio
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+import httpx
+
+from app.core.config import settings
+
+
+class PaymentGatewayError(Exception):
+    """Raised when the payment provider rejects a request or cannot be reached."""
+
+    def __init__(self, user_message: str, status_code: Optional[int] = None):
+        super().__init__(user_message)
+        self.user_message = user_message
+        self.status_code = status_code
+
+
+@dataclass(frozen=True)
+class CheckoutSession:
+    id: str
+    url: Optional[str]
+    status: Optional[str]
+    payment_status: Optional[str]
+    client_reference_id: Optional[str]
+    expires_at: Optional[int] = None
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any]) -> "CheckoutSession":
+        return cls(
+            id=payload["id"],
+            url=payload.get("url"),
+            status=payload.get("status"),
+            payment_status=payload.get("payment_status"),
+            client_reference_id=payload.get("client_reference_id"),
+            expires_at=payload.get("expires_at"),
+        )
+
+
+class PaymentGateway(ABC):
+    """The subset of the payment provider API that checkout relies on."""
+
+    @abstractmethod
+    async def create_coupon(self, *, amount_off: int, currency: str, name: str) -> str:
+        """Create a one-off coupon and return its id."""
+
+    @abstractmethod
+    async def create_checkout_session(
+        self,
+        *,
+        line_items: List[Dict[str, Any]],
+        discounts: List[Dict[str, Any]],
+        client_reference_id: str,
+        success_url: str,
+        cancel_url: str,
+        payment_method_types: List[str],
+    ) -> CheckoutSession:
+        """Open a hosted checkout session for the given line items."""
+
+    @abstractmethod
+    async def retrieve_checkout_session(self, session_id: str) -> CheckoutSession:
+        """Fetch the current state of a checkout session."""
+
+    async def aclose(self) -> None:
+        pass
+
+
+def encode_form(params: Dict[str, Any]) -> str:
+    """Encode nested params the way Stripe expects: `line_items[0][quantity]=1`."""
+    pairs: List[Tuple[str, str]] = []
+
+    def _walk(prefix: str, value: Any) -> None:
+        if isinstance(value, dict):
+            for key, nested in value.items():
+                _walk(f"{prefix}[{key}]" if prefix else str(key), nested)
+        elif isinstance(value, (list, tuple)):
+            for index, nested in enumerate(value):
+                _walk(f"{prefix}[{index}]", nested)
+        elif value is None:
+            return
+        elif isinstance(value, bool):
+            pairs.append((prefix, "true" if value else "false"))
+        else:
+            pairs.append((prefix, str(value)))
+
+    _walk("", params)
+    return urlencode(pairs)
+
+
+class StripeHttpGateway(PaymentGateway):
+    """
+    Async Stripe client over a shared, keep-alive `httpx.AsyncClient`.
+
+    Requests never block the event loop, and a semaphore bounds how many are in
+    flight so a slow provider cannot soak up every connection of the worker.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str,
+        timeout_seconds: float,
+        max_concurrency: int,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=httpx.Timeout(timeout_seconds, connect=min(timeout_seconds, 5.0)),
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency,
+                keepalive_expiry=60.0,
+            ),
+            transport=transport,
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _request(
+        self, method: str, path: str, params: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        content = encode_form(params) if params else None
+        headers = {"Content-Type": "application/x-www-form-urlencoded"} if content else None
+        async with self._semaphore:
+            try:
+                response = await self._client.request(method, path, content=content, headers=headers)
+            except httpx.TimeoutException:
+                raise PaymentGatewayError("The payment provider timed out.")
+            except httpx.TransportError:
+                raise PaymentGatewayError("The payment provider is unavailable.")
+
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = {}
+        if response.is_error:
+            message = (payload.get("error") or {}).get("message") or "Payment provider request failed."
+            raise PaymentGatewayError(message, status_code=response.status_code)
+        return payload
+
+    async def create_coupon(self, *, amount_off: int, currency: str, name: str) -> str:
+        payload = await self._request(
+            "POST",
+            "/v1/coupons",
+            {"name": name, "amount_off": amount_off, "currency": currency, "duration": "once"},
+        )
+        return payload["id"]
+
+    async def create_checkout_session(
+        self,
+        *,
+        line_items: List[Dict[str, Any]],
+        discounts: List[Dict[str, Any]],
+        client_reference_id: str,
+        success_url: str,
+        cancel_url: str,
+        payment_method_types: List[str],
+    ) -> CheckoutSession:
+        payload = await self._request(
+            "POST",
+            "/v1/checkout/sessions",
+            {
+                "mode": "payment",
+                "payment_method_types": payment_method_types,
+                "line_items": line_items,
+                "discounts": discounts,
+                "success_url": success_url,
+                "cancel_url": cancel_url,
+                "client_reference_id": client_reference_id,
+            },
+        )
+        return CheckoutSession.from_payload(payload)
+
+    async def retrieve_checkout_session(self, session_id: str) -> CheckoutSession:
+        payload = await self._request("GET", f"/v1/checkout/sessions/{session_id}")
+        return CheckoutSession.from_payload(payload)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+_payment_gateway: Optional[PaymentGateway] = None
+
+
+def get_payment_gateway() -> PaymentGateway:
+    global _payment_gateway
+    if _payment_gateway is None:
+        _payment_gateway = StripeHttpGateway(
+            api_key=settings.STRIPE_SECRET_KEY,
+            base_url=settings.STRIPE_API_BASE,
+            timeout_seconds=settings.STRIPE_HTTP_TIMEOUT_SECONDS,
+            max_concurrency=settings.STRIPE_HTTP_MAX_CONCURRENCY,
+        )
+    return _payment_gateway
+
+
+def set_payment_gateway(gateway: Optional[PaymentGateway]) -> None:
+    """Swap the process-wide gateway, e.g. for one pointed at the fake Stripe server."""
+    global _payment_gateway
+    _payment_gateway = gateway
+
+
+async def close_payment_gateway() -> None:
+    global _payment_gateway
+    if _payment_gateway is not None:
+        await _payment_gateway.aclose()
+        _payment_gateway = None
@@ -4,7 +4,8 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel import select
 from sqlalchemy.orm import selectinload
 
-from app.models import Cart, CartItem, Product, User, UserType, Voucher, VoucherProductLink, ShippingConfig
+from app.models import Cart, CartItem, Product, User, ShippingConfig
+from app.services.voucher_index import voucher_rule_index
 
 
 class PricingService:
@@ -28,29 +29,22 @@ class PricingService:
         )
         return list(result.scalars().all())
 
-    async def _get_applicable_vouchers(self, user: User) -> List[Voucher]:
-        # Fetch vouchers active for user's user_type
-        result = await self.session.execute(
-            select(Voucher).where(Voucher.is_active == True)
-        )
-        vouchers = result.scalars().all()
-        applicable = []
-        for v in vouchers:
-            if v.scope in ("global", "product_list") and (v.target_user_type_id is None or v.target_user_type_id == user.user_type_id):
-                applicable.append(v)
-            elif v.scope == "user_type" and v.target_user_type_id == user.user_type_id:
-                applicable.append(v)
-            elif v.scope == "user" and v.target_user_id == user.id:
-                applicable.append(v)
-        return applicable
-
-    async def compute_totals(self, user_id: uuid.UUID) -> Dict[str, float]:
+    async def compute_totals(self, user_id: uuid.UUID, items: List[CartItem] | None = None) -> Dict[str, float]:
+        """Prices the user's cart; pass `items` (with products) when the cart is already loaded."""
         # Load user, cart, vouchers, shipping config
         user = await self.session.get(User, user_id)
         if not user:
             return {"subtotal": 0.0, "discount": 0.0, "shipping": 0.0, "total": 0.0, "applied_voucher_code": None}
 
-        items = await self._get_cart_items(user_id)
+        if items is None:
+            items = await self._get_cart_items(user_id)
+        return await self.compute_totals_for_items(user, items)
+
+    async def compute_totals_for_items(self, user: User, items: List[CartItem]) -> Dict[str, float]:
+        """
+        Prices cart items that the caller has already loaded (with their products),
+        so checkout can reuse its cart instead of reloading it.
+        """
         if not items:
             return {"subtotal": 0.0, "discount": 0.0, "shipping": 0.0, "total": 0.0, "applied_voucher_code": None}
 
@@ -67,14 +61,10 @@ class PricingService:
         # vouchers
         discount = 0.0
         applied_voucher_code = None
-        applicable = await self._get_applicable_vouchers(user)
+        applicable = await voucher_rule_index.get_applicable(self.session, user.id, user.user_type_id)
         for v in applicable:
-            # gather products linked to voucher
-            result = await self.session.execute(select(VoucherProductLink).where(VoucherProductLink.voucher_id == v.id))
-            links = result.scalars().all()
-            
             # If voucher is user_type and has no specific products, it applies to the whole cart
-            if v.scope == 'user_type' and not links:
+            if v.scope == 'user_type' and not v.product_ids:
                 if subtotal >= (v.min_quantity or 0):
                     if v.discount_type == "fixed":
                         discount += v.amount
@@ -85,8 +75,9 @@ class PricingService:
                 continue
 
             matched_qty = 0
-            for ln in links:
-                matched_qty += product_qty.get(ln.product_id, 0)
+            for product_id, qty in product_qty.items():
+                if product_id in v.product_ids:
+                    matched_qty += qty
             if matched_qty <= 0:
                 continue
             if matched_qty < (v.min_quantity or 0):
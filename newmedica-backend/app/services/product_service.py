@@ -1,6 +1,4 @@
-import os
-import shutil
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from uuid import UUID
 
 from fastapi import UploadFile
@@ -8,18 +6,40 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.models.product import Product
 from app.models.product_media import ProductMedia
+from app.repositories.media_repository import MediaRepository
 from app.repositories.product_repository import ProductRepository
 from app.schemas.media import ProductMediaCreate
-from app.schemas.product import ProductUpdate
+from app.schemas.product import ProductPage, ProductRead, ProductUpdate
 from app.schemas.product_create import ProductCreate
+from app.services.catalog_cache import CatalogEntry, catalog_cache
+from app.services.media_storage import media_storage
+from app.services.media_variants import media_variants
+from app.utils.http_cache import latest, make_etag
+
+
+def _product_version(product: Product) -> tuple:
+    """Everything ProductRead renders, reduced to ids and row versions."""
+    return (
+        product.id,
+        product.updated_at,
+        product.category.updated_at,
+        tuple((m.id, m.updated_at, m.display_order) for m in product.media),
+    )
+
+
+def _product_last_modified(product: Product):
+    return latest([product.updated_at, product.category.updated_at, *(m.updated_at for m in product.media)])
 
 
 class ProductService:
     def __init__(self, db_session: AsyncSession):
         self.repo = ProductRepository(db_session)
+        self.media_repo = MediaRepository(db_session)
 
     async def create_product(self, product: ProductCreate) -> Product:
-        return await self.repo.create_product(product)
+        created = await self.repo.create_product(product)
+        catalog_cache.bump()
+        return created
 
     async def get_all_products(
         self,
@@ -27,41 +47,102 @@ class ProductService:
         search_term: Optional[str] = None,
         sort_by: Optional[str] = None,
         sort_order: str = "asc",
-    ) -> List[Product]:
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Product], Optional[str]]:
         return await self.repo.get_all_products(
             category_name=category_name,
             search_term=search_term,
             sort_by=sort_by,
             sort_order=sort_order,
+            limit=limit,
+            cursor=cursor,
         )
 
+    async def get_catalog_page(
+        self,
+        category_name: Optional[str] = None,
+        search_term: Optional[str] = None,
+        sort_by: Optional[str] = None,
+        sort_order: str = "asc",
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> CatalogEntry[ProductPage]:
+        """Storefront listing with its validators, served from the catalog cache."""
+
+        async def _load() -> CatalogEntry[ProductPage]:
+            products, next_cursor = await self.get_all_products(
+                category_name=category_name,
+                search_term=search_term,
+                sort_by=sort_by,
+                sort_order=sort_order,
+                limit=limit,
+                cursor=cursor,
+            )
+            page = ProductPage(
+                items=[ProductRead.model_validate(p) for p in products],
+                next_cursor=next_cursor,
+            )
+            return CatalogEntry(
+                value=page,
+                etag=make_etag("page", next_cursor, *(_product_version(p) for p in products)),
+                last_modified=latest(_product_last_modified(p) for p in products),
+            )
+
+        key = ("page", category_name, search_term, sort_by, sort_order, limit, cursor)
+        return await catalog_cache.get_or_load(key, _load)
+
     async def get_product_by_id(self, product_id: UUID) -> Product | None:
         return await self.repo.get_product_by_id(product_id)
 
+    async def get_catalog_product(self, product_id: UUID) -> CatalogEntry[ProductRead] | None:
+        """Storefront product detail with its validators, served from the catalog cache."""
+
+        async def _load() -> CatalogEntry[ProductRead] | None:
+            product = await self.get_product_by_id(product_id)
+            if product is None:
+                return None
+            return CatalogEntry(
+                value=ProductRead.model_validate(product),
+                etag=make_etag("product", _product_version(product)),
+                last_modified=_product_last_modified(product),
+            )
+
+        return await catalog_cache.get_or_load(("product", product_id), _load)
+
     async def update_product(
         self, product_id: UUID, product_update: ProductUpdate
     ) -> Product | None:
-        return await self.repo.update_product(product_id, product_update)
+        updated = await self.repo.update_product(product_id, product_update)
+        catalog_cache.bump()
+        return updated
 
     async def delete_product(self, product_id: UUID) -> bool:
-        return await self.repo.delete_product(product_id)
+        deleted = await self.repo.delete_product(product_id)
+        catalog_cache.bump()
+        return deleted
 
     async def add_media_to_product(
         self, product_id: UUID, file: UploadFile, alt_text: str, display_order: int
     ) -> ProductMedia:
-        # Define the path to save the file
-        upload_dir = "media_uploads"
-        os.makedirs(upload_dir, exist_ok=True)
-        file_location = os.path.join(upload_dir, file.filename)  # type: ignore
-
-        with open(file_location, "wb+") as file_object:
-            shutil.copyfileobj(file.file, file_object)
-
+        """
+        Stores the upload by content (identical images share one file and
+        MediaBlob row) and adds it to the product. Its resized variants are
+        rendered in the background.
+        """
+        stored = await media_storage.save(file)
+        await self.media_repo.add_blob(stored.sha256, stored.content_type, stored.size_bytes, stored.storage_key)
         media_create = ProductMediaCreate(
-            altText=alt_text, url=f"/{file_location}", displayOrder=display_order
+            altText=alt_text, url=media_storage.url_for(stored.storage_key), displayOrder=display_order
         )
 
-        return await self.repo.add_media_to_product(product_id, media_create)
+        media = await self.repo.add_media_to_product(product_id, media_create, blob_sha256=stored.sha256)
+        if stored.created:
+            media_variants.schedule(stored.sha256, stored.storage_key)
+        catalog_cache.bump()
+        return media
 
     async def update_media_order(self, product_id: UUID, media_ids: List[UUID]):
-        return await self.repo.update_media_order_for_product(product_id, media_ids)
+        result = await self.repo.update_media_order_for_product(product_id, media_ids)
+        catalog_cache.bump()
+        return result
@@ -0,0 +1,86 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.repositories.order_repository import OrderRepository
+from app.repositories.product_repository import ProductRepository
+from app.services.catalog_cache import catalog_cache
+
+logger = logging.getLogger(__name__)
+
+
+class ReservationSweeper:
+    """
+    Cancels pending orders whose stock hold expired and returns their stock.
+
+    Each batch is its own short transaction: claim up to `batch_size` expired
+    orders with SKIP LOCKED, cancel them, restock their items in one set-based
+    UPDATE, commit. Any number of workers can run a sweeper at the same time;
+    they simply take different batches.
+    """
+
+    def __init__(self, session_factory: sessionmaker, batch_size: int, interval_seconds: float):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    async def sweep_batch(self, now: Optional[datetime] = None) -> int:
+        now = now or datetime.now(timezone.utc)
+        async with self.session_factory() as session:
+            order_ids = await OrderRepository(session).cancel_expired_reservations(now, self.batch_size)
+            if order_ids:
+                await ProductRepository(session).restock_from_orders(order_ids)
+            await session.commit()
+        if order_ids:
+            # Cached product reads carry stock
+            catalog_cache.bump()
+        return len(order_ids)
+
+    async def sweep(self, now: Optional[datetime] = None) -> int:
+        """Runs batches until a short one; returns the number of orders cancelled."""
+        now = now or datetime.now(timezone.utc)
+        total = 0
+        while True:
+            cancelled = await self.sweep_batch(now)
+            total += cancelled
+            if cancelled < self.batch_size:
+                return total
+
+    async def run_forever(self) -> None:
+        while True:
+            try:
+                cancelled = await self.sweep()
+                if cancelled:
+                    logger.info("Released stock for %d expired pending orders", cancelled)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Reservation sweep failed")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+reservation_sweeper = ReservationSweeper(
+    AsyncSessionLocal,
+    batch_size=settings.RESERVATION_SWEEP_BATCH_SIZE,
+    interval_seconds=settings.RESERVATION_SWEEP_INTERVAL_SECONDS,
+)
@@ -1,25 +1,22 @@
 from typing import Optional
 from fastapi import HTTPException
 
-from passlib.context import CryptContext
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.security import verify_password
+from app.core.password_hashing import password_hasher
 from app.models.user import User
 from app.repositories.user_repository import UserRepository
 from app.repositories.voucher_repository import VoucherRepository
 from app.schemas.user import UserCreate, UserUpdate, PasswordChange
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
-
 
 class UserService:
     def __init__(self, db_session: AsyncSession):
         self.repo = UserRepository(db_session)
         self.voucher_repo = VoucherRepository(db_session)
 
-    def get_password_hash(self, password: str) -> str:
-        return pwd_context.hash(password)
+    async def get_password_hash(self, password: str) -> str:
+        return await password_hasher.hash(password)
 
     async def get_user_by_email(self, email: str) -> Optional[User]:
         return await self.repo.get_by_email(email)
@@ -30,7 +27,7 @@ class UserService:
             # In a real app, you might raise a specific exception
             raise ValueError(f"User type '{user_in.userType}' not found.")
 
-        hashed_password = self.get_password_hash(user_in.password)
+        hashed_password = await self.get_password_hash(user_in.password)
 
         user_data = {
             "email": user_in.email,
@@ -55,7 +52,7 @@ class UserService:
 
     async def authenticate(self, email: str, password: str) -> Optional[User]:
         user = await self.get_user_by_email(email)
-        if not user or not verify_password(password, user.password_hash):
+        if not user or not await password_hasher.verify(password, user.password_hash):
             return None
         return user
 
@@ -79,11 +76,11 @@ class UserService:
         return user # Return the user as is if there's no data to update
 
     async def change_password(self, user: User, password_in: PasswordChange):
-        if not verify_password(password_in.old_password, user.password_hash):
+        if not await password_hasher.verify(password_in.old_password, user.password_hash):
             raise HTTPException(status_code=400, detail="Incorrect old password")
 
-        if verify_password(password_in.new_password, user.password_hash):
+        if await password_hasher.verify(password_in.new_password, user.password_hash):
             raise HTTPException(status_code=400, detail="New password must be different from the old password")
 
-        new_password_hash = self.get_password_hash(password_in.new_password)
+        new_password_hash = await self.get_password_hash(password_in.new_password)
         await self.repo.update(user, {"password_hash": new_password_hash})
@@ -0,0 +1,162 @@
+import heapq
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.models.voucher import DiscountType, Voucher, VoucherProductLink, VoucherScope
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledVoucher:
+    """Immutable, query-free view of an active voucher and its product links."""
+
+    ordinal: int
+    id: uuid.UUID
+    code: str
+    scope: VoucherScope
+    discount_type: DiscountType
+    amount: float
+    min_quantity: int
+    per_unit: bool
+    target_user_type_id: Optional[uuid.UUID]
+    target_user_id: Optional[uuid.UUID]
+    product_ids: FrozenSet[uuid.UUID]
+
+
+class _Snapshot:
+    """Buckets of compiled vouchers keyed the same way PricingService matches them."""
+
+    def __init__(self, rules: Dict[uuid.UUID, CompiledVoucher]):
+        self.rules = rules
+        self.unscoped: List[CompiledVoucher] = []
+        self.by_user_type: Dict[uuid.UUID, List[CompiledVoucher]] = {}
+        self.by_user: Dict[uuid.UUID, List[CompiledVoucher]] = {}
+
+        for rule in sorted(rules.values(), key=lambda r: r.ordinal):
+            if rule.scope == VoucherScope.USER:
+                if rule.target_user_id is not None:
+                    self.by_user.setdefault(rule.target_user_id, []).append(rule)
+            elif rule.target_user_type_id is not None:
+                self.by_user_type.setdefault(rule.target_user_type_id, []).append(rule)
+            elif rule.scope != VoucherScope.USER_TYPE:
+                # global / product_list vouchers without a user type apply to everyone
+                self.unscoped.append(rule)
+
+    def applicable(self, user_id: uuid.UUID, user_type_id: uuid.UUID) -> List[CompiledVoucher]:
+        buckets = (
+            self.unscoped,
+            self.by_user_type.get(user_type_id, ()),
+            self.by_user.get(user_id, ()),
+        )
+        return list(heapq.merge(*buckets, key=lambda r: r.ordinal))
+
+
+def _compile(voucher: Voucher, product_ids: Iterable[uuid.UUID], ordinal: int) -> CompiledVoucher:
+    return CompiledVoucher(
+        ordinal=ordinal,
+        id=voucher.id,
+        code=voucher.code,
+        scope=VoucherScope(voucher.scope),
+        discount_type=DiscountType(voucher.discount_type),
+        amount=voucher.amount,
+        min_quantity=voucher.min_quantity or 0,
+        per_unit=voucher.per_unit,
+        target_user_type_id=voucher.target_user_type_id,
+        target_user_id=voucher.target_user_id,
+        product_ids=frozenset(product_ids),
+    )
+
+
+class VoucherRuleIndex:
+    """
+    Process-wide index of active vouchers used by PricingService.
+
+    The index is built with two bulk queries and then served from memory. Voucher
+    writes made through AdminVoucherService patch it in place; the TTL bounds how
+    long writes made by other workers can go unseen.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._snapshot: Optional[_Snapshot] = None
+        self._built_at = 0.0
+        self._next_ordinal = 0
+
+    def invalidate(self) -> None:
+        self._snapshot = None
+
+    def _is_fresh(self) -> bool:
+        if self._snapshot is None:
+            return False
+        if self.ttl_seconds <= 0:
+            return True
+        return time.monotonic() - self._built_at < self.ttl_seconds
+
+    async def get_applicable(
+        self, session: AsyncSession, user_id: uuid.UUID, user_type_id: uuid.UUID
+    ) -> List[CompiledVoucher]:
+        if not self._is_fresh():
+            await self.rebuild(session)
+        return self._snapshot.applicable(user_id, user_type_id)  # type: ignore[union-attr]
+
+    async def rebuild(self, session: AsyncSession) -> None:
+        # Concurrent rebuilds are harmless: each one swaps in a complete snapshot.
+        vouchers_result = await session.execute(
+            select(Voucher)
+            .where(Voucher.is_active == True)
+            .order_by(Voucher.created_at, Voucher.id)
+        )
+        vouchers = vouchers_result.scalars().all()
+
+        links_result = await session.execute(
+            select(VoucherProductLink.voucher_id, VoucherProductLink.product_id)
+            .join(Voucher, Voucher.id == VoucherProductLink.voucher_id)
+            .where(Voucher.is_active == True)
+        )
+        links: Dict[uuid.UUID, List[uuid.UUID]] = {}
+        for voucher_id, product_id in links_result.all():
+            links.setdefault(voucher_id, []).append(product_id)
+
+        rules = {
+            v.id: _compile(v, links.get(v.id, ()), ordinal)
+            for ordinal, v in enumerate(vouchers)
+        }
+        self._next_ordinal = len(rules)
+        self._snapshot = _Snapshot(rules)
+        self._built_at = time.monotonic()
+
+    async def refresh_voucher(self, session: AsyncSession, voucher_id: uuid.UUID) -> None:
+        """Re-read a single voucher and its links and patch it into the index."""
+        if self._snapshot is None:
+            return
+        voucher = await session.get(Voucher, voucher_id)
+        rules = dict(self._snapshot.rules)
+        previous = rules.pop(voucher_id, None)
+        if voucher is not None and voucher.is_active:
+            links_result = await session.execute(
+                select(VoucherProductLink.product_id).where(
+                    VoucherProductLink.voucher_id == voucher_id
+                )
+            )
+            if previous is not None:
+                ordinal = previous.ordinal
+            else:
+                ordinal = self._next_ordinal
+                self._next_ordinal += 1
+            rules[voucher_id] = _compile(voucher, links_result.scalars().all(), ordinal)
+        self._snapshot = _Snapshot(rules)
+
+    def remove_voucher(self, voucher_id: uuid.UUID) -> None:
+        if self._snapshot is None or voucher_id not in self._snapshot.rules:
+            return
+        rules = dict(self._snapshot.rules)
+        rules.pop(voucher_id)
+        self._snapshot = _Snapshot(rules)
+
+
+voucher_rule_index = VoucherRuleIndex(ttl_seconds=settings.VOUCHER_INDEX_TTL_SECONDS)
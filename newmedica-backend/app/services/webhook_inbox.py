@@ -0,0 +1,175 @@
+import asyncio
+import json
+import logging
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List
+
+from sqlalchemy.orm import sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.webhook_event import WebhookEvent
+from app.repositories.webhook_event_repository import WebhookEventRepository
+from app.services.order_service import OrderService
+
+logger = logging.getLogger(__name__)
+
+WebhookHandler = Callable[[AsyncSession, Dict[str, Any]], Awaitable[None]]
+
+
+async def handle_checkout_session_completed(session: AsyncSession, event: Dict[str, Any]) -> None:
+    checkout_session = event["data"]["object"]
+    client_reference_id = checkout_session.get("client_reference_id")
+    if not client_reference_id:
+        logger.warning("client_reference_id not found in checkout session %s", checkout_session.get("id"))
+        return
+    # A malformed or unknown order id raises, so the event ends up dead-lettered
+    order_id = uuid.UUID(client_reference_id)
+    if await OrderService(session).mark_order_paid(order_id=order_id) is None:
+        raise LookupError(f"Order {order_id} not found")
+
+
+STRIPE_HANDLERS: Dict[str, WebhookHandler] = {
+    "checkout.session.completed": handle_checkout_session_completed,
+}
+
+
+class WebhookInbox:
+    """
+    Background processing for events stored by the webhook endpoints.
+
+    A pool of workers claims due events in batches (SKIP LOCKED, so any number
+    of app processes can run workers) and processes each one in its own session,
+    restarting its lease first so events late in a slow batch are not re-claimed.
+    Handlers must be idempotent: a worker that dies mid-event leaves a lease that
+    lapses, and the event is processed again. Failures back off exponentially
+    until `max_attempts`, after which the event is dead-lettered for replay.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        handlers: Dict[str, WebhookHandler],
+        workers: int,
+        batch_size: int,
+        lease_seconds: float,
+        max_attempts: int,
+        backoff_base_seconds: float,
+        backoff_max_seconds: float,
+        poll_interval_seconds: float,
+    ):
+        self.session_factory = session_factory
+        self.handlers = handlers
+        self.workers = workers
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    def notify(self) -> None:
+        """Wakes idle workers in this process after an event was stored."""
+        self._wakeup.set()
+
+    def retry_delay(self, attempts: int) -> float:
+        delay = min(self.backoff_base_seconds * 2 ** (attempts - 1), self.backoff_max_seconds)
+        # Jitter spreads out retries of events that failed together
+        return delay * random.uniform(0.5, 1.0)
+
+    async def process_event(self, event: WebhookEvent) -> bool:
+        async with self.session_factory() as session:
+            if not await WebhookEventRepository(session).renew_lease(event.id, event.attempts, self.lease_seconds):
+                logger.info("Webhook event %s was re-claimed by another worker; skipping", event.event_id)
+                return False
+        handler = self.handlers.get(event.event_type)
+        try:
+            if handler is not None:
+                async with self.session_factory() as session:
+                    await handler(session, json.loads(event.payload))
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+            retry_at = None
+            if event.attempts < self.max_attempts:
+                retry_at = datetime.now(timezone.utc) + timedelta(seconds=self.retry_delay(event.attempts))
+            logger.warning(
+                "Webhook event %s (%s) failed on attempt %d: %s",
+                event.event_id, event.event_type, event.attempts, error,
+            )
+            async with self.session_factory() as session:
+                marked = await WebhookEventRepository(session).mark_failed(
+                    event.id, event.attempts, error, retry_at
+                )
+            if not marked:
+                logger.info("Webhook event %s was re-claimed by another worker; dropping its failure", event.event_id)
+            return False
+
+        async with self.session_factory() as session:
+            marked = await WebhookEventRepository(session).mark_processed(event.id, event.attempts)
+        if not marked:
+            logger.info("Webhook event %s was re-claimed by another worker; leaving it to them", event.event_id)
+        return True
+
+    async def process_due(self) -> int:
+        """Claims and processes one batch; returns the number of events claimed."""
+        async with self.session_factory() as session:
+            events = await WebhookEventRepository(session).claim_due(
+                datetime.now(timezone.utc), self.batch_size, self.lease_seconds
+            )
+        for event in events:
+            await self.process_event(event)
+        return len(events)
+
+    async def drain(self) -> int:
+        """Processes batches until nothing is due."""
+        total = 0
+        while True:
+            claimed = await self.process_due()
+            total += claimed
+            if not claimed:
+                return total
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                claimed = await self.process_due()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Webhook worker failed to claim events")
+                claimed = 0
+            if claimed:
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+stripe_webhook_inbox = WebhookInbox(
+    AsyncSessionLocal,
+    handlers=STRIPE_HANDLERS,
+    workers=settings.WEBHOOK_WORKERS,
+    batch_size=settings.WEBHOOK_CLAIM_BATCH_SIZE,
+    lease_seconds=settings.WEBHOOK_LEASE_SECONDS,
+    max_attempts=settings.WEBHOOK_MAX_ATTEMPTS,
+    backoff_base_seconds=settings.WEBHOOK_BACKOFF_BASE_SECONDS,
+    backoff_max_seconds=settings.WEBHOOK_BACKOFF_MAX_SECONDS,
+    poll_interval_seconds=settings.WEBHOOK_POLL_INTERVAL_SECONDS,
+)
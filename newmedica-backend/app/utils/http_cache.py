@@ -0,0 +1,89 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Iterable, Optional
+
+from fastapi import Request, Response
+
+from app.core.config import settings
+
+# Validators are derived from row versions (updated_at, ids, catalog state) that
+# are known before a response body is built, so a matching conditional request
+# is answered with 304 without serializing anything.
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; every timestamp we store is UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _normalize(part: Any) -> Any:
+    if isinstance(part, datetime):
+        return _as_utc(part).isoformat()
+    if isinstance(part, (tuple, list)):
+        return tuple(_normalize(p) for p in part)
+    return part
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag over the given version material (ids, timestamps, counts...)."""
+    digest = hashlib.blake2b(repr(_normalize(parts)).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def latest(timestamps: Iterable[Optional[datetime]]) -> Optional[datetime]:
+    values = [_as_utc(t) for t in timestamps if t is not None]
+    return max(values) if values else None
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    candidates = (c.strip() for c in header.split(","))
+    # If-None-Match uses the weak comparison function
+    return any(c.removeprefix("W/") == etag for c in candidates)
+
+
+def _not_modified_since(header: str, last_modified: Optional[datetime]) -> bool:
+    if last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    return _as_utc(last_modified).replace(microsecond=0) <= _as_utc(since)
+
+
+def conditional_response(
+    request: Request,
+    response: Response,
+    policy: str,
+    etag: str,
+    last_modified: Optional[datetime] = None,
+) -> Optional[Response]:
+    """
+    Returns a bare 304 response when the request's validators still match;
+    otherwise sets ETag/Last-Modified/Cache-Control on `response` and returns None.
+
+    `policy` names an entry of settings.CACHE_CONTROL_POLICIES.
+    """
+    headers = {
+        "ETag": etag,
+        "Cache-Control": settings.CACHE_CONTROL_POLICIES.get(policy, "no-cache"),
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified).replace(microsecond=0), usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        not_modified = etag_matches(if_none_match, etag)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        not_modified = bool(if_modified_since) and _not_modified_since(if_modified_since, last_modified)
+
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,41 @@
+import os
+import tempfile
+from typing import List, Tuple
+
+from PIL import Image, ImageOps
+
+# Image work for the media variant process pool. These functions run in worker
+# processes, so they take and return plain values and import nothing from the app.
+
+
+def render_webp_variants(source_path: str, targets: List[Tuple[int, str]], quality: int) -> List[int]:
+    """
+    Decodes `source_path` once and writes a WebP resized to each `(width, path)`
+    target, never upscaling. Returns the byte size of each file written.
+    """
+    sizes = []
+    with Image.open(source_path) as image:
+        image = ImageOps.exif_transpose(image)
+        has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+        for width, target_path in targets:
+            variant = image
+            if image.width > width:
+                height = max(1, round(image.height * width / image.width))
+                variant = image.resize((width, height), Image.Resampling.LANCZOS)
+            sizes.append(_write_atomically(variant, target_path, quality))
+    return sizes
+
+
+def _write_atomically(image: Image.Image, target_path: str, quality: int) -> int:
+    directory = os.path.dirname(target_path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as target:
+            image.save(target, format="WEBP", quality=quality, method=4)
+        os.replace(tmp_path, target_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return os.path.getsize(target_path)
@@ -0,0 +1,16 @@
+from typing import Dict, Iterable, Optional
+
+# Naming of resized media variants. Pure functions, so schemas can build variant
+# URLs without importing the storage or rendering services.
+
+
+def variant_key(sha256: str, width: int) -> str:
+    return f"variants/{sha256[:2]}/{sha256[2:4]}/{sha256}-{width}w.webp"
+
+
+def variant_srcset(url_prefix: str, sha256: Optional[str], widths: Iterable[int]) -> Dict[str, str]:
+    """Variant URLs by width descriptor (`{"320w": url, ...}`); empty for media without a stored file."""
+    if sha256 is None:
+        return {}
+    prefix = url_prefix.rstrip("/")
+    return {f"{width}w": f"{prefix}/{variant_key(sha256, width)}" for width in sorted(set(widths))}
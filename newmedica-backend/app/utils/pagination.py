@@ -0,0 +1,23 @@
+import base64
+import binascii
+import json
+from typing import Any, Dict
+
+from app.core.exceptions import BadRequestException
+
+
+def encode_cursor(payload: Dict[str, Any]) -> str:
+    """Encodes a keyset position as an opaque, URL-safe token."""
+    raw = json.dumps(payload, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        raise BadRequestException(message="Invalid pagination cursor.")
+    if not isinstance(payload, dict):
+        raise BadRequestException(message="Invalid pagination cursor.")
+    return payload
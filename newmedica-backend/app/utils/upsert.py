@@ -0,0 +1,14 @@
+from typing import Callable, Optional
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+_INSERT_BY_DIALECT = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def dialect_insert(session: AsyncSession) -> Optional[Callable]:
+    """
+    The session dialect's `insert` construct, which supports
+    `on_conflict_do_nothing`; None for dialects without it.
+    """
+    return _INSERT_BY_DIALECT.get(session.bind.dialect.name)
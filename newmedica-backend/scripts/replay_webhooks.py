@@ -0,0 +1,52 @@
+"""
+Replay webhook events from the inbox.
+
+Puts events back in the queue with a fresh attempt budget: by default every
+dead-lettered event, or specific Stripe event ids with --event-id. The running
+app's workers pick them up; --process drains the queue in this process instead.
+
+    python scripts/replay_webhooks.py                          # requeue all dead events
+    python scripts/replay_webhooks.py --event-id evt_123 --process
+    python scripts/replay_webhooks.py --status processed --since 2026-10-01T00:00:00+00:00
+    python scripts/replay_webhooks.py --stats
+"""
+import argparse
+import asyncio
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.db.session import AsyncSessionLocal, engine
+from app.repositories.webhook_event_repository import WebhookEventRepository
+from app.services.webhook_inbox import stripe_webhook_inbox
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--event-id", action="append", dest="event_ids", help="provider event id; repeatable")
+    parser.add_argument("--status", action="append", dest="statuses", help="statuses to requeue (default: dead)")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="only events received at or after this time")
+    parser.add_argument("--process", action="store_true", help="process the queue here instead of in the app")
+    parser.add_argument("--stats", action="store_true", help="only print event counts by status")
+    args = parser.parse_args()
+
+    try:
+        async with AsyncSessionLocal() as session:
+            repo = WebhookEventRepository(session)
+            if not args.stats:
+                requeued = await repo.requeue(
+                    event_ids=args.event_ids, statuses=args.statuses or ("dead",), since=args.since
+                )
+                print(f"requeued {requeued} event(s)")
+            if args.process:
+                print(f"processed {await stripe_webhook_inbox.drain()} event(s)")
+            for status, count in sorted((await repo.count_by_status()).items()):
+                print(f"{status:<12} {count}")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
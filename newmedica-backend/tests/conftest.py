@@ -1,5 +1,6 @@
 
 import uuid
+from contextlib import contextmanager
 import pytest
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
@@ -24,7 +25,10 @@ os.environ["STRIPE_PUBLISHABLE_KEY"] = "pk_test_dummy"
 os.environ["STRIPE_SECRET_KEY"] = "sk_test_dummy"
 os.environ["STRIPE_WEBHOOK_SECRET"] = "whsec_test_dummy"
 
+from app.core.principal_cache import principal_cache, user_type_names
+from app.api.v1.dependencies import get_read_session
 from app.db.init_db import seed_user_types
+from app.db.query_stats import instrument_engine, query_metrics
 from app.db.session import get_session
 from app.main import app
 from app.models import (
@@ -34,11 +38,19 @@ from app.models import (
     Category,
 )  # Use the __init__.py for imports
 from app.models.product import Product
+from app.services.catalog_cache import catalog_cache
+from app.services.media_gc import media_collector
+from app.services.media_storage import media_storage
+from app.services.media_variants import media_variants
+from app.services.payment_gateway import StripeHttpGateway, set_payment_gateway
+from app.services.voucher_index import voucher_rule_index
+from tests.fake_stripe import build_fake_stripe_app
 
 # Use an in-memory SQLite database for testing
 DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
 engine = create_async_engine(DATABASE_URL, echo=False, future=True)
+instrument_engine(engine)
 TestingSessionLocal = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )  # type: ignore
@@ -53,6 +65,103 @@ async def clear_alembic_version_table():
         await conn.execute(text("DROP TABLE IF EXISTS alembic_version"))
 
 
+@pytest.fixture(scope="function", autouse=True)
+def reset_voucher_index():
+    """
+    Drops the in-memory voucher index so each test compiles it from its own data.
+    """
+    voucher_rule_index.invalidate()
+    yield
+    voucher_rule_index.invalidate()
+
+
+@pytest.fixture(scope="function", autouse=True)
+def reset_catalog_cache():
+    """
+    Starts each test with an empty catalog cache.
+    """
+    catalog_cache.bump()
+    yield
+    catalog_cache.bump()
+
+
+@pytest.fixture(scope="function", autouse=True)
+def reset_principal_cache():
+    """
+    Each test recreates the schema, so cached principals and user types must go too.
+    """
+    principal_cache.clear()
+    user_type_names.invalidate()
+    yield
+    principal_cache.clear()
+    user_type_names.invalidate()
+
+
+@pytest.fixture(scope="function", autouse=True)
+def media_root(tmp_path):
+    """
+    Stores each test's uploads under its own temporary directory. Variants are
+    only rendered on request unless a test turns upload rendering on, and the
+    media GC reads the test database.
+    """
+    original = media_storage.root, media_variants.on_upload, media_collector.session_factory
+    media_storage.root = str(tmp_path / "media")
+    media_variants.on_upload = False
+    media_collector.session_factory = TestingSessionLocal
+    yield media_storage.root
+    media_storage.root, media_variants.on_upload, media_collector.session_factory = original
+
+
+@pytest_asyncio.fixture(scope="function", autouse=True)
+async def fake_stripe():
+    """
+    Routes the payment gateway to an in-process fake Stripe API for each test.
+    """
+    stripe_app = build_fake_stripe_app()
+    gateway = StripeHttpGateway(
+        api_key="sk_test_dummy",
+        base_url="http://fake-stripe",
+        timeout_seconds=5.0,
+        max_concurrency=4,
+        transport=ASGITransport(app=stripe_app),
+    )
+    set_payment_gateway(gateway)
+    yield stripe_app.state.stripe
+    set_payment_gateway(None)
+    await gateway.aclose()
+
+
+@pytest.fixture(scope="function", autouse=True)
+def query_budget(request):
+    """
+    Per-request SQL statement budgets. `@pytest.mark.query_budget(n)` applies to
+    every HTTP request the test makes; `with query_budget(n):` only to the
+    requests made inside the block.
+    """
+    budgets = []
+    over_budget = []
+
+    def _check(route, stats):
+        if budgets and stats.statements > min(budgets):
+            over_budget.append(f"{route}: {stats.statements} statements (budget {min(budgets)})")
+
+    @contextmanager
+    def limit(n: int):
+        budgets.append(n)
+        try:
+            yield
+        finally:
+            budgets.pop()
+
+    marker = request.node.get_closest_marker("query_budget")
+    if marker is not None:
+        budgets.append(marker.args[0])
+    query_metrics.listeners.append(_check)
+    yield limit
+    query_metrics.listeners.remove(_check)
+    assert not over_budget, "Requests over their SQL budget:\n" + "\n".join(over_budget)
+
+
 # Override the get_session dependency to use the test database
 async def override_get_session() -> AsyncGenerator[AsyncSession, None]:
     async with TestingSessionLocal() as session:
@@ -60,6 +169,7 @@ async def override_get_session() -> AsyncGenerator[AsyncSession, None]:
 
 
 app.dependency_overrides[get_session] = override_get_session
+app.dependency_overrides[get_read_session] = override_get_session
 
 
 @pytest_asyncio.fixture(scope="function")
@@ -0,0 +1,155 @@
+"""
+In-memory stand-in for the slice of the Stripe API used by checkout.
+
+Tests mount it through `httpx.ASGITransport`; for manual or load testing run it
+as a real server and point `STRIPE_API_BASE` at it:
+
+    python -m tests.fake_stripe --port 12111
+"""
+import argparse
+import re
+import time
+import uuid
+from typing import Any, Dict, List
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+_KEY_PART = re.compile(r"\[([^\]]*)\]")
+
+
+def decode_form(pairs: List[tuple]) -> Dict[str, Any]:
+    """Inverse of `encode_form`: turn `line_items[0][quantity]=1` back into nesting."""
+    root: Dict[str, Any] = {}
+    for key, value in pairs:
+        head = key.split("[", 1)[0]
+        parts = [head] + _KEY_PART.findall(key[len(head):])
+        node: Any = root
+        for part, following in zip(parts, parts[1:]):
+            container = [] if following.isdigit() else {}
+            if isinstance(node, list):
+                index = int(part)
+                while len(node) <= index:
+                    node.append(None)
+                if node[index] is None:
+                    node[index] = container
+                node = node[index]
+            else:
+                node = node.setdefault(part, container)
+        last = parts[-1]
+        if isinstance(node, list):
+            index = int(last)
+            while len(node) <= index:
+                node.append(None)
+            node[index] = value
+        else:
+            node[last] = value
+    return root
+
+
+def _error(status_code: int, message: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        content={"error": {"type": "invalid_request_error", "message": message}},
+    )
+
+
+class FakeStripeState:
+    def __init__(self):
+        self.coupons: Dict[str, Dict[str, Any]] = {}
+        self.sessions: Dict[str, Dict[str, Any]] = {}
+        self.requests: List[str] = []
+
+    def sessions_for(self, client_reference_id: str) -> List[Dict[str, Any]]:
+        return [s for s in self.sessions.values() if s["client_reference_id"] == client_reference_id]
+
+
+def build_fake_stripe_app() -> FastAPI:
+    app = FastAPI(title="Fake Stripe")
+    state = FakeStripeState()
+    app.state.stripe = state
+
+    @app.middleware("http")
+    async def require_secret_key(request: Request, call_next):
+        state.requests.append(f"{request.method} {request.url.path}")
+        authorization = request.headers.get("authorization", "")
+        if request.url.path.startswith("/v1/") and not authorization.startswith("Bearer sk_"):
+            return _error(401, "Invalid API Key provided.")
+        return await call_next(request)
+
+    @app.post("/v1/coupons")
+    async def create_coupon(request: Request):
+        params = decode_form(list((await request.form()).multi_items()))
+        coupon = {
+            "id": f"co_{uuid.uuid4().hex[:14]}",
+            "object": "coupon",
+            "name": params.get("name"),
+            "amount_off": int(params["amount_off"]),
+            "currency": params.get("currency"),
+            "duration": params.get("duration", "once"),
+        }
+        state.coupons[coupon["id"]] = coupon
+        return coupon
+
+    @app.post("/v1/checkout/sessions")
+    async def create_checkout_session(request: Request):
+        params = decode_form(list((await request.form()).multi_items()))
+        line_items = params.get("line_items") or []
+        if not line_items:
+            return _error(400, "line_items is required in payment mode.")
+        amount_total = sum(
+            int(item["price_data"]["unit_amount"]) * int(item["quantity"]) for item in line_items
+        )
+        for discount in params.get("discounts") or []:
+            coupon = state.coupons.get(discount.get("coupon"))
+            if coupon is None:
+                return _error(400, f"No such coupon: '{discount.get('coupon')}'")
+            amount_total -= coupon["amount_off"]
+
+        session_id = f"cs_test_{uuid.uuid4().hex}"
+        session = {
+            "id": session_id,
+            "object": "checkout.session",
+            "url": f"https://checkout.stripe.test/c/pay/{session_id}",
+            "status": "open",
+            "payment_status": "unpaid",
+            "mode": params.get("mode"),
+            "client_reference_id": params.get("client_reference_id"),
+            "success_url": params.get("success_url"),
+            "cancel_url": params.get("cancel_url"),
+            "amount_total": max(amount_total, 0),
+            "expires_at": int(time.time()) + 24 * 3600,
+        }
+        state.sessions[session_id] = session
+        return session
+
+    @app.get("/v1/checkout/sessions/{session_id}")
+    async def retrieve_checkout_session(session_id: str):
+        session = state.sessions.get(session_id)
+        if session is None:
+            return _error(404, f"No such checkout.session: '{session_id}'")
+        return session
+
+    @app.post("/_fake/checkout/sessions/{session_id}/pay")
+    async def pay_checkout_session(session_id: str):
+        """Test helper: complete a session as if the customer had paid."""
+        session = state.sessions.get(session_id)
+        if session is None:
+            return _error(404, f"No such checkout.session: '{session_id}'")
+        session.update(status="complete", payment_status="paid")
+        return session
+
+    return app
+
+
+app = build_fake_stripe_app()
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the fake Stripe API server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=12111)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port)
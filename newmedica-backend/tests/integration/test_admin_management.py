@@ -5,7 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 import uuid
 
 from app.core.config import settings
-from app.models import User
+from app.models import Product, User
 from tests.utils import create_test_user, get_test_user_type_by_name
 
 # Mark all tests in this module as asyncio
@@ -114,3 +114,12 @@ async def test_non_admin_cannot_create_voucher(async_client: AsyncClient, basic_
     response = await async_client.post(f"{settings.API_V1_STR}/admin/vouchers", headers=basic_user_token_headers, json=payload)
     assert response.status_code == 403
 
+
+async def test_admin_metrics_report_queries_per_route(
+    async_client: AsyncClient, admin_token_headers: dict, product: Product
+) -> None:
+    await async_client.get(f"/api/v1/products/{product.id}")
+    metrics = (await async_client.get("/api/v1/admin/metrics", headers=admin_token_headers)).json()
+    route = metrics["queries"]["GET /api/v1/products/{product_id}"]
+    assert route["requests"] >= 1
+    assert route["max_statements"] >= 1
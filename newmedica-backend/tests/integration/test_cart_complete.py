@@ -1,7 +1,9 @@
 
 import pytest
 from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import Product
+from tests.utils import add_item_to_cart, create_test_product
 
 # Placeholder test to be expanded
 @pytest.mark.asyncio
@@ -105,4 +107,27 @@ async def test_delete_cart_item(
     response = await async_client.get("/api/v1/cart/", headers=basic_user_token_headers)
     assert response.status_code == 200
     cart_data = response.json()
-    assert len(cart_data["items"]) == 0 
+    assert len(cart_data["items"]) == 0
+
+
+@pytest.mark.asyncio
+async def test_get_cart_query_budget(
+    async_client: AsyncClient,
+    session: AsyncSession,
+    basic_user_token_headers: dict[str, str],
+    product: Product,
+    query_budget,
+):
+    """
+    Tests that reading a cart costs a fixed number of statements however many lines it has.
+    """
+    products = [product] + [
+        await create_test_product(session, f"Cart Product {i}", 5.0, product.category_id) for i in range(2)
+    ]
+    for p in products:
+        await add_item_to_cart(async_client, basic_user_token_headers, p.id, 1)
+
+    # cart + items/products/media/categories, user, vouchers (2), shipping config
+    with query_budget(9):
+        response = await async_client.get("/api/v1/cart/", headers=basic_user_token_headers)
+    assert len(response.json()["items"]) == 3
@@ -56,3 +56,17 @@ async def test_get_categories(async_client: AsyncClient, admin_token_headers: di
     assert len(data) >= 2
     assert "Category 1" in [item["name"] for item in data]
     assert "Category 2" in [item["name"] for item in data]
+
+
+@pytest.mark.asyncio
+async def test_create_category_invalidates_catalog_cache(async_client: AsyncClient, admin_token_headers: dict):
+    from app.services.catalog_cache import catalog_cache
+
+    version = catalog_cache.version
+    response = await async_client.post(
+        "/api/v1/categories",
+        json={"name": "Cache Category", "description": "Desc"},
+        headers=admin_token_headers,
+    )
+    assert response.status_code == 201
+    assert catalog_cache.version == version + 1
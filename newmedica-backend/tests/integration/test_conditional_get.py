@@ -0,0 +1,163 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.product import Product
+from tests.conftest import engine
+from tests.utils import add_item_to_cart, create_test_product_and_category
+
+
+@pytest.mark.asyncio
+async def test_product_detail_revalidates_with_etag(async_client: AsyncClient, product: Product):
+    first = await async_client.get(f"/api/v1/products/{product.id}")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert etag.startswith('"')
+    assert first.headers["cache-control"] == settings.CACHE_CONTROL_POLICIES["products"]
+    assert "last-modified" in first.headers
+
+    again = await async_client.get(f"/api/v1/products/{product.id}", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["etag"] == etag
+    assert again.content == b""
+
+    by_date = await async_client.get(
+        f"/api/v1/products/{product.id}", headers={"If-Modified-Since": first.headers["last-modified"]}
+    )
+    assert by_date.status_code == 304
+
+    # If-None-Match wins over If-Modified-Since
+    stale = await async_client.get(
+        f"/api/v1/products/{product.id}",
+        headers={"If-None-Match": '"stale"', "If-Modified-Since": first.headers["last-modified"]},
+    )
+    assert stale.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_product_etag_changes_after_update(
+    async_client: AsyncClient, product: Product, admin_token_headers: dict
+):
+    first = await async_client.get(f"/api/v1/products/{product.id}")
+    etag = first.headers["etag"]
+
+    res = await async_client.put(
+        f"/api/v1/products/{product.id}", json={"price": 12.5}, headers=admin_token_headers
+    )
+    assert res.status_code == 200
+
+    after = await async_client.get(f"/api/v1/products/{product.id}", headers={"If-None-Match": etag})
+    assert after.status_code == 200
+    assert after.headers["etag"] != etag
+    assert after.json()["price"] == 12.5
+
+
+@pytest.mark.asyncio
+async def test_product_listing_304_is_served_without_queries(async_client: AsyncClient, product: Product):
+    first = await async_client.get("/api/v1/products")
+    etag = first.headers["etag"]
+
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _record)
+    try:
+        again = await async_client.get("/api/v1/products", headers={"If-None-Match": f"W/{etag}"})
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _record)
+
+    assert again.status_code == 304
+    assert statements == []
+
+
+@pytest.mark.asyncio
+async def test_order_endpoints_revalidate(
+    async_client: AsyncClient, session: AsyncSession, basic_user_token_headers: dict
+):
+    product, _ = await create_test_product_and_category(session, "Conditional Product", 20.0)
+    await add_item_to_cart(async_client, basic_user_token_headers, product.id, 1)
+    created = await async_client.post("/api/v1/orders", headers=basic_user_token_headers, json={})
+    assert created.status_code == 201
+    order_id = created.json()["id"]
+
+    listing = await async_client.get("/api/v1/orders", headers=basic_user_token_headers)
+    assert listing.headers["cache-control"] == "private, no-cache"
+    list_etag = listing.headers["etag"]
+    detail = await async_client.get(f"/api/v1/orders/{order_id}", headers=basic_user_token_headers)
+    detail_etag = detail.headers["etag"]
+
+    res = await async_client.get("/api/v1/orders", headers={**basic_user_token_headers, "If-None-Match": list_etag})
+    assert res.status_code == 304
+    res = await async_client.get(
+        f"/api/v1/orders/{order_id}", headers={**basic_user_token_headers, "If-None-Match": detail_etag}
+    )
+    assert res.status_code == 304
+
+    paid = await async_client.post(f"/api/v1/orders/{order_id}/mark-paid", headers=basic_user_token_headers)
+    assert paid.status_code == 200
+
+    res = await async_client.get("/api/v1/orders", headers={**basic_user_token_headers, "If-None-Match": list_etag})
+    assert res.status_code == 200
+    res = await async_client.get(
+        f"/api/v1/orders/{order_id}", headers={**basic_user_token_headers, "If-None-Match": detail_etag}
+    )
+    assert res.status_code == 200
+    assert res.json()["payment_status"] == "paid"
+
+
+@pytest.mark.asyncio
+async def test_order_detail_hides_other_users_orders_from_conditional_requests(
+    async_client: AsyncClient, session: AsyncSession, basic_user_token_headers: dict, admin_token_headers: dict
+):
+    product, _ = await create_test_product_and_category(session, "Private Product", 20.0)
+    await add_item_to_cart(async_client, basic_user_token_headers, product.id, 1)
+    created = await async_client.post("/api/v1/orders", headers=basic_user_token_headers, json={})
+    order_id = created.json()["id"]
+
+    res = await async_client.get(
+        f"/api/v1/orders/{order_id}", headers={**admin_token_headers, "If-None-Match": "*"}
+    )
+    assert res.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_users_me_revalidates(async_client: AsyncClient, basic_user_token_headers: dict):
+    first = await async_client.get("/api/v1/users/me", headers=basic_user_token_headers)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == settings.CACHE_CONTROL_POLICIES["users_me"]
+
+    res = await async_client.get("/api/v1/users/me", headers={**basic_user_token_headers, "If-None-Match": etag})
+    assert res.status_code == 304
+
+    updated = await async_client.patch(
+        "/api/v1/users/me", headers=basic_user_token_headers, json={"firstName": "Changed"}
+    )
+    assert updated.status_code == 200
+
+    res = await async_client.get("/api/v1/users/me", headers={**basic_user_token_headers, "If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_categories_revalidate(async_client: AsyncClient, admin_token_headers: dict):
+    await async_client.post(
+        "/api/v1/categories", json={"name": "Cond Cat", "description": "d"}, headers=admin_token_headers
+    )
+    first = await async_client.get("/api/v1/categories", headers=admin_token_headers)
+    etag = first.headers["etag"]
+
+    res = await async_client.get("/api/v1/categories", headers={**admin_token_headers, "If-None-Match": etag})
+    assert res.status_code == 304
+
+    await async_client.post(
+        "/api/v1/categories", json={"name": "Cond Cat 2", "description": "d"}, headers=admin_token_headers
+    )
+    res = await async_client.get("/api/v1/categories", headers={**admin_token_headers, "If-None-Match": etag})
+    assert res.status_code == 200
+    assert len(res.json()) == 2
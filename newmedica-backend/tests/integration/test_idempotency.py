@@ -0,0 +1,149 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.models import IdempotencyKey, Order, Product
+from app.repositories.idempotency_repository import IdempotencyRepository
+from tests.utils import add_item_to_cart
+
+
+async def _order_count(session: AsyncSession) -> int:
+    return (await session.execute(select(func.count(Order.id)))).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_repeated_checkout_replays_the_first_order(
+    async_client: AsyncClient, session: AsyncSession, basic_user_token_headers: dict, product: Product
+):
+    await add_item_to_cart(async_client, basic_user_token_headers, product.id, 1)
+    headers = {**basic_user_token_headers, "Idempotency-Key": "checkout-1"}
+
+    first = await async_client.post("/api/v1/orders", headers=headers, json={"remark": "door"})
+    assert first.status_code == 201
+    assert "idempotent-replayed" not in first.headers
+    again = await async_client.post("/api/v1/orders", headers=headers, json={"remark": "door"})
+    assert again.status_code == 201
+    assert again.headers["idempotent-replayed"] == "true"
+    assert again.json() == first.json()
+    assert await _order_count(session) == 1
+
+    mismatch = await async_client.post("/api/v1/orders", headers=headers, json={"remark": "window"})
+    assert mismatch.status_code == 422
+    assert mismatch.json()["error"]["code"] == "UNPROCESSABLE_ENTITY"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicate_checkouts_run_once(
+    async_client: AsyncClient, session: AsyncSession, basic_user_token_headers: dict, product: Product
+):
+    await add_item_to_cart(async_client, basic_user_token_headers, product.id, 2)
+    headers = {**basic_user_token_headers, "Idempotency-Key": "double-click"}
+
+    responses = await asyncio.gather(
+        *(async_client.post("/api/v1/orders", headers=headers) for _ in range(3))
+    )
+    assert [r.status_code for r in responses] == [201, 201, 201]
+    assert len({r.json()["id"] for r in responses}) == 1
+    assert await _order_count(session) == 1
+    stock = (await session.execute(select(Product.stock).where(Product.id == product.id))).scalar_one()
+    assert stock == 98
+
+
+@pytest.mark.asyncio
+async def test_failed_request_releases_the_key(
+    async_client: AsyncClient, session: AsyncSession, basic_user_token_headers: dict, product: Product
+):
+    await add_item_to_cart(async_client, basic_user_token_headers, product.id, 1)
+    await session.execute(update(Product).where(Product.id == product.id).values(stock=0))
+    await session.commit()
+    headers = {**basic_user_token_headers, "Idempotency-Key": "sold-out"}
+
+    response = await async_client.post("/api/v1/orders", headers=headers)
+    assert response.status_code == 409
+
+    await session.execute(update(Product).where(Product.id == product.id).values(stock=5))
+    await session.commit()
+    response = await async_client.post("/api/v1/orders", headers=headers)
+    assert response.status_code == 201
+    assert "idempotent-replayed" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_repeated_retry_payment_creates_one_checkout_session(
+    async_client: AsyncClient, basic_user_token_headers: dict, product: Product, fake_stripe
+):
+    await add_item_to_cart(async_client, basic_user_token_headers, product.id, 1)
+    order_id = (await async_client.post("/api/v1/orders", headers=basic_user_token_headers)).json()["id"]
+    headers = {**basic_user_token_headers, "Idempotency-Key": "retry-1"}
+
+    first = await async_client.post(f"/api/v1/orders/{order_id}/retry-payment", headers=headers)
+    again = await async_client.post(f"/api/v1/orders/{order_id}/retry-payment", headers=headers)
+    assert first.status_code == again.status_code == 200
+    assert again.json() == first.json()
+    assert len(fake_stripe.sessions_for(order_id)) == 1
+
+
+@pytest.mark.asyncio
+async def test_keys_are_scoped_per_user(
+    async_client: AsyncClient,
+    session: AsyncSession,
+    basic_user_token_headers: dict,
+    admin_token_headers: dict,
+    product: Product,
+):
+    for headers in (basic_user_token_headers, admin_token_headers):
+        await add_item_to_cart(async_client, headers, product.id, 1)
+        response = await async_client.post("/api/v1/orders", headers={**headers, "Idempotency-Key": "shared"})
+        assert response.status_code == 201
+        assert "idempotent-replayed" not in response.headers
+    assert await _order_count(session) == 2
+
+
+@pytest.mark.asyncio
+async def test_response_is_stored_in_the_order_transaction(
+    async_client: AsyncClient, session: AsyncSession, basic_user_token_headers: dict, product: Product, monkeypatch
+):
+    await add_item_to_cart(async_client, basic_user_token_headers, product.id, 1)
+    headers = {**basic_user_token_headers, "Idempotency-Key": "atomic"}
+
+    async def _fail(*args, **kwargs):
+        raise RuntimeError("connection lost")
+
+    monkeypatch.setattr(IdempotencyRepository, "complete", _fail)
+    with pytest.raises(RuntimeError):
+        await async_client.post("/api/v1/orders", headers=headers)
+    # No order without its stored response, and the key is free for the retry
+    assert await _order_count(session) == 0
+    assert (await session.execute(select(func.count(IdempotencyKey.id)))).scalar_one() == 0
+
+    monkeypatch.undo()
+    response = await async_client.post("/api/v1/orders", headers=headers)
+    assert response.status_code == 201
+    stored = (await session.execute(select(IdempotencyKey))).scalar_one()
+    assert stored.status == "completed"
+    assert stored.response_body is not None
+
+
+@pytest.mark.asyncio
+async def test_lapsed_key_is_not_taken_over_by_a_different_request(
+    async_client: AsyncClient, session: AsyncSession, basic_user_token_headers: dict, product: Product
+):
+    await add_item_to_cart(async_client, basic_user_token_headers, product.id, 1)
+    headers = {**basic_user_token_headers, "Idempotency-Key": "lapsed"}
+    assert (await async_client.post("/api/v1/orders", headers=headers, json={"remark": "door"})).status_code == 201
+    # As if the owner had crashed mid-request long ago
+    await session.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.key == "lapsed")
+        .values(status="in_progress", locked_until=datetime.now(timezone.utc) - timedelta(minutes=5))
+    )
+    await session.commit()
+
+    mismatch = await async_client.post("/api/v1/orders", headers=headers, json={"remark": "window"})
+    assert mismatch.status_code == 422
+    assert await _order_count(session) == 1
@@ -0,0 +1,118 @@
+import io
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.product import Product
+from app.models.product_media import ProductMedia
+from tests.utils import create_test_product
+
+PNG_BYTES = b"\x89PNG\r\n\x1a\n" + b"\x01" * 64
+
+
+async def _add_media(session: AsyncSession, product: Product, count: int) -> list:
+    media = [
+        ProductMedia(product_id=product.id, url=f"/media_uploads/img{i}.png", alt_text=f"Image {i}", display_order=i)
+        for i in range(count)
+    ]
+    session.add_all(media)
+    await session.commit()
+    return [m.id for m in media]
+
+
+def _batch_url(product: Product) -> str:
+    return f"/api/v1/products/{product.id}/media/batch"
+
+
+@pytest.mark.asyncio
+async def test_batch_applies_all_edits_with_one_statement_each(
+    async_client: AsyncClient, admin_token_headers: dict, session: AsyncSession, product: Product, query_budget
+):
+    ids = await _add_media(session, product, 12)
+    new_order = list(reversed(ids[2:]))
+    payload = {
+        "order": [str(i) for i in new_order],
+        "delete": [str(ids[0]), str(ids[1])],
+        "altText": {str(ids[5]): "Side view", str(ids[6]): "Back view"},
+    }
+    # One statement per kind of edit plus fixed overhead, however many images are edited
+    with query_budget(8):
+        response = await async_client.post(_batch_url(product), json=payload, headers=admin_token_headers)
+    assert response.status_code == 200
+
+    media = response.json()
+    assert [m["id"] for m in media] == [str(i) for i in new_order]
+    assert [m["display_order"] for m in media] == list(range(10))
+    alt_texts = {m["id"]: m["alt_text"] for m in media}
+    assert alt_texts[str(ids[5])] == "Side view" and alt_texts[str(ids[6])] == "Back view"
+    assert alt_texts[str(ids[7])] == "Image 7"
+
+
+@pytest.mark.asyncio
+async def test_batch_with_foreign_media_changes_nothing(
+    async_client: AsyncClient, admin_token_headers: dict, session: AsyncSession, product: Product
+):
+    ids = await _add_media(session, product, 2)
+    other = await create_test_product(session, "Other Product", 5.0, product.category_id)
+    foreign_ids = await _add_media(session, other, 1)
+
+    response = await async_client.post(
+        _batch_url(product),
+        json={"delete": [str(ids[0])], "order": [str(foreign_ids[0]), str(ids[1])]},
+        headers=admin_token_headers,
+    )
+    assert response.status_code == 404
+
+    media = (await async_client.get(f"/api/v1/products/{product.id}")).json()["media"]
+    assert [m["id"] for m in media] == [str(i) for i in ids]
+    other_media = (await async_client.get(f"/api/v1/products/{other.id}")).json()["media"]
+    assert other_media[0]["display_order"] == 0
+
+
+@pytest.mark.asyncio
+async def test_batch_rejects_contradictory_edits(
+    async_client: AsyncClient, admin_token_headers: dict, session: AsyncSession, product: Product
+):
+    ids = await _add_media(session, product, 1)
+    response = await async_client.post(
+        _batch_url(product),
+        json={"delete": [str(ids[0])], "altText": {str(ids[0]): "Gone"}},
+        headers=admin_token_headers,
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_attach_existing_shares_the_stored_file(
+    async_client: AsyncClient, admin_token_headers: dict, session: AsyncSession, product: Product
+):
+    upload = await async_client.post(
+        f"/api/v1/products/{product.id}/media",
+        files={"file": ("photo.png", io.BytesIO(PNG_BYTES), "image/png")},
+        data={"alt_text": "Original", "display_order": 0},
+        headers=admin_token_headers,
+    )
+    source = upload.json()
+    other = await create_test_product(session, "Bundle Product", 5.0, product.category_id)
+    await _add_media(session, other, 2)
+
+    response = await async_client.post(
+        _batch_url(other),
+        json={"attach": [{"sourceMediaId": source["id"]}, {"sourceMediaId": source["id"], "altText": "Detail"}]},
+        headers=admin_token_headers,
+    )
+    assert response.status_code == 200
+    attached = response.json()[2:]
+    assert [(m["url"], m["alt_text"], m["display_order"]) for m in attached] == [
+        (source["url"], "Original", 2),
+        (source["url"], "Detail", 3),
+    ]
+    assert attached[0]["srcset"] == source["srcset"]
+
+    # The source product's copy goes; the attached ones keep the file
+    response = await async_client.post(
+        _batch_url(product), json={"delete": [source["id"]]}, headers=admin_token_headers
+    )
+    assert response.status_code == 200
+    assert (await async_client.get(source["url"])).status_code == 200
@@ -0,0 +1,185 @@
+import io
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+from PIL import Image
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.media_blob import MediaBlob
+from app.models.product import Product
+from app.models.product_media import ProductMedia
+from app.services.media_gc import media_collector
+from app.services.media_storage import media_storage
+
+
+def _png(seed: int) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (800, 400), (seed, 30, 30)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+async def _upload(async_client: AsyncClient, headers: dict, product: Product, content: bytes) -> dict:
+    response = await async_client.post(
+        f"/api/v1/products/{product.id}/media",
+        files={"file": ("photo.png", io.BytesIO(content), "image/png")},
+        data={"alt_text": "photo", "display_order": 1},
+        headers=headers,
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+def _after_grace() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(seconds=media_collector.grace_seconds + 60)
+
+
+def _files(root: str) -> set:
+    return {
+        os.path.relpath(os.path.join(dirpath, name), root)
+        for dirpath, _, names in os.walk(root)
+        for name in names
+    }
+
+
+def _write(root: str, storage_key: str, content: bytes = b"x" * 10) -> None:
+    path = os.path.join(root, storage_key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(content)
+
+
+@pytest.mark.asyncio
+async def test_deleted_media_is_hidden_until_collected(
+    async_client: AsyncClient, admin_token_headers: dict, session: AsyncSession, product: Product, media_root: str
+):
+    kept = await _upload(async_client, admin_token_headers, product, _png(1))
+    dropped = await _upload(async_client, admin_token_headers, product, _png(2))
+
+    response = await async_client.delete(f"/api/v1/media/{dropped['id']}", headers=admin_token_headers)
+    assert response.status_code == 204
+
+    product_read = (await async_client.get(f"/api/v1/products/{product.id}")).json()
+    assert [media["id"] for media in product_read["media"]] == [kept["id"]]
+    # The row and file stay until the next sweep
+    assert len((await session.execute(select(ProductMedia))).scalars().all()) == 2
+    assert len(_files(media_root)) == 2
+
+
+@pytest.mark.asyncio
+async def test_dry_run_reports_without_deleting(
+    async_client: AsyncClient, admin_token_headers: dict, session: AsyncSession, product: Product, media_root: str
+):
+    content = _png(3)
+    media = await _upload(async_client, admin_token_headers, product, content)
+    await async_client.delete(f"/api/v1/media/{media['id']}", headers=admin_token_headers)
+    before = _files(media_root)
+
+    report = await media_collector.sweep(dry_run=True, now=_after_grace())
+
+    assert report.dry_run
+    assert (report.rows_purged, report.blobs_deleted, report.files_deleted) == (1, 1, 1)
+    assert report.bytes_reclaimed == len(content)
+    assert _files(media_root) == before
+    assert len((await session.execute(select(ProductMedia))).scalars().all()) == 1
+    assert len((await session.execute(select(MediaBlob))).scalars().all()) == 1
+
+
+@pytest.mark.asyncio
+async def test_sweep_removes_rows_blobs_files_and_variants(
+    async_client: AsyncClient, admin_token_headers: dict, session: AsyncSession, product: Product, media_root: str
+):
+    kept = await _upload(async_client, admin_token_headers, product, _png(4))
+    kept_files = _files(media_root)
+    dropped = await _upload(async_client, admin_token_headers, product, _png(5))
+    assert (await async_client.get(dropped["srcset"]["320w"])).status_code == 200
+    dropped_files = _files(media_root) - kept_files
+    dropped_bytes = sum(os.path.getsize(os.path.join(media_root, key)) for key in dropped_files)
+    await async_client.delete(f"/api/v1/media/{dropped['id']}", headers=admin_token_headers)
+
+    report = await media_collector.sweep(now=_after_grace())
+
+    assert not report.dry_run
+    assert (report.rows_purged, report.blobs_deleted, report.files_deleted) == (1, 1, len(dropped_files))
+    assert report.bytes_reclaimed == dropped_bytes
+    assert _files(media_root) == kept_files
+    remaining = (await session.execute(select(ProductMedia))).scalars().all()
+    assert [str(media.id) for media in remaining] == [kept["id"]]
+    assert len((await session.execute(select(MediaBlob))).scalars().all()) == 1
+    assert media_collector.stats()["last_sweep"]["files_deleted"] == len(dropped_files)
+
+
+@pytest.mark.asyncio
+async def test_grace_period_protects_fresh_uploads(
+    async_client: AsyncClient, admin_token_headers: dict, session: AsyncSession, product: Product, media_root: str
+):
+    media = await _upload(async_client, admin_token_headers, product, _png(6))
+    await async_client.delete(f"/api/v1/media/{media['id']}", headers=admin_token_headers)
+    _write(media_root, ".tmp/upload-in-flight")
+
+    report = await media_collector.sweep()
+
+    assert report.rows_purged == 1
+    assert (report.blobs_deleted, report.files_deleted) == (0, 0)
+    assert len(_files(media_root)) == 2
+    assert len((await session.execute(select(MediaBlob))).scalars().all()) == 1
+
+
+@pytest.mark.asyncio
+async def test_deleting_a_product_leaves_its_files_to_the_sweep(
+    async_client: AsyncClient, admin_token_headers: dict, product: Product, media_root: str
+):
+    await _upload(async_client, admin_token_headers, product, _png(7))
+    response = await async_client.delete(f"/api/v1/products/{product.id}", headers=admin_token_headers)
+    assert response.status_code == 204
+    assert len(_files(media_root)) == 1
+
+    report = await media_collector.sweep(now=_after_grace())
+
+    assert (report.blobs_deleted, report.files_deleted) == (1, 1)
+    assert _files(media_root) == set()
+
+
+@pytest.mark.asyncio
+async def test_sweep_removes_stale_temp_and_unreferenced_legacy_files(
+    session: AsyncSession, product: Product, media_root: str
+):
+    session.add(
+        ProductMedia(product_id=product.id, url=media_storage.url_for("in-use.jpg"), alt_text="legacy", display_order=0)
+    )
+    await session.commit()
+    for key in ("in-use.jpg", "orphan.jpg", ".tmp/abandoned", "variants/aa/bb/not-a-variant.webp"):
+        _write(media_root, key)
+
+    report = await media_collector.sweep(now=_after_grace())
+
+    assert report.files_scanned == 4
+    assert report.files_deleted == 3
+    assert report.bytes_reclaimed == 30
+    assert _files(media_root) == {"in-use.jpg"}
+
+
+@pytest.mark.asyncio
+async def test_admin_gc_endpoint_defaults_to_dry_run(
+    async_client: AsyncClient, admin_token_headers: dict, media_root: str
+):
+    _write(media_root, "orphan.jpg")
+    os.utime(os.path.join(media_root, "orphan.jpg"), (0, 0))
+
+    response = await async_client.post("/api/v1/admin/media/gc", headers=admin_token_headers)
+    assert response.status_code == 200
+    assert response.json() == {
+        "dry_run": True,
+        "rows_purged": 0,
+        "blobs_deleted": 0,
+        "files_scanned": 1,
+        "files_deleted": 1,
+        "bytes_reclaimed": 10,
+    }
+    assert _files(media_root) == {"orphan.jpg"}
+
+    response = await async_client.post("/api/v1/admin/media/gc?dry_run=false", headers=admin_token_headers)
+    assert response.json()["files_deleted"] == 1
+    assert _files(media_root) == set()
@@ -0,0 +1,98 @@
+import gzip
+import io
+import os
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+
+from app.api.media_files import media_files
+from app.models.product import Product
+
+PNG_BYTES = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 4
+
+
+@pytest_asyncio.fixture
+async def stored_media(async_client: AsyncClient, admin_token_headers: dict, product: Product) -> dict:
+    response = await async_client.post(
+        f"/api/v1/products/{product.id}/media",
+        files={"file": ("photo.png", io.BytesIO(PNG_BYTES), "image/png")},
+        data={"alt_text": "photo", "display_order": 1},
+        headers=admin_token_headers,
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_content_addressed_media_is_immutable_and_revalidates(async_client: AsyncClient, stored_media: dict):
+    response = await async_client.get(stored_media["url"])
+    assert response.status_code == 200
+    assert response.content == PNG_BYTES
+    assert response.headers["content-type"] == "image/png"
+    assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+    sha256 = stored_media["url"].rsplit("/", 1)[1].split(".")[0]
+    assert response.headers["etag"] == f'"{sha256}"'
+
+    revalidated = await async_client.get(stored_media["url"], headers={"If-None-Match": response.headers["etag"]})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == response.headers["etag"]
+
+
+@pytest.mark.asyncio
+async def test_media_supports_range_and_head(async_client: AsyncClient, stored_media: dict):
+    response = await async_client.get(stored_media["url"], headers={"Range": "bytes=8-15"})
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes 8-15/{len(PNG_BYTES)}"
+    assert response.content == PNG_BYTES[8:16]
+
+    head = await async_client.head(stored_media["url"])
+    assert head.status_code == 200
+    assert head.headers["content-length"] == str(len(PNG_BYTES))
+    assert head.content == b""
+
+    assert (await async_client.post(stored_media["url"])).status_code == 405
+
+
+@pytest.mark.asyncio
+async def test_media_serves_precompressed_sidecar_when_accepted(
+    async_client: AsyncClient, stored_media: dict, media_root: str, monkeypatch
+):
+    monkeypatch.setattr(media_files, "precompressed", True)
+    storage_key = stored_media["url"].removeprefix("/media_uploads/")
+    with open(os.path.join(media_root, *storage_key.split("/")) + ".gz", "wb") as sidecar:
+        sidecar.write(gzip.compress(PNG_BYTES))
+
+    response = await async_client.get(stored_media["url"], headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"] == "image/png"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.headers["etag"].endswith('-gzip"')
+    assert response.content == PNG_BYTES
+
+    identity = await async_client.get(stored_media["url"], headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    assert identity.content == PNG_BYTES
+
+
+@pytest.mark.asyncio
+async def test_media_delegates_bytes_to_proxy_when_configured(
+    async_client: AsyncClient, stored_media: dict, monkeypatch
+):
+    monkeypatch.setattr(media_files, "accel_redirect_prefix", "/_media")
+    response = await async_client.get(stored_media["url"])
+    assert response.status_code == 200
+    assert response.headers["x-accel-redirect"] == "/_media/" + stored_media["url"].removeprefix("/media_uploads/")
+    assert response.content == b""
+
+
+@pytest.mark.asyncio
+async def test_legacy_media_is_served_with_short_cache(async_client: AsyncClient, media_root: str):
+    os.makedirs(media_root, exist_ok=True)
+    with open(os.path.join(media_root, "old_upload.png"), "wb") as legacy:
+        legacy.write(PNG_BYTES)
+
+    response = await async_client.get("/media_uploads/old_upload.png")
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "public, max-age=3600"
@@ -0,0 +1,104 @@
+import io
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.media_blob import MediaBlob
+from app.models.product import Product
+from app.models.product_media import ProductMedia
+from app.services.media_gc import media_collector
+from app.services.media_storage import media_storage
+
+PNG_BYTES = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+
+
+async def _upload(async_client: AsyncClient, headers: dict, product: Product, content: bytes, alt: str = "img"):
+    return await async_client.post(
+        f"/api/v1/products/{product.id}/media",
+        files={"file": ("photo.png", io.BytesIO(content), "image/png")},
+        data={"alt_text": alt, "display_order": 1},
+        headers=headers,
+    )
+
+
+def _stored_files(root: str) -> list:
+    return [
+        os.path.join(dirpath, name)
+        for dirpath, _, names in os.walk(root)
+        if ".tmp" not in dirpath
+        for name in names
+    ]
+
+
+@pytest.mark.asyncio
+async def test_identical_uploads_share_one_file(
+    async_client: AsyncClient, admin_token_headers: dict, session: AsyncSession, product: Product, media_root: str
+):
+    first = await _upload(async_client, admin_token_headers, product, PNG_BYTES, "front")
+    second = await _upload(async_client, admin_token_headers, product, PNG_BYTES, "back")
+    assert first.status_code == 201 and second.status_code == 201
+    assert first.json()["url"] == second.json()["url"]
+    assert first.json()["url"].startswith("/media_uploads/") and first.json()["url"].endswith(".png")
+
+    assert len(_stored_files(media_root)) == 1
+    blobs = (await session.execute(select(MediaBlob))).scalars().all()
+    assert len(blobs) == 1
+    assert blobs[0].content_type == "image/png" and blobs[0].size_bytes == len(PNG_BYTES)
+    media = (await session.execute(select(ProductMedia).where(ProductMedia.product_id == product.id))).scalars().all()
+    assert {m.blob_sha256 for m in media} == {blobs[0].sha256}
+
+
+@pytest.mark.asyncio
+async def test_upload_rejects_unrecognised_content(
+    async_client: AsyncClient, admin_token_headers: dict, product: Product, media_root: str
+):
+    # The declared filename and type say PNG; the bytes do not
+    response = await _upload(async_client, admin_token_headers, product, b"<svg onload=alert(1)>")
+    assert response.status_code == 415
+    assert response.json()["error"]["code"] == "UNSUPPORTED_MEDIA_TYPE"
+    assert _stored_files(media_root) == []
+
+
+@pytest.mark.asyncio
+async def test_upload_rejects_oversized_file(
+    async_client: AsyncClient,
+    admin_token_headers: dict,
+    session: AsyncSession,
+    product: Product,
+    media_root: str,
+    monkeypatch,
+):
+    monkeypatch.setattr(media_storage, "max_bytes", 32)
+    monkeypatch.setattr(media_storage, "chunk_bytes", 16)
+    response = await _upload(async_client, admin_token_headers, product, PNG_BYTES)
+    assert response.status_code == 413
+    assert response.json()["error"]["code"] == "PAYLOAD_TOO_LARGE"
+    assert _stored_files(media_root) == []
+    assert (await session.execute(select(MediaBlob))).scalars().all() == []
+
+
+@pytest.mark.asyncio
+async def test_delete_keeps_file_until_last_reference_goes(
+    async_client: AsyncClient, admin_token_headers: dict, session: AsyncSession, product: Product, media_root: str
+):
+    first = (await _upload(async_client, admin_token_headers, product, PNG_BYTES)).json()
+    second = (await _upload(async_client, admin_token_headers, product, PNG_BYTES)).json()
+    after_grace = datetime.now(timezone.utc) + timedelta(hours=2)
+
+    response = await async_client.delete(f"/api/v1/media/{first['id']}", headers=admin_token_headers)
+    assert response.status_code == 204
+    await media_collector.sweep(now=after_grace)
+    assert len(_stored_files(media_root)) == 1
+    assert len((await session.execute(select(MediaBlob))).scalars().all()) == 1
+
+    response = await async_client.delete(f"/api/v1/media/{second['id']}", headers=admin_token_headers)
+    assert response.status_code == 204
+    # Deleting only marks the row; the file goes with the next sweep
+    assert len(_stored_files(media_root)) == 1
+    await media_collector.sweep(now=after_grace)
+    assert _stored_files(media_root) == []
+    assert (await session.execute(select(MediaBlob))).scalars().all() == []
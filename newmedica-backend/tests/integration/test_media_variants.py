@@ -0,0 +1,94 @@
+import io
+import os
+
+import pytest
+from httpx import AsyncClient
+from PIL import Image
+
+from app.models.product import Product
+from app.services.media_variants import media_variants
+
+
+def _png(width: int, height: int) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 30, 30)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+async def _upload(async_client: AsyncClient, headers: dict, product: Product, content: bytes) -> dict:
+    response = await async_client.post(
+        f"/api/v1/products/{product.id}/media",
+        files={"file": ("photo.png", io.BytesIO(content), "image/png")},
+        data={"alt_text": "photo", "display_order": 1},
+        headers=headers,
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_media_exposes_srcset_of_webp_variants(
+    async_client: AsyncClient, admin_token_headers: dict, product: Product
+):
+    media = await _upload(async_client, admin_token_headers, product, _png(1600, 800))
+    assert list(media["srcset"]) == ["320w", "640w", "1280w"]
+    assert all(url.endswith(f"-{descriptor}.webp") for descriptor, url in media["srcset"].items())
+
+    response = await async_client.get(f"/api/v1/products/{product.id}")
+    assert response.json()["media"][0]["srcset"] == media["srcset"]
+
+
+@pytest.mark.asyncio
+async def test_missing_variant_is_rendered_on_first_request(
+    async_client: AsyncClient, admin_token_headers: dict, product: Product
+):
+    media = await _upload(async_client, admin_token_headers, product, _png(1600, 800))
+    before = media_variants.stats()["rendered_on_request"]
+
+    response = await async_client.get(media["srcset"]["320w"])
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/webp"
+    with Image.open(io.BytesIO(response.content)) as image:
+        assert image.format == "WEBP" and image.size == (320, 160)
+
+    # Served from disk from now on
+    assert (await async_client.get(media["srcset"]["320w"])).content == response.content
+    assert media_variants.stats()["rendered_on_request"] == before + 1
+
+
+@pytest.mark.asyncio
+async def test_upload_renders_all_variants_in_background(
+    async_client: AsyncClient, admin_token_headers: dict, product: Product, media_root: str, monkeypatch
+):
+    monkeypatch.setattr(media_variants, "on_upload", True)
+    # Narrower than the largest width: never upscaled
+    media = await _upload(async_client, admin_token_headers, product, _png(800, 400))
+    await media_variants.drain()
+
+    sha256 = media["url"].rsplit("/", 1)[1].split(".")[0]
+    for width in media_variants.widths:
+        path = os.path.join(media_root, *media_variants.variant_key(sha256, width).split("/"))
+        with Image.open(path) as image:
+            assert image.width == min(width, 800)
+
+
+@pytest.mark.asyncio
+async def test_media_files_reject_unknown_and_unsafe_keys(
+    async_client: AsyncClient, admin_token_headers: dict, product: Product
+):
+    assert (await async_client.get("/media_uploads/ab/cd/missing.png")).status_code == 404
+    assert (await async_client.get("/media_uploads/%2e%2e/app/main.py")).status_code == 404
+    assert (await async_client.get("/media_uploads/.tmp/upload")).status_code == 404
+    assert (await async_client.get(f"/media_uploads/variants/00/00/{'0' * 64}-320w.webp")).status_code == 404
+
+    # Passes the type sniff but does not decode
+    broken = b"\x89PNG\r\n\x1a\n" + b"\x00" * 32
+    media = await _upload(async_client, admin_token_headers, product, broken)
+    assert (await async_client.get(media["srcset"]["320w"])).status_code == 404
+    assert (await async_client.get(media["url"])).status_code == 200
+
+
+def test_thumbnail_url_prefers_the_smallest_variant():
+    sha256 = "ab" * 32
+    assert media_variants.thumbnail_url("/media_uploads/x.png", sha256).endswith(f"{sha256}-320w.webp")
+    assert media_variants.thumbnail_url("/media_uploads/legacy.png", None) == "/media_uploads/legacy.png"
@@ -1,6 +1,9 @@
 import pytest
 from httpx import AsyncClient
-from app.models import Product, User
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+from app.models import Order, Product, User
+from tests.utils import add_item_to_cart, create_test_product
 
 @pytest.mark.asyncio
 async def test_create_order_from_cart(
@@ -56,6 +59,7 @@ async def test_get_orders(
     async_client: AsyncClient,
     basic_user_token_headers: dict[str, str],
     product: Product,
+    query_budget,
 ):
     """
     Tests that a user can get a list of their orders.
@@ -74,11 +78,14 @@ async def test_get_orders(
     assert response.status_code == 201
 
     # Now, get the list of orders
-    response = await async_client.get("/api/v1/orders", headers=basic_user_token_headers)
+    with query_budget(3):
+        response = await async_client.get("/api/v1/orders", headers=basic_user_token_headers)
     assert response.status_code == 200
-    orders_data = response.json()
-    assert len(orders_data) == 1
-    assert orders_data[0]["total_amount"] == product.price
+    page = response.json()
+    assert page["next_cursor"] is None
+    assert len(page["items"]) == 1
+    assert page["items"][0]["total_amount"] == product.price
+    assert page["items"][0]["item_count"] == 1
 
 
 @pytest.mark.asyncio
@@ -86,6 +93,7 @@ async def test_get_order_by_id(
     async_client: AsyncClient,
     basic_user_token_headers: dict[str, str],
     product: Product,
+    query_budget,
 ):
     """
     Tests that a user can get a single order by its ID.
@@ -105,10 +113,121 @@ async def test_get_order_by_id(
     order_id = response.json()["id"]
 
     # Now, get the order by ID
-    response = await async_client.get(
-        f"/api/v1/orders/{order_id}", headers=basic_user_token_headers
-    )
+    with query_budget(3):
+        response = await async_client.get(
+            f"/api/v1/orders/{order_id}", headers=basic_user_token_headers
+        )
     assert response.status_code == 200
     order_data = response.json()
     assert order_data["id"] == order_id
     assert order_data["total_amount"] == product.price
+
+
+@pytest.mark.asyncio
+async def test_create_order_is_a_single_batched_transaction(
+    async_client: AsyncClient,
+    basic_user_token_headers: dict[str, str],
+    product: Product,
+    session,
+    query_budget,
+):
+    """
+    Checkout writes the order, all of its items and the cart clear in one commit,
+    with one INSERT for the items and no per-item product lookups.
+    """
+    from sqlalchemy import event
+    from tests.conftest import engine
+    from tests.utils import create_test_product
+
+    other = await create_test_product(session, "Second Product", 30.0, product.category_id)
+    for p, qty in ((product, 2), (other, 1)):
+        response = await async_client.post(
+            "/api/v1/cart/items",
+            headers=basic_user_token_headers,
+            json={"product_id": str(p.id), "quantity": qty},
+        )
+        assert response.status_code == 201
+
+    statements: list[str] = []
+    commits: list[bool] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.strip().upper())
+
+    def _commit(conn):
+        commits.append(True)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _record)
+    event.listen(engine.sync_engine, "commit", _commit)
+    # Stock is taken with one conditional UPDATE per line (2 here); everything else is fixed
+    try:
+        with query_budget(14):
+            response = await async_client.post(
+                "/api/v1/orders",
+                headers=basic_user_token_headers,
+                json={"shipping_address": {"city": "Kuala Lumpur"}, "remark": "Leave at door"},
+            )
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _record)
+        event.remove(engine.sync_engine, "commit", _commit)
+
+    assert response.status_code == 201
+    order_data = response.json()
+    assert len(order_data["items"]) == 2
+    assert order_data["subtotal_amount"] == pytest.approx(product.price * 2 + 30.0)
+    assert order_data["billing_address"] == {"city": "Kuala Lumpur"}
+    assert order_data["remark"] == "Leave at door"
+    assert {i["snapshot_name"] for i in order_data["items"]} == {product.name, "Second Product"}
+
+    assert len(commits) == 1
+    assert sum(1 for s in statements if s.startswith("INSERT INTO ORDERITEM")) == 1
+    assert sum(1 for s in statements if s.startswith("DELETE FROM CARTITEM")) == 1
+
+
+@pytest.mark.asyncio
+async def test_create_order_decrements_stock(
+    async_client: AsyncClient,
+    session: AsyncSession,
+    basic_user_token_headers: dict[str, str],
+    product: Product,
+):
+    await add_item_to_cart(async_client, basic_user_token_headers, product.id, 3)
+
+    response = await async_client.post("/api/v1/orders", headers=basic_user_token_headers)
+    assert response.status_code == 201
+
+    stock = (await session.execute(select(Product.stock).where(Product.id == product.id))).scalar_one()
+    assert stock == 97
+
+
+@pytest.mark.asyncio
+async def test_create_order_reports_out_of_stock_lines_and_writes_nothing(
+    async_client: AsyncClient,
+    session: AsyncSession,
+    basic_user_token_headers: dict[str, str],
+    product: Product,
+):
+    scarce = await create_test_product(session, "Scarce Product", 30.0, category_id=product.category_id)
+    scarce.stock = 1
+    session.add(scarce)
+    await session.commit()
+
+    await add_item_to_cart(async_client, basic_user_token_headers, product.id, 2)
+    await add_item_to_cart(async_client, basic_user_token_headers, scarce.id, 2)
+
+    response = await async_client.post("/api/v1/orders", headers=basic_user_token_headers)
+    assert response.status_code == 409
+    error = response.json()["error"]
+    assert error["code"] == "OUT_OF_STOCK"
+    assert error["details"] == [
+        {"product_id": str(scarce.id), "name": "Scarce Product", "requested": 2, "available": 1}
+    ]
+
+    # The line that could be covered was rolled back with the rest of the checkout
+    stocks = dict((await session.execute(select(Product.id, Product.stock))).all())
+    assert stocks[product.id] == 100
+    assert stocks[scarce.id] == 1
+    assert (await session.execute(select(Order))).first() is None
+
+    cart = await async_client.get("/api/v1/cart/", headers=basic_user_token_headers)
+    assert len(cart.json()["items"]) == 2
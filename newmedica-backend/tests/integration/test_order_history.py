@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Order, OrderItem, Product, User
+
+
+async def _seed_orders(session: AsyncSession, user: User, product: Product, count: int) -> list[Order]:
+    now = datetime.now(timezone.utc)
+    orders = []
+    for n in range(count):
+        # Orders 2 and 3 share a timestamp, so the id tiebreak decides their order
+        order = Order(user_id=user.id, total_amount=10.0 * (n + 1), created_at=now - timedelta(minutes=min(n, 2)))
+        session.add(order)
+        session.add_all(
+            OrderItem(
+                order_id=order.id,
+                product_id=product.id,
+                quantity=line + 1,
+                unit_price=10.0,
+                snapshot_media_url=f"/media/{n}-{line}.jpg" if line else None,
+            )
+            for line in range(2)
+        )
+        orders.append(order)
+    await session.commit()
+    return sorted(orders, key=lambda o: (o.created_at, o.id), reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_order_history_pages_newest_first(
+    async_client: AsyncClient,
+    session: AsyncSession,
+    basic_user: User,
+    basic_user_token_headers: dict,
+    admin_user: User,
+    product: Product,
+):
+    expected = await _seed_orders(session, basic_user, product, 5)
+    await _seed_orders(session, admin_user, product, 2)
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = await async_client.get("/api/v1/orders", headers=basic_user_token_headers, params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["items"]) <= 2
+        seen.extend(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert [o["id"] for o in seen] == [str(o.id) for o in expected]
+    first = seen[0]
+    assert first["item_count"] == 3
+    assert first["first_image_url"].endswith("-1.jpg")
+    assert "items" not in first
+
+
+@pytest.mark.asyncio
+async def test_order_history_pages_are_cached_per_cursor(
+    async_client: AsyncClient,
+    session: AsyncSession,
+    basic_user: User,
+    basic_user_token_headers: dict,
+    product: Product,
+):
+    await _seed_orders(session, basic_user, product, 3)
+    first = await async_client.get("/api/v1/orders", headers=basic_user_token_headers, params={"limit": 2})
+    second = await async_client.get(
+        "/api/v1/orders",
+        headers=basic_user_token_headers,
+        params={"limit": 2, "cursor": first.json()["next_cursor"]},
+    )
+    assert first.headers["etag"] != second.headers["etag"]
+    assert len(second.json()["items"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_order_history_rejects_bad_cursor(async_client: AsyncClient, basic_user_token_headers: dict):
+    response = await async_client.get("/api/v1/orders", headers=basic_user_token_headers, params={"cursor": "nope"})
+    assert response.status_code == 400
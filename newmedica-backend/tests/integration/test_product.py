@@ -9,6 +9,7 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 from app.models.category import Category
 from app.models.product import Product
 from app.models.product_media import ProductMedia
+from app.services.catalog_cache import catalog_cache
 
 # Fixtures are in conftest.py
 
@@ -65,7 +66,7 @@ async def test_get_products(async_client: AsyncClient, session: AsyncSession):
 
     response = await async_client.get("/api/v1/products")
     assert response.status_code == 200
-    data = response.json()
+    data = response.json()["items"]
     assert len(data) >= 1
 
 
@@ -89,7 +90,7 @@ async def test_upload_media_for_product(
     await session.commit()
     await session.refresh(product)
 
-    files = {"file": ("test_image.jpg", io.BytesIO(b"a test image"), "image/jpeg")}
+    files = {"file": ("test_image.jpg", io.BytesIO(b"\xff\xd8\xff\xe0a test image"), "image/jpeg")}
     data = {"alt_text": "A test image", "display_order": 1}
     response = await async_client.post(
         f"/api/v1/products/{product.id}/media",
@@ -179,6 +180,7 @@ async def test_delete_media(
 
 
 @pytest.mark.asyncio
+@pytest.mark.query_budget(3)
 async def test_get_product_by_id(async_client: AsyncClient, session: AsyncSession):
     category = Category(name="Get By ID Cat", description="Desc")
     product = Product(
@@ -277,7 +279,7 @@ async def test_get_products_filtered_by_category(
 
     response = await async_client.get(f"/api/v1/products?category={cat1.name}")
     assert response.status_code == 200
-    data = response.json()
+    data = response.json()["items"]
     assert len(data) == 1
     assert data[0]["name"] == "Filter Prod 1"
 
@@ -307,7 +309,7 @@ async def test_get_products_sorted_by_price(
     # Test ascending
     response_asc = await async_client.get("/api/v1/products?sort_by=price")
     assert response_asc.status_code == 200
-    data_asc = response_asc.json()
+    data_asc = response_asc.json()["items"]
     product_names_asc = [
         p["name"] for p in data_asc if p["name"] in ["Sort Prod 1", "Sort Prod 2"]
     ]
@@ -316,8 +318,158 @@ async def test_get_products_sorted_by_price(
     # Test descending
     response_desc = await async_client.get("/api/v1/products?sort_by=price-desc")
     assert response_desc.status_code == 200
-    data_desc = response_desc.json()
+    data_desc = response_desc.json()["items"]
     product_names_desc = [
         p["name"] for p in data_desc if p["name"] in ["Sort Prod 1", "Sort Prod 2"]
     ]
     assert product_names_desc == ["Sort Prod 1", "Sort Prod 2"]
+
+
+async def _collect_pages(async_client: AsyncClient, query: str) -> list[dict]:
+    items, cursor = [], None
+    while True:
+        url = f"/api/v1/products?{query}&limit=2"
+        if cursor:
+            url += f"&cursor={cursor}"
+        response = await async_client.get(url)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["items"]) <= 2
+        items.extend(page["items"])
+        cursor = page["nextCursor"]
+        if not cursor:
+            return items
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "sort_by", ["price", "price-desc", "alphabetical", "alphabetical-desc", "date-new-to-old", "date-old-to-new", None]
+)
+@pytest.mark.query_budget(3)
+async def test_get_products_keyset_pagination(
+    async_client: AsyncClient, session: AsyncSession, sort_by: str | None
+):
+    category = Category(name="Paging Cat", description="Desc")
+    # Duplicate prices force the id tiebreak to keep pages stable
+    products = [
+        Product(name=f"Paged {i}", description="...", price=float(i % 3), stock=1, category=category)
+        for i in range(7)
+    ]
+    session.add_all([category, *products])
+    await session.commit()
+
+    query = f"sort_by={sort_by}" if sort_by else "search=Paged"
+    items = await _collect_pages(async_client, query)
+
+    ids = [p["id"] for p in items]
+    assert len(ids) == len(set(ids)) == 7
+
+    if sort_by and sort_by.startswith("price"):
+        prices = [p["price"] for p in items]
+        assert prices == sorted(prices, reverse=sort_by.endswith("desc"))
+    if sort_by and sort_by.startswith("alphabetical"):
+        names = [p["name"] for p in items]
+        assert names == sorted(names, reverse=sort_by.endswith("desc"))
+
+
+@pytest.mark.asyncio
+async def test_get_products_rejects_bad_cursor(async_client: AsyncClient):
+    response = await async_client.get("/api/v1/products?cursor=not-a-cursor")
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_search_matches_name_and_description_by_relevance(
+    async_client: AsyncClient, session: AsyncSession
+):
+    category = Category(name="Search Cat", description="Desc")
+    cream = Product(name="Barrier Cream", description="Protects skin", price=5.0, stock=1, category=category)
+    wipes = Product(name="Oral Wipes", description="Gentle wipes, no cream", price=3.0, stock=1, category=category)
+    pen = Product(name="Insulin Pen", description="Reusable", price=9.0, stock=1, category=category)
+    session.add_all([category, cream, wipes, pen])
+    await session.commit()
+
+    response = await async_client.get("/api/v1/products?search=cream&sort_by=relevance")
+    assert response.status_code == 200
+    names = [p["name"] for p in response.json()["items"]]
+    # Name hits outrank description-only hits; unrelated products are excluded
+    assert names == ["Barrier Cream", "Oral Wipes"]
+
+    # Prefix matching and updates flow through to the index
+    response = await async_client.get("/api/v1/products?search=insul")
+    assert [p["name"] for p in response.json()["items"]] == ["Insulin Pen"]
+
+    pen.name = "Injector Pen"
+    session.add(pen)
+    await session.commit()
+    # Written behind ProductService's back, so invalidate the catalog cache by hand
+    catalog_cache.bump()
+    response = await async_client.get("/api/v1/products?search=insul")
+    assert response.json()["items"] == []
+
+
+@pytest.mark.asyncio
+async def test_catalog_reads_are_cached_until_an_admin_write(
+    async_client: AsyncClient, admin_token_headers: dict, session: AsyncSession
+):
+    from sqlalchemy import event
+    from tests.conftest import engine
+
+    category = Category(name="Cache Cat", description="Desc")
+    product = Product(name="Cached Product", description="...", price=1.0, stock=1, category=category)
+    session.add_all([category, product])
+    await session.commit()
+    await session.refresh(product)
+
+    assert (await async_client.get(f"/api/v1/products/{product.id}")).status_code == 200
+    assert (await async_client.get("/api/v1/products?limit=10")).status_code == 200
+
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _record)
+    try:
+        detail = await async_client.get(f"/api/v1/products/{product.id}")
+        listing = await async_client.get("/api/v1/products?limit=10")
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _record)
+    assert statements == []
+    assert detail.json()["name"] == "Cached Product"
+    assert [p["name"] for p in listing.json()["items"]] == ["Cached Product"]
+
+    update_res = await async_client.put(
+        f"/api/v1/products/{product.id}", json={"name": "Renamed Product"}, headers=admin_token_headers
+    )
+    assert update_res.status_code == 200
+    assert (await async_client.get(f"/api/v1/products/{product.id}")).json()["name"] == "Renamed Product"
+    listing = await async_client.get("/api/v1/products?limit=10")
+    assert [p["name"] for p in listing.json()["items"]] == ["Renamed Product"]
+
+
+@pytest.mark.asyncio
+async def test_search_backend_is_verified_at_startup(monkeypatch):
+    from app.core.config import settings
+    from app.repositories.product_search import verify_product_search
+    from tests.conftest import engine
+
+    await verify_product_search(engine)
+
+    monkeypatch.setattr(settings, "PRODUCT_SEARCH_BACKEND", "postgres")
+    with pytest.raises(RuntimeError, match="search_vector"):
+        await verify_product_search(engine)
+
+
+@pytest.mark.asyncio
+async def test_query_stats_headers(async_client: AsyncClient, product: Product, monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "QUERY_STATS_HEADERS", True)
+    response = await async_client.get(f"/api/v1/products/{product.id}")
+    assert int(response.headers["x-db-queries"]) > 0
+    assert int(response.headers["x-db-rows"]) > 0
+    assert response.headers["server-timing"].startswith("db;dur=")
+
+    monkeypatch.setattr(settings, "QUERY_STATS_HEADERS", False)
+    assert "x-db-queries" not in (await async_client.get("/api/v1/products")).headers
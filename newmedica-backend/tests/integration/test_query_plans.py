@@ -0,0 +1,172 @@
+import re
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import (
+    Address,
+    Cart,
+    CartItem,
+    Category,
+    Order,
+    OrderItem,
+    Product,
+    ProductMedia,
+    User,
+    UserType,
+    UserVoucher,
+    Voucher,
+    VoucherProductLink,
+    VoucherScope,
+)
+from app.repositories.address_repository import AddressRepository
+from app.repositories.cart_repository import CartRepository
+from app.repositories.order_repository import OrderRepository
+from app.repositories.product_repository import ProductRepository
+from app.repositories.user_repository import UserRepository
+from app.repositories.voucher_repository import VoucherRepository
+from app.repositories.webhook_event_repository import WebhookEventRepository
+from tests.conftest import engine
+
+# SQLite reports a full table scan as "SCAN <table>"; walking an index (e.g. for a
+# keyset ORDER BY ... LIMIT) shows up as "SCAN <table> USING [COVERING] INDEX ...".
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+N_CATEGORIES = 20
+N_PRODUCTS = 2000
+N_USERS = 300
+ORDERS_PER_USER = 3
+
+
+async def _seed(session: AsyncSession) -> dict:
+    now = datetime.now(timezone.utc)
+    user_types = [UserType(name=name) for name in ("Admin", "Agent", "Healthcare", "Basic")]
+    categories = [Category(name=f"Plan Category {i}", description="") for i in range(N_CATEGORIES)]
+    session.add_all(user_types + categories)
+
+    products = [
+        Product(
+            name=f"Plan Product {i:05d}",
+            description="seeded",
+            price=float(i % 500),
+            stock=100,
+            category_id=categories[i % N_CATEGORIES].id,
+        )
+        for i in range(N_PRODUCTS)
+    ]
+    media = [
+        ProductMedia(product_id=p.id, url=f"/media/{p.id}-{n}.jpg", alt_text="", display_order=n)
+        for p in products
+        for n in range(2)
+    ]
+    session.add_all(products + media)
+
+    vouchers = [
+        Voucher(
+            code=f"PLAN{i}",
+            amount=5.0,
+            scope=VoucherScope.USER_TYPE if i % 2 else VoucherScope.PRODUCT_LIST,
+            target_user_type_id=user_types[i % 4].id if i % 2 else None,
+            is_active=i % 5 != 0,
+        )
+        for i in range(200)
+    ]
+    session.add_all(vouchers)
+    session.add_all(
+        VoucherProductLink(voucher_id=v.id, product_id=products[i * 7].id)
+        for i, v in enumerate(vouchers)
+        if v.scope == VoucherScope.PRODUCT_LIST
+    )
+
+    users = [
+        User(email=f"plan_{i}@test.com", password_hash="x", user_type_id=user_types[i % 4].id)
+        for i in range(N_USERS)
+    ]
+    session.add_all(users)
+    for i, user in enumerate(users):
+        cart = Cart(user_id=user.id)
+        session.add(cart)
+        session.add_all(
+            CartItem(cart_id=cart.id, product_id=products[(i + n) % N_PRODUCTS].id, quantity=1)
+            for n in range(3)
+        )
+        session.add(
+            Address(
+                user_id=user.id, first_name="A", last_name="B", phone="1", address1="x",
+                city="c", state="s", postcode="1", country="MY", is_primary=True,
+            )
+        )
+        session.add(UserVoucher(user_id=user.id, voucher_id=vouchers[i % len(vouchers)].id))
+        for n in range(ORDERS_PER_USER):
+            order = Order(
+                user_id=user.id,
+                total_amount=1.0,
+                created_at=now - timedelta(days=n),
+                reserved_until=now - timedelta(days=n) + timedelta(minutes=30),
+            )
+            session.add(order)
+            session.add_all(
+                OrderItem(order_id=order.id, product_id=products[(i * 3 + n) % N_PRODUCTS].id, quantity=1, unit_price=1.0)
+                for _ in range(3)
+            )
+
+    await session.commit()
+    async with engine.begin() as conn:
+        await conn.execute(text("ANALYZE"))
+
+    return {
+        "user": users[N_USERS // 2],
+        "user_type": user_types[2],
+        "category": categories[3],
+        "product": products[N_PRODUCTS // 2],
+        "now": now,
+    }
+
+
+@pytest.mark.asyncio
+async def test_repository_queries_use_indexes(session: AsyncSession):
+    seeded = await _seed(session)
+    user = seeded["user"]
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "DELETE", "UPDATE")):
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _record)
+    try:
+        await WebhookEventRepository(session).claim_due(seeded["now"], limit=10, lease_seconds=60)
+        cart = await CartRepository(session).get_cart_by_user_id(user.id)
+        orders, next_cursor = await OrderRepository(session).get_order_summaries(user.id, limit=2)
+        await OrderRepository(session).get_order_summaries(user.id, limit=2, cursor=next_cursor)
+        await OrderRepository(session).get_order_by_id(orders[0].id)
+        await OrderRepository(session).get_pending_order_by_user_id(user.id)
+        await AddressRepository(session).get_addresses_by_user_id(user.id)
+        await AddressRepository(session).get_primary_for_user(user.id)
+        await ProductRepository(session).get_all_products(category_name=seeded["category"].name, limit=20)
+        await ProductRepository(session).get_all_products(sort_by="price", sort_order="desc", limit=20)
+        await ProductRepository(session).get_product_by_id(seeded["product"].id)
+        await VoucherRepository(session).get_default_voucher_for_user_type(seeded["user_type"].id)
+        await VoucherRepository(session).get_vouchers_for_user(user.id)
+        await VoucherRepository(session).get_by_code("PLAN7")
+        await UserRepository(session).get_by_email(user.email)
+        await OrderRepository(session).cancel_expired_reservations(now=seeded["now"], limit=100)
+        await CartRepository(session).clear_cart_items(cart.id)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _record)
+    await session.rollback()
+
+    assert statements
+    full_scans = []
+    async with engine.connect() as conn:
+        for statement, parameters in statements:
+            plan = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            for row in plan:
+                detail = row[-1]
+                match = FULL_SCAN.match(detail)
+                if match:
+                    full_scans.append(f"{detail}\n    in: {' '.join(statement.split())[:200]}")
+
+    assert not full_scans, "Sequential scans on hot-path queries:\n" + "\n".join(full_scans)
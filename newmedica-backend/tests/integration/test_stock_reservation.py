@@ -0,0 +1,131 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.models import Order, Product
+from app.services.reservation_sweeper import ReservationSweeper
+from tests.conftest import TestingSessionLocal
+from tests.utils import add_item_to_cart
+
+
+async def _place_order(client: AsyncClient, headers: dict, product_id: uuid.UUID, quantity: int) -> uuid.UUID:
+    await add_item_to_cart(client, headers, product_id, quantity)
+    response = await client.post("/api/v1/orders", headers=headers)
+    assert response.status_code == 201
+    return uuid.UUID(response.json()["id"])
+
+
+async def _expire(session: AsyncSession, order_ids) -> None:
+    past = datetime.now(timezone.utc) - timedelta(minutes=1)
+    await session.execute(update(Order).where(Order.id.in_(order_ids)).values(reserved_until=past))
+    await session.commit()
+
+
+async def _stock(session: AsyncSession, product_id: uuid.UUID) -> int:
+    return (await session.execute(select(Product.stock).where(Product.id == product_id))).scalar_one()
+
+
+async def _status(session: AsyncSession, order_id: uuid.UUID) -> str:
+    return (await session.execute(select(Order.payment_status).where(Order.id == order_id))).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_checkout_places_a_time_limited_hold(
+    async_client: AsyncClient, session: AsyncSession, basic_user_token_headers: dict, product: Product
+):
+    order_id = await _place_order(async_client, basic_user_token_headers, product.id, 2)
+
+    reserved_until = (await session.execute(select(Order.reserved_until).where(Order.id == order_id))).scalar_one()
+    assert reserved_until is not None
+    assert await _stock(session, product.id) == 98
+
+
+@pytest.mark.asyncio
+async def test_sweeper_cancels_expired_orders_in_batches_and_restocks(
+    async_client: AsyncClient, session: AsyncSession, basic_user_token_headers: dict, product: Product
+):
+    expired = [await _place_order(async_client, basic_user_token_headers, product.id, 2) for _ in range(5)]
+    live = await _place_order(async_client, basic_user_token_headers, product.id, 1)
+    await _expire(session, expired)
+    assert await _stock(session, product.id) == 89
+
+    sweeper = ReservationSweeper(TestingSessionLocal, batch_size=2, interval_seconds=60)
+    assert await sweeper.sweep() == 5
+    assert await sweeper.sweep() == 0
+
+    assert await _stock(session, product.id) == 99
+    assert [await _status(session, order_id) for order_id in expired] == ["cancelled"] * 5
+    assert await _status(session, live) == "pending"
+
+
+@pytest.mark.asyncio
+async def test_mark_paid_keeps_the_decrement(
+    async_client: AsyncClient, session: AsyncSession, basic_user_token_headers: dict, product: Product
+):
+    order_id = await _place_order(async_client, basic_user_token_headers, product.id, 3)
+
+    response = await async_client.post(f"/api/v1/orders/{order_id}/mark-paid", headers=basic_user_token_headers)
+    assert response.status_code == 200
+    assert response.json()["payment_status"] == "paid"
+    assert (await session.execute(select(Order.reserved_until).where(Order.id == order_id))).scalar_one() is None
+
+    # A paid order is never swept, even if a hold time were still set
+    await _expire(session, [order_id])
+    assert await ReservationSweeper(TestingSessionLocal, batch_size=10, interval_seconds=60).sweep() == 0
+    assert await _stock(session, product.id) == 97
+
+
+@pytest.mark.asyncio
+async def test_late_payment_after_sweep_takes_stock_again(
+    async_client: AsyncClient, session: AsyncSession, basic_user_token_headers: dict, product: Product
+):
+    order_id = await _place_order(async_client, basic_user_token_headers, product.id, 4)
+    await _expire(session, [order_id])
+    await ReservationSweeper(TestingSessionLocal, batch_size=10, interval_seconds=60).sweep()
+    assert await _stock(session, product.id) == 100
+
+    retry = await async_client.post(f"/api/v1/orders/{order_id}/retry-payment", headers=basic_user_token_headers)
+    assert retry.status_code == 400
+
+    response = await async_client.post(f"/api/v1/orders/{order_id}/mark-paid", headers=basic_user_token_headers)
+    assert response.status_code == 200
+    assert await _status(session, order_id) == "paid"
+    assert await _stock(session, product.id) == 96
+
+
+@pytest.mark.asyncio
+async def test_retry_payment_extends_the_hold(
+    async_client: AsyncClient, session: AsyncSession, basic_user_token_headers: dict, product: Product
+):
+    order_id = await _place_order(async_client, basic_user_token_headers, product.id, 1)
+    soon = datetime.now(timezone.utc) + timedelta(seconds=30)
+    await session.execute(update(Order).where(Order.id == order_id).values(reserved_until=soon))
+    await session.commit()
+
+    response = await async_client.post(f"/api/v1/orders/{order_id}/retry-payment", headers=basic_user_token_headers)
+    assert response.status_code == 200
+
+    reserved_until = (await session.execute(select(Order.reserved_until).where(Order.id == order_id))).scalar_one()
+    assert reserved_until.replace(tzinfo=timezone.utc) > soon + timedelta(minutes=5)
+
+
+@pytest.mark.asyncio
+async def test_cached_product_reads_follow_stock_changes(
+    async_client: AsyncClient, session: AsyncSession, basic_user_token_headers: dict, product: Product
+):
+    async def _listed_stock() -> int:
+        response = await async_client.get(f"/api/v1/products/{product.id}")
+        return response.json()["stock"]
+
+    assert await _listed_stock() == 100
+    order_id = await _place_order(async_client, basic_user_token_headers, product.id, 4)
+    assert await _listed_stock() == 96
+
+    await _expire(session, [order_id])
+    await ReservationSweeper(TestingSessionLocal, batch_size=10, interval_seconds=60).sweep()
+    assert await _listed_stock() == 100
@@ -131,3 +131,42 @@ async def test_update_healthcare_extra_fields(async_client: AsyncClient, session
     assert user.extra_fields["hospitalName"] == "General Hospital"
     assert user.extra_fields["department"] == "Cardiology"
     assert user.extra_fields["position"] == "Senior Consultant"
+
+
+@pytest.mark.asyncio
+async def test_authenticated_requests_reuse_cached_principal(
+    async_client: AsyncClient, admin_token_headers: dict
+):
+    """
+    Once a principal is cached, /users/me and admin role checks run no queries,
+    and a profile update is visible on the next request.
+    """
+    from sqlalchemy import event
+    from tests.conftest import engine
+
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    # Warm the cache
+    assert (await async_client.get("/api/v1/users/me", headers=admin_token_headers)).status_code == 200
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _record)
+    try:
+        me_res = await async_client.get("/api/v1/users/me", headers=admin_token_headers)
+        admin_res = await async_client.get("/api/v1/admin/test-security", headers=admin_token_headers)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _record)
+
+    assert me_res.status_code == 200
+    assert me_res.json()["userType"] == "Admin"
+    assert admin_res.status_code == 200
+    assert statements == []
+
+    update_res = await async_client.patch(
+        "/api/v1/users/me", headers=admin_token_headers, json={"firstName": "Cached"}
+    )
+    assert update_res.status_code == 200
+    me_res = await async_client.get("/api/v1/users/me", headers=admin_token_headers)
+    assert me_res.json()["firstName"] == "Cached"
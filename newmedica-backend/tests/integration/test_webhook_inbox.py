@@ -0,0 +1,190 @@
+import hashlib
+import hmac
+import json
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.config import settings
+from app.models import Order, Product, WebhookEvent
+from app.repositories.webhook_event_repository import WebhookEventRepository
+from app.services.webhook_inbox import STRIPE_HANDLERS, WebhookInbox
+from tests.conftest import TestingSessionLocal
+from tests.utils import add_item_to_cart
+
+
+def _signed(event: dict) -> tuple[bytes, dict]:
+    payload = json.dumps(event).encode()
+    timestamp = int(time.time())
+    signature = hmac.new(
+        settings.STRIPE_WEBHOOK_SECRET.encode(), f"{timestamp}.".encode() + payload, hashlib.sha256
+    ).hexdigest()
+    return payload, {"Stripe-Signature": f"t={timestamp},v1={signature}", "Content-Type": "application/json"}
+
+
+def _completed_event(order_id: str, event_id: str = "evt_completed_1") -> dict:
+    return {
+        "id": event_id,
+        "object": "event",
+        "type": "checkout.session.completed",
+        "data": {"object": {"id": "cs_test_1", "object": "checkout.session", "client_reference_id": order_id}},
+    }
+
+
+def _inbox(handlers=None, max_attempts: int = 3) -> WebhookInbox:
+    return WebhookInbox(
+        TestingSessionLocal,
+        handlers=handlers if handlers is not None else STRIPE_HANDLERS,
+        workers=1,
+        batch_size=10,
+        lease_seconds=60,
+        max_attempts=max_attempts,
+        backoff_base_seconds=0,
+        backoff_max_seconds=0,
+        poll_interval_seconds=1,
+    )
+
+
+async def _events(session: AsyncSession) -> list[WebhookEvent]:
+    result = await session.execute(select(WebhookEvent).execution_options(populate_existing=True))
+    return list(result.scalars().all())
+
+
+@pytest.mark.asyncio
+async def test_webhook_stores_event_once_and_acks_before_processing(
+    async_client: AsyncClient, session: AsyncSession, basic_user_token_headers: dict, product: Product
+):
+    await add_item_to_cart(async_client, basic_user_token_headers, product.id, 1)
+    order_id = (await async_client.post("/api/v1/orders", headers=basic_user_token_headers)).json()["id"]
+    payload, headers = _signed(_completed_event(order_id))
+
+    first = await async_client.post("/api/v1/webhooks/stripe", content=payload, headers=headers)
+    assert first.status_code == 200
+    assert first.json() == {"status": "success"}
+    again = await async_client.post("/api/v1/webhooks/stripe", content=payload, headers=headers)
+    assert again.status_code == 200
+    assert again.json() == {"status": "duplicate"}
+
+    events = await _events(session)
+    assert [(e.event_id, e.status) for e in events] == [("evt_completed_1", "pending")]
+    # Nothing touched the order on the request path
+    status = (await session.execute(select(Order.payment_status).where(Order.id == uuid.UUID(order_id)))).scalar_one()
+    assert status == "pending"
+
+    assert await _inbox().drain() == 1
+    status = (await session.execute(select(Order.payment_status).where(Order.id == uuid.UUID(order_id)))).scalar_one()
+    assert status == "paid"
+    assert [e.status for e in await _events(session)] == ["processed"]
+
+
+@pytest.mark.asyncio
+async def test_webhook_rejects_bad_signature(async_client: AsyncClient, session: AsyncSession):
+    payload, headers = _signed(_completed_event(str(uuid.uuid4())))
+    headers["Stripe-Signature"] = headers["Stripe-Signature"].replace("v1=", "v1=0")
+
+    response = await async_client.post("/api/v1/webhooks/stripe", content=payload, headers=headers)
+    assert response.status_code == 400
+    assert await _events(session) == []
+
+
+@pytest.mark.asyncio
+async def test_failing_events_retry_then_dead_letter_and_can_be_replayed(async_client: AsyncClient, session: AsyncSession):
+    calls = []
+
+    async def _flaky(db, event):
+        calls.append(event["id"])
+        raise RuntimeError("order service unavailable")
+
+    await WebhookEventRepository(session).add_if_new("stripe", "evt_flaky", "test.flaky", json.dumps({"id": "evt_flaky"}))
+
+    assert await _inbox({"test.flaky": _flaky}, max_attempts=2).drain() == 2
+    [event] = await _events(session)
+    assert event.status == "dead"
+    assert event.attempts == 2
+    assert event.last_error == "RuntimeError: order service unavailable"
+    assert calls == ["evt_flaky", "evt_flaky"]
+
+    assert await WebhookEventRepository(session).requeue() == 1
+    [event] = await _events(session)
+    assert (event.status, event.attempts, event.last_error) == ("pending", 0, None)
+
+    async def _ok(db, event):
+        calls.append(event["id"])
+
+    assert await _inbox({"test.flaky": _ok}).drain() == 1
+    [event] = await _events(session)
+    assert event.status == "processed"
+
+
+@pytest.mark.asyncio
+async def test_unknown_order_is_dead_lettered(async_client: AsyncClient, session: AsyncSession):
+    event = _completed_event(str(uuid.uuid4()), event_id="evt_unknown_order")
+    await WebhookEventRepository(session).add_if_new("stripe", event["id"], event["type"], json.dumps(event))
+
+    await _inbox(max_attempts=1).drain()
+    [stored] = await _events(session)
+    assert stored.status == "dead"
+    assert stored.last_error.startswith("LookupError")
+
+
+@pytest.mark.asyncio
+async def test_event_reclaimed_after_its_lease_lapsed_is_processed_once(session: AsyncSession):
+    calls = []
+
+    async def _handle(db, event):
+        calls.append(event["id"])
+
+    for event_id in ("evt_a", "evt_b"):
+        await WebhookEventRepository(session).add_if_new("stripe", event_id, "test.slow", json.dumps({"id": event_id}))
+    inbox = _inbox({"test.slow": _handle})
+
+    # A worker claims both, then stalls until the lease on the second has run out
+    async with TestingSessionLocal() as claim_session:
+        stalled = await WebhookEventRepository(claim_session).claim_due(datetime.now(timezone.utc), 10, 0)
+    assert await inbox.process_event(stalled[0])
+    async with TestingSessionLocal() as claim_session:
+        [reclaimed] = await WebhookEventRepository(claim_session).claim_due(datetime.now(timezone.utc), 10, 60)
+    assert reclaimed.event_id == "evt_b"
+
+    assert not await inbox.process_event(stalled[1])
+    assert await inbox.process_event(reclaimed)
+    assert sorted(calls) == ["evt_a", "evt_b"]
+    assert {(e.event_id, e.status, e.attempts) for e in await _events(session)} == {
+        ("evt_a", "processed", 1),
+        ("evt_b", "processed", 2),
+    }
+
+
+@pytest.mark.asyncio
+async def test_stale_worker_cannot_settle_an_event_it_lost(session: AsyncSession):
+    reclaimed = []
+
+    async def _handle(db, event):
+        if not reclaimed:
+            # The lease runs out mid-handler and another worker takes the event over
+            async with TestingSessionLocal() as claim_session:
+                reclaimed.extend(
+                    await WebhookEventRepository(claim_session).claim_due(
+                        datetime.now(timezone.utc) + timedelta(seconds=120), 10, 60
+                    )
+                )
+            raise RuntimeError("stalled worker gave up")
+
+    await WebhookEventRepository(session).add_if_new("stripe", "evt_lost", "test.lost", json.dumps({"id": "evt_lost"}))
+    inbox = _inbox({"test.lost": _handle}, max_attempts=1)
+    async with TestingSessionLocal() as claim_session:
+        [stale] = await WebhookEventRepository(claim_session).claim_due(datetime.now(timezone.utc), 10, 60)
+
+    # Attempt 1 is out of retries, but its failure must not dead-letter attempt 2's event
+    assert not await inbox.process_event(stale)
+    [stored] = await _events(session)
+    assert (stored.status, stored.attempts, stored.last_error) == ("processing", 2, None)
+
+    assert await inbox.process_event(reclaimed[0])
+    [stored] = await _events(session)
+    assert (stored.status, stored.attempts) == ("processed", 2)
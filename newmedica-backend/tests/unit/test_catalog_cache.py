@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from app.services.catalog_cache import CatalogCache
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load():
+    cache = CatalogCache(ttl_seconds=60, max_entries=10)
+    calls = 0
+    release = asyncio.Event()
+
+    async def _load():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return ["page"]
+
+    waiters = [asyncio.create_task(cache.get_or_load(("page", None), _load)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*waiters) == [["page"]] * 5
+    assert calls == 1
+    assert await cache.get_or_load(("page", None), _load) == ["page"]
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_bump_invalidates_and_discards_loads_that_raced_it():
+    cache = CatalogCache(ttl_seconds=60, max_entries=10)
+    values = iter(["v1", "v2", "v3"])
+
+    async def _load():
+        return next(values)
+
+    assert await cache.get_or_load(("product", 1), _load) == "v1"
+    cache.bump()
+    assert await cache.get_or_load(("product", 1), _load) == "v2"
+
+    async def _load_racing_a_write():
+        cache.bump()
+        return "stale"
+
+    cache.bump()
+    assert await cache.get_or_load(("product", 1), _load_racing_a_write) == "stale"
+    assert await cache.get_or_load(("product", 1), _load) == "v3"
+
+
+@pytest.mark.asyncio
+async def test_failed_load_is_not_cached():
+    cache = CatalogCache(ttl_seconds=60, max_entries=10)
+
+    async def _fail():
+        raise RuntimeError("db down")
+
+    async def _load():
+        return "ok"
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_load(("page",), _fail)
+    assert await cache.get_or_load(("page",), _load) == "ok"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_hands_the_load_to_a_waiter():
+    cache = CatalogCache(ttl_seconds=60, max_entries=10)
+    calls = 0
+    release = asyncio.Event()
+
+    async def _load():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return ["page"]
+
+    leader = asyncio.create_task(cache.get_or_load(("page", None), _load))
+    await asyncio.sleep(0)
+    waiters = [asyncio.create_task(cache.get_or_load(("page", None), _load)) for _ in range(3)]
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*waiters) == [["page"]] * 3
+    assert leader.cancelled()
+    # One waiter took over; the others shared its load
+    assert calls == 2
@@ -0,0 +1,23 @@
+from app.core.config import settings
+from app.db.session import engine_options
+
+
+def test_postgres_engine_options_follow_settings():
+    options = engine_options("postgresql+asyncpg://user:password@db:5432/newmedica")
+
+    assert options["echo"] is False
+    assert options["pool_size"] == settings.DB_POOL_SIZE
+    assert options["max_overflow"] == settings.DB_MAX_OVERFLOW
+    assert options["pool_recycle"] == settings.DB_POOL_RECYCLE_SECONDS
+    assert options["pool_pre_ping"] is settings.DB_POOL_PRE_PING
+    assert options["connect_args"] == {
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)},
+    }
+
+
+def test_sqlite_engine_options_skip_pool_settings():
+    options = engine_options("sqlite+aiosqlite:///:memory:")
+
+    assert options == {"echo": False, "future": True}
@@ -0,0 +1,77 @@
+from typing import List, Optional
+
+import pytest
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import event
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models import Cart, CartItem, Category, Order, Product, User, UserType
+from app.repositories.cart_repository import CartRepository
+from app.repositories.loader_plan import loader_options
+from app.schemas.cart import CartRead
+from app.schemas.order import OrderRead
+from app.schemas.product import ProductRead
+from tests.conftest import engine
+
+
+def _paths(options) -> set[str]:
+    return {" -> ".join(str(entry.key) for entry in option.path.natural_path[1::2]) for option in options}
+
+
+def test_plans_follow_the_response_schema():
+    assert _paths(loader_options(Product, ProductRead)) == {"category", "media"}
+    assert _paths(loader_options(Cart, CartRead)) == {"items -> product -> category", "items -> product -> media"}
+    # OrderItemRead only reads snapshot columns, so products are not loaded
+    assert _paths(loader_options(Order, OrderRead)) == {"items"}
+
+
+def test_plans_are_cached_per_schema():
+    assert loader_options(Cart, CartRead) is loader_options(Cart, CartRead)
+
+
+def test_leaf_relationships_are_loaded_without_recursing():
+    class CategoryNameRead(BaseModel):
+        name: str
+
+        model_config = ConfigDict(from_attributes=True)
+
+    class ProductCard(BaseModel):
+        name: str
+        category: Optional[CategoryNameRead] = None
+        media: List[dict] = []
+
+        model_config = ConfigDict(from_attributes=True)
+
+    assert _paths(loader_options(Product, ProductCard)) == {"category", "media"}
+
+
+@pytest.mark.asyncio
+async def test_cart_loads_with_one_query_per_relationship_and_no_joins(session: AsyncSession):
+    user_type = UserType(name="Basic")
+    category = Category(name="Plan", description="")
+    session.add_all([user_type, category])
+    user = User(email="planner@test.com", password_hash="x", user_type_id=user_type.id)
+    product = Product(name="Planned", description="d", price=5.0, stock=10, category_id=category.id)
+    session.add_all([user, product])
+    cart = Cart(user_id=user.id)
+    session.add(cart)
+    session.add(CartItem(cart_id=cart.id, product_id=product.id, quantity=2))
+    await session.commit()
+    session.expunge_all()
+
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _record)
+    try:
+        loaded = await CartRepository(session).get_cart_by_user_id(user.id)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _record)
+
+    cart_read = CartRead.model_validate(loaded)
+    assert cart_read.items[0].product.category.name == "Plan"
+    # cart, items, products, categories, media
+    assert len(statements) == 5
+    assert not [s for s in statements if "JOIN" in s.upper()]
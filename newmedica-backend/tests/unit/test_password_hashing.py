@@ -0,0 +1,59 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core.exceptions import ServiceUnavailableException
+from app.core.password_hashing import PasswordHasher
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_run_off_the_event_loop():
+    hasher = PasswordHasher(max_workers=2, max_pending=4)
+    loop_thread = threading.get_ident()
+    seen_threads = set()
+
+    def _record(password: str) -> str:
+        seen_threads.add(threading.get_ident())
+        return f"hashed:{password}"
+
+    try:
+        assert await hasher._run(_record, "secret") == "hashed:secret"
+        hashed = await hasher.hash("secret")
+        assert await hasher.verify("secret", hashed)
+        assert not await hasher.verify("other", hashed)
+    finally:
+        hasher.shutdown()
+
+    assert loop_thread not in seen_threads
+    stats = hasher.stats()
+    assert stats["completed"] == 4
+    assert stats["pending"] == 0
+    assert stats["max_latency_ms"] > 0
+
+
+@pytest.mark.asyncio
+async def test_saturated_pool_rejects_with_503():
+    hasher = PasswordHasher(max_workers=1, max_pending=2)
+    release = threading.Event()
+
+    def _block() -> bool:
+        release.wait(timeout=5)
+        return True
+
+    running = [asyncio.create_task(hasher._run(_block)) for _ in range(2)]
+    await asyncio.sleep(0)
+    try:
+        with pytest.raises(ServiceUnavailableException) as exc_info:
+            await hasher.verify("secret", "irrelevant")
+        assert exc_info.value.status_code == 503
+        assert hasher.stats()["pending"] == 2
+    finally:
+        release.set()
+        assert await asyncio.gather(*running) == [True, True]
+        hasher.shutdown()
+
+    stats = hasher.stats()
+    assert stats["rejected"] == 1
+    assert stats["peak_pending"] == 2
+    assert stats["pending"] == 0
@@ -0,0 +1,30 @@
+from urllib.parse import parse_qsl
+
+from app.services.payment_gateway import encode_form
+from tests.fake_stripe import decode_form
+
+
+def test_form_encoding_round_trips_nested_params():
+    params = {
+        "mode": "payment",
+        "payment_method_types": ["card", "fpx"],
+        "line_items": [
+            {"price_data": {"currency": "myr", "unit_amount": 1250}, "quantity": 2},
+            {"price_data": {"currency": "myr", "unit_amount": 500}, "quantity": 1},
+        ],
+        "discounts": [],
+        "client_reference_id": None,
+    }
+
+    encoded = encode_form(params)
+    assert "line_items%5B1%5D%5Bprice_data%5D%5Bunit_amount%5D=500" in encoded
+    assert "client_reference_id" not in encoded
+
+    assert decode_form(parse_qsl(encoded)) == {
+        "mode": "payment",
+        "payment_method_types": ["card", "fpx"],
+        "line_items": [
+            {"price_data": {"currency": "myr", "unit_amount": "1250"}, "quantity": "2"},
+            {"price_data": {"currency": "myr", "unit_amount": "500"}, "quantity": "1"},
+        ],
+    }
@@ -0,0 +1,70 @@
+import uuid
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.session import ReadReplicaRouter
+
+
+async def _engine_with_marker(path, marker: str):
+    db_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with db_engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE marker (name TEXT)"))
+        await conn.execute(text("INSERT INTO marker VALUES (:name)"), {"name": marker})
+    return db_engine
+
+
+async def _served_by(router: ReadReplicaRouter, user_id=None) -> str:
+    async with await router.session_for(user_id) as session:
+        return (await session.execute(text("SELECT name FROM marker"))).scalar_one()
+
+
+def _router(primary, replica, **overrides) -> ReadReplicaRouter:
+    options = dict(max_lag_seconds=5.0, check_interval_seconds=60.0, pin_seconds=60.0)
+    options.update(overrides)
+    return ReadReplicaRouter(primary=primary, replica=replica, **options)
+
+
+@pytest.mark.asyncio
+async def test_reads_use_replica_unless_user_wrote_recently(tmp_path):
+    primary = await _engine_with_marker(tmp_path / "primary.db", "primary")
+    replica = await _engine_with_marker(tmp_path / "replica.db", "replica")
+    router = _router(primary, replica)
+    writer, reader = uuid.uuid4(), uuid.uuid4()
+    try:
+        assert await _served_by(router) == "replica"
+
+        router.pin(writer)
+        assert await _served_by(router, writer) == "primary"
+        assert await _served_by(router, reader) == "replica"
+
+        expired = _router(primary, replica, pin_seconds=0.0)
+        expired.pin(writer)
+        assert await _served_by(expired, writer) == "replica"
+    finally:
+        await primary.dispose()
+        await replica.dispose()
+
+
+@pytest.mark.asyncio
+async def test_reads_fall_back_to_primary(tmp_path):
+    primary = await _engine_with_marker(tmp_path / "primary.db", "primary")
+    try:
+        assert await _served_by(_router(primary, None)) == "primary"
+
+        unreachable = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/missing/replica.db")
+        assert await _served_by(_router(primary, unreachable)) == "primary"
+        await unreachable.dispose()
+
+        replica = await _engine_with_marker(tmp_path / "replica.db", "replica")
+        lagging = _router(primary, replica, max_lag_seconds=1.0)
+
+        async def _lag() -> float:
+            return 30.0
+
+        lagging._measure_lag = _lag
+        assert await _served_by(lagging) == "primary"
+        await replica.dispose()
+    finally:
+        await primary.dispose()
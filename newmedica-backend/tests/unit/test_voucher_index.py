@@ -0,0 +1,102 @@
+import uuid
+
+import pytest
+from sqlalchemy import event
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models import Cart, CartItem, Category, Product, User, UserType
+from app.models.voucher import Voucher, VoucherProductLink
+from app.schemas.admin_voucher import VoucherUpdate
+from app.services.admin_service import AdminVoucherService
+from app.services.pricing_service import PricingService
+from app.services.voucher_index import voucher_rule_index
+from tests.conftest import engine
+
+
+async def _setup_cart(session: AsyncSession, user_type_name: str = "Healthcare"):
+    user_type = (await session.execute(select(UserType).where(UserType.name == user_type_name))).scalar_one_or_none()
+    if not user_type:
+        user_type = UserType(name=user_type_name)
+        session.add(user_type)
+        await session.commit()
+        await session.refresh(user_type)
+
+    user = User(email=f"idx_{uuid.uuid4()}@test.com", password_hash="x", user_type_id=user_type.id)
+    cat = Category(name=f"IdxCat-{uuid.uuid4()}", description="")
+    session.add_all([user, cat])
+    await session.commit()
+    await session.refresh(user)
+    await session.refresh(cat)
+
+    product = Product(name="Indexed", description="d", price=50.0, stock=100, category_id=cat.id)
+    session.add(product)
+    await session.commit()
+    await session.refresh(product)
+
+    cart = Cart(user_id=user.id)
+    session.add(cart)
+    await session.commit()
+    await session.refresh(cart)
+    session.add(CartItem(cart_id=cart.id, product_id=product.id, quantity=2))
+    await session.commit()
+    return user, user_type, product
+
+
+def _count_voucher_queries(statements: list[str]) -> int:
+    return sum(1 for s in statements if "voucher" in s.lower())
+
+
+@pytest.mark.asyncio
+async def test_compute_totals_runs_no_voucher_queries_once_indexed(session: AsyncSession):
+    user, user_type, product = await _setup_cart(session)
+    for i in range(5):
+        v = Voucher(code=f"IDX{i}", discount_type="fixed", amount=1.0, scope="product_list", target_user_type_id=user_type.id, min_quantity=1, is_active=True)
+        session.add(v)
+        await session.commit()
+        await session.refresh(v)
+        session.add(VoucherProductLink(voucher_id=v.id, product_id=product.id))
+    await session.commit()
+
+    pricing = PricingService(session)
+    first = await pricing.compute_totals(user.id)
+    assert first["discount"] == 5.0
+
+    statements: list[str] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _record)
+    try:
+        second = await pricing.compute_totals(user.id)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _record)
+
+    assert second == first
+    assert _count_voucher_queries(statements) == 0
+
+
+@pytest.mark.asyncio
+async def test_admin_voucher_changes_patch_the_index(session: AsyncSession):
+    user, user_type, product = await _setup_cart(session)
+    v = Voucher(code="PATCHME", discount_type="fixed", amount=10.0, scope="user_type", target_user_type_id=user_type.id, is_active=True)
+    session.add(v)
+    await session.commit()
+    await session.refresh(v)
+
+    pricing = PricingService(session)
+    assert (await pricing.compute_totals(user.id))["discount"] == 10.0
+
+    service = AdminVoucherService(session)
+    await service.update_voucher(v.id, VoucherUpdate(amount=15.0))
+    totals = await pricing.compute_totals(user.id)
+    assert totals["discount"] == 15.0
+    assert totals["applied_voucher_code"] == "PATCHME"
+
+    await service.update_voucher(v.id, VoucherUpdate(is_active=False))
+    assert (await pricing.compute_totals(user.id))["discount"] == 0.0
+
+    await service.delete_voucher(v.id)
+    applicable = await voucher_rule_index.get_applicable(session, user.id, user_type.id)
+    assert applicable == []
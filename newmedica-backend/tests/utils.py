@@ -4,7 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 from app.models import User, Product, Category, UserType, Voucher, VoucherScope, DiscountType
 from typing import Optional
-from app.services.user_service import pwd_context # Import the password context
+from app.core.password_hashing import pwd_context
 
 async def create_test_user(session: AsyncSession, email: str, user_type_id: uuid.UUID, password: str = "password") -> User:
     """Creates a user directly in the database for testing purposes with a valid password hash."""
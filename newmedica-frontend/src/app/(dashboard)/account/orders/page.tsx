@@ -1,7 +1,7 @@
 'use client';
 import React, { useEffect, useState } from 'react';
-import { getOrders, retryPayment } from '@/lib/api/orders';
-import { Order } from '@/types';
+import { getOrderById, getOrders, retryPayment } from '@/lib/api/orders';
+import { Order, OrderSummary } from '@/types';
 import { useAuthStore } from '@/store/authStore';
 import Image from 'next/image';
 import { useRouter } from 'next/navigation';
@@ -14,13 +14,15 @@ import { formatVoucherCode } from '@/lib/utils';
 const OrdersPage = () => {
   const { user, token, loading: loadingAuth, checkAuth } = useAuthStore();
   const router = useRouter();
-  const [orders, setOrders] = useState<Order[]>([]);
+  const [orders, setOrders] = useState<OrderSummary[]>([]);
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [selectedTab, setSelectedTab] = useState<'all' | 'pending' | 'paid'>('all');
   const [isModalOpen, setIsModalOpen] = useState(false);
   const [selectedOrder, setSelectedOrder] = useState<Order | null>(null);
   const [retryingOrderId, setRetryingOrderId] = useState<string | null>(null);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
 
   useEffect(() => {
     checkAuth();
@@ -35,8 +37,9 @@ const OrdersPage = () => {
     const fetchOrders = async () => {
       if (!user || !token) return;
       try {
-        const fetchedOrders = await getOrders();
-        setOrders(fetchedOrders);
+        const page = await getOrders();
+        setOrders(page.items);
+        setNextCursor(page.next_cursor);
       } catch (err) {
         setError((err as Error).message);
       } finally {
@@ -54,9 +57,27 @@ const OrdersPage = () => {
     return order.payment_status === selectedTab;
   });
 
-  const handleViewDetails = (order: Order) => {
-    setSelectedOrder(order);
-    setIsModalOpen(true);
+  const handleViewDetails = async (order: OrderSummary) => {
+    try {
+      setSelectedOrder(await getOrderById(order.id));
+      setIsModalOpen(true);
+    } catch (err) {
+      setError((err as Error).message);
+    }
+  };
+
+  const handleLoadMore = async () => {
+    if (!nextCursor) return;
+    setIsLoadingMore(true);
+    try {
+      const page = await getOrders(nextCursor);
+      setOrders((current) => [...current, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch (err) {
+      setError((err as Error).message);
+    } finally {
+      setIsLoadingMore(false);
+    }
   };
 
   const handleCloseModal = () => {
@@ -163,23 +184,15 @@ const OrdersPage = () => {
                   </span>
                 </div>
                 
-                <div className="mt-2">
-                  {order.items.map((item) => (
-                    <div key={item.id} className="flex items-center mb-2 last:mb-0">
-                      <Image 
-                        src={item.snapshot_media_url || `/placeholder-product.png`}
-                        alt={item.snapshot_name || 'Product Image'}
-                        width={64}
-                        height={64}
-                        className="w-16 h-16 object-cover rounded-md mr-4"
-                      />
-                      <div>
-                        <p className="font-semibold">{item.snapshot_name || 'Product'}</p>
-                        <p className="text-gray-600 text-sm">Qty: {item.quantity}</p>
-                        <p className="font-bold">{order.currency} {item.line_total.toFixed(2)}</p>
-                      </div>
-                    </div>
-                  ))}
+                <div className="mt-2 flex items-center">
+                  <Image 
+                    src={order.first_image_url || `/placeholder-product.png`}
+                    alt={`Order ${order.id}`}
+                    width={64}
+                    height={64}
+                    className="w-16 h-16 object-cover rounded-md mr-4"
+                  />
+                  <p className="text-gray-600 text-sm">{order.item_count} {order.item_count === 1 ? 'item' : 'items'}</p>
                 </div>
 
                 <div className="flex justify-between items-center mt-2">
@@ -203,6 +216,17 @@ const OrdersPage = () => {
                 </div>
               </div>
             ))}
+            {nextCursor && (
+              <div className="flex justify-center">
+                <button
+                  onClick={handleLoadMore}
+                  disabled={isLoadingMore}
+                  className="border border-black px-6 py-2 rounded-full font-semibold hover:bg-gray-100 disabled:text-gray-400"
+                >
+                  {isLoadingMore ? 'Loading...' : 'Load more orders'}
+                </button>
+              </div>
+            )}
           </div>
         )
       }
@@ -5,8 +5,8 @@ import { MapPin, User as UserIcon, Briefcase, FileText } from 'lucide-react';
 import Link from 'next/link';
 import { useRouter } from 'next/navigation';
 import { useEffect, useState, useMemo } from 'react';
-import { getOrders, retryPayment } from '@/lib/api/orders';
-import { Order } from '@/types';
+import { getOrderById, getOrders, retryPayment } from '@/lib/api/orders';
+import { Order, OrderSummary } from '@/types';
 import OrderDetailsModal from '@/app/(dashboard)/orders/_components/OrderDetailsModal';
 import { AnimatePresence } from 'framer-motion';
 import { useForm, SubmitHandler } from 'react-hook-form';
@@ -19,7 +19,7 @@ const AccountPage = () => {
   const { user, loading, logout, token, fetchUserProfile } = useAuthStore();
   const router = useRouter();
 
-  const [recentOrders, setRecentOrders] = useState<Order[]>([]);
+  const [recentOrders, setRecentOrders] = useState<OrderSummary[]>([]);
   const [ordersLoading, setOrdersLoading] = useState(true);
   const [ordersError, setOrdersError] = useState<string | null>(null);
   const [isModalOpen, setIsModalOpen] = useState(false);
@@ -37,8 +37,8 @@ const AccountPage = () => {
       if (!user || !token) return;
       try {
         setOrdersLoading(true);
-        const fetchedOrders = await getOrders();
-        setRecentOrders(fetchedOrders.slice(0, 3));
+        const page = await getOrders(null, 3);
+        setRecentOrders(page.items);
       } catch (err) {
         setOrdersError((err as Error).message);
       } finally {
@@ -110,9 +110,13 @@ const AccountPage = () => {
   };
 
 
-  const handleViewDetails = (order: Order) => {
-    setSelectedOrder(order);
-    setIsModalOpen(true);
+  const handleViewDetails = async (order: OrderSummary) => {
+    try {
+      setSelectedOrder(await getOrderById(order.id));
+      setIsModalOpen(true);
+    } catch (err) {
+      setOrdersError((err as Error).message);
+    }
   };
 
   const handleCloseModal = () => {
@@ -5,6 +5,7 @@ import { Trash2 } from 'lucide-react';
 import { useCartStore } from '@/store/cartStore';
 import { CartItem as ICartItem } from '@/types';
 import QuantitySelector from '@/components/QuantitySelector';
+import { mediaUrlForWidth } from '@/lib/utils';
 import { useState } from 'react';
 import debounce from 'lodash/debounce';
 
@@ -32,7 +33,7 @@ export default function CartItem({ item }: CartItemProps) {
       {/* Product */}
       <div className="col-span-2 flex items-center space-x-4">
         <Image
-          src={item.product.media[0]?.url || '/placeholder.svg'}
+          src={mediaUrlForWidth(item.product.media[0], 80) || '/placeholder.svg'}
           alt={item.product.name}
           width={80}
           height={80}
@@ -2,8 +2,8 @@ import { getProducts } from '@/lib/api/products';
 import ProductGrid from '@/components/ProductGrid';
 
 export default async function FeaturedProducts() {
-  const featuredProducts = await getProducts('Hot Selling')
-    .then(products => products.slice(0, 3))
+  const featuredProducts = await getProducts('Hot Selling', undefined, undefined, null, 3)
+    .then(page => page.items)
     .catch(() => []);
 
   if (featuredProducts.length === 0) {
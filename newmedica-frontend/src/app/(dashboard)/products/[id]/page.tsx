@@ -18,8 +18,9 @@ export default async function ProductDetailPage({
   }
 
   // Fetch related products for "You may also like"
-  const relatedProducts = await getProducts(product.category.name)
-    .then(products => products.filter(p => p.id !== product.id).slice(0, 3))
+  // One extra in case the product itself is among them
+  const relatedProducts = await getProducts(product.category.name, undefined, undefined, null, 4)
+    .then(page => page.items.filter(p => p.id !== product.id).slice(0, 3))
     .catch(() => []);
 
   return (
@@ -12,6 +12,8 @@ function ProductList({ category }: { category: string }) {
   const searchParams = useSearchParams();
   const [products, setProducts] = useState<Product[]>([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
 
   useEffect(() => {
     const fetchProducts = async () => {
@@ -19,8 +21,9 @@ function ProductList({ category }: { category: string }) {
       const search = searchParams.get('search') || undefined;
       const sortBy = searchParams.get('sort_by') || undefined;
       try {
-        const fetchedProducts = await getProducts(category, search, sortBy);
-        setProducts(fetchedProducts);
+        const page = await getProducts(category, search, sortBy);
+        setProducts(page.items);
+        setNextCursor(page.nextCursor);
       } catch (error) {
         console.error("Failed to fetch products:", error);
       } finally {
@@ -31,6 +34,22 @@ function ProductList({ category }: { category: string }) {
     fetchProducts();
   }, [searchParams, category]);
 
+  const handleLoadMore = async () => {
+    if (!nextCursor) return;
+    setIsLoadingMore(true);
+    try {
+      const search = searchParams.get('search') || undefined;
+      const sortBy = searchParams.get('sort_by') || undefined;
+      const page = await getProducts(category, search, sortBy, nextCursor);
+      setProducts((current) => [...current, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      console.error("Failed to fetch more products:", error);
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   if (loading) {
     return (
       <div className="grid grid-cols-1 md:grid-cols-3 gap-8">
@@ -39,7 +58,22 @@ function ProductList({ category }: { category: string }) {
     );
   }
 
-  return <ProductGrid products={products} />;
+  return (
+    <div className="space-y-8">
+      <ProductGrid products={products} />
+      {nextCursor && (
+        <div className="flex justify-center">
+          <button
+            onClick={handleLoadMore}
+            disabled={isLoadingMore}
+            className="border border-black px-6 py-2 rounded-full font-semibold hover:bg-gray-100 disabled:text-gray-400"
+          >
+            {isLoadingMore ? 'Loading...' : 'Load more products'}
+          </button>
+        </div>
+      )}
+    </div>
+  );
 }
 
 export default function ProductCategoryPage({ category }: { category: string }) {
@@ -4,9 +4,9 @@ import { getProducts } from '@/lib/api/products';
 import { Product } from '@/types';
 
 export default async function HomePageContent() {
-  const products: Product[] = await getProducts();
   // In the future, you might want an endpoint for "featured" products
-  const featuredProducts = products.slice(0, 8);
+  const page = await getProducts(undefined, undefined, undefined, null, 8);
+  const featuredProducts: Product[] = page.items;
 
   return (
     <div className="container mx-auto px-4 py-8">
@@ -7,6 +7,7 @@ import React, { useState } from 'react';
 import { Plus } from 'lucide-react';
 import { useAuthStore } from '@/store/authStore';
 import { useCartStore } from '@/store/cartStore';
+import { mediaUrlForWidth } from '@/lib/utils';
 import { showWarningAlert, showSuccessToast } from '@/components/CustomAlert'; // Import CustomAlert functions
 
 type ProductCardProps = {
@@ -17,8 +18,8 @@ const ProductCard: React.FC<ProductCardProps> = ({ product }) => {
   const [isHovered, setIsHovered] = useState(false);
   const fallbackImage = `https://picsum.photos/seed/${product.id}/400/300`;
 
-  const primaryImage = product.media?.[0]?.url || fallbackImage;
-  const secondaryImage = product.media?.[1]?.url || primaryImage;
+  const primaryImage = mediaUrlForWidth(product.media?.[0], 300) || fallbackImage;
+  const secondaryImage = mediaUrlForWidth(product.media?.[1], 300) || primaryImage;
 
   const { user, loading: authLoading } = useAuthStore();
   const addItemToCart = useCartStore((state) => state.addItem);
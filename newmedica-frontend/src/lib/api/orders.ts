@@ -1,14 +1,16 @@
-import { Order, PaymentResponse } from '@/types';
+import { Order, OrderPage, PaymentResponse } from '@/types';
 import { getAuthToken } from '../utils';
 
 import { getApiUrl } from '../utils/api';
 const API_URL = getApiUrl();
 
-export async function getOrders(): Promise<Order[]> {
+export async function getOrders(cursor?: string | null, limit = 20): Promise<OrderPage> {
   const token = getAuthToken();
   if (!token) throw new Error('Authentication token not found.');
 
-  const response = await fetch(`${API_URL}/api/v1/orders`, {
+  const params = new URLSearchParams({ limit: String(limit) });
+  if (cursor) params.set('cursor', cursor);
+  const response = await fetch(`${API_URL}/api/v1/orders?${params.toString()}`, {
     headers: {
       'Content-Type': 'application/json',
       'Authorization': `Bearer ${token}`,
@@ -21,6 +23,23 @@ export async function getOrders(): Promise<Order[]> {
   return response.json();
 }
 
+export async function getOrderById(orderId: string): Promise<Order> {
+  const token = getAuthToken();
+  if (!token) throw new Error('Authentication token not found.');
+
+  const response = await fetch(`${API_URL}/api/v1/orders/${orderId}`, {
+    headers: {
+      'Content-Type': 'application/json',
+      'Authorization': `Bearer ${token}`,
+    },
+  });
+
+  if (!response.ok) {
+    throw new Error('Failed to fetch order');
+  }
+  return response.json();
+}
+
 export async function retryPayment(orderId: string): Promise<PaymentResponse> {
   const token = getAuthToken();
   if (!token) throw new Error('Authentication token not found.');
@@ -1,4 +1,4 @@
-import { Category, Product } from '@/types';
+import { Category, Product, ProductPage } from '@/types';
 
 import { getApiUrl } from '../utils/api';
 const API_URL = getApiUrl();
@@ -14,8 +14,10 @@ export async function getCategories(): Promise<Category[]> {
 export async function getProducts(
   category?: string,
   search?: string,
-  sortBy?: string
-): Promise<Product[]> {
+  sortBy?: string,
+  cursor?: string | null,
+  limit?: number
+): Promise<ProductPage> {
   const params = new URLSearchParams();
   if (category) {
     params.append('category', category);
@@ -26,6 +28,12 @@ export async function getProducts(
   if (sortBy) {
     params.append('sort_by', sortBy);
   }
+  if (cursor) {
+    params.append('cursor', cursor);
+  }
+  if (limit) {
+    params.append('limit', String(limit));
+  }
 
   const url = `${API_URL}/api/v1/products?${params.toString()}`;
   const response = await fetch(url, { cache: 'no-store' });
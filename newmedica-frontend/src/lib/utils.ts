@@ -1,5 +1,6 @@
 import { type ClassValue, clsx } from "clsx"
 import { twMerge } from "tailwind-merge"
+import type { ProductMedia } from "@/types"
 
 export function cn(...inputs: ClassValue[]) {
   return twMerge(clsx(inputs))
@@ -18,3 +19,14 @@ export function formatVoucherCode(code: string | null | undefined): string | nul
   }
   return code.replace(/_/g, ' ');
 }
+
+// The smallest variant at least `width` pixels wide, falling back to the original upload.
+export function mediaUrlForWidth(media: ProductMedia | undefined, width: number): string | undefined {
+  if (!media) {
+    return undefined;
+  }
+  const variants = Object.entries(media.srcset ?? {})
+    .map(([descriptor, url]) => [parseInt(descriptor, 10), url] as const)
+    .sort(([a], [b]) => a - b);
+  return variants.find(([variantWidth]) => variantWidth >= width)?.[1] ?? media.url;
+}
@@ -16,11 +16,18 @@ export interface Product {
   media: ProductMedia[];
 }
 
+export interface ProductPage {
+  items: Product[];
+  nextCursor: string | null;
+}
+
 export interface ProductMedia {
   id: string;
   media_type: string;
   url: string;
   display_order: number;
+  // Resized WebP variants keyed by width descriptor, e.g. { "320w": url }
+  srcset?: Record<string, string>;
 }
 
 export type UserType = 'Basic' | 'Agent' | 'Healthcare' | 'Admin';
@@ -118,6 +125,25 @@ export interface Order {
   items: OrderItem[];
 }
 
+export interface OrderSummary {
+  id: string;
+  payment_status: string;
+  created_at: string;
+  subtotal_amount: number;
+  discount_amount: number;
+  shipping_amount: number;
+  total_amount: number;
+  currency: string;
+  applied_voucher_code?: string | null;
+  item_count: number;
+  first_image_url?: string | null;
+}
+
+export interface OrderPage {
+  items: OrderSummary[];
+  next_cursor: string | null;
+}
+
 export interface Voucher {
   id: string;
   code: string;